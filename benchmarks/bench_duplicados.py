@@ -0,0 +1,74 @@
+"""Benchmark del detector de duplicados MinHash/LSH con títulos sintéticos.
+
+Uso: python benchmarks/bench_duplicados.py [--tamanos 10000 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from duplicados import IndiceLSH, calcular_firmas, claves_banda  # noqa: E402
+from sinteticos import ATRIBUTOS, MARCAS, PRODUCTOS, RUIDO  # noqa: E402
+
+def generar_titulos(n, variantes=4, semilla=42):
+    """Productos base con varias publicaciones casi iguales (otros vendedores, palabras de relleno)"""
+    rng = random.Random(semilla)
+    titulos = []
+    while len(titulos) < n:
+        base = f"{rng.choice(PRODUCTOS)} {rng.choice(MARCAS)} {rng.choice(ATRIBUTOS)} {rng.choice(ATRIBUTOS)} Modelo {rng.randint(100, 99999)}"
+        for _ in range(rng.randint(1, variantes)):
+            variante = base if rng.random() < 0.5 else f"{base} {rng.choice(RUIDO)}"
+            titulos.append(variante.upper() if rng.random() < 0.2 else variante)
+    return titulos[:n]
+
+def medir(n):
+    titulos = generar_titulos(n)
+
+    inicio = time.perf_counter()
+    firmas = calcular_firmas(titulos)
+    t_firmas = time.perf_counter() - inicio
+
+    indice = IndiceLSH()
+    inicio = time.perf_counter()
+    grupos = indice.asignar(titulos)
+    t_indice = time.perf_counter() - inicio
+
+    # Consultas contra el índice ya construido: títulos nuevos que no están por clave exacta
+    consultas = [f"{t} Somos Tienda Oficial" for t in random.Random(7).sample(titulos, min(1000, n))]
+    firmas_consulta = calcular_firmas(consultas)
+    bandas = claves_banda(firmas_consulta).tolist()
+    inicio = time.perf_counter()
+    for firma, banda in zip(firmas_consulta, bandas):
+        indice._consultar(firma, banda)
+    t_consulta = (time.perf_counter() - inicio) / len(consultas)
+
+    # Comparación contra todos los pares (O(n²)) estimada con una muestra
+    muestra = firmas[:min(n, 2000)]
+    inicio = time.perf_counter()
+    for firma in muestra[:200]:
+        (muestra == firma).mean(axis=1)
+    t_par = (time.perf_counter() - inicio) / (200 * len(muestra))
+
+    return {
+        "titulos": n,
+        "grupos": len(np.unique(grupos)),
+        "firmas_s": t_firmas,
+        "indice_s": t_indice,
+        "consulta_us": t_consulta * 1e6,
+        "fuerza_bruta_s": t_par * n * n / 2
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'títulos':>10} {'grupos':>8} {'firmas (s)':>11} {'índice (s)':>11} {'consulta (µs)':>14} {'O(n²) estimado (s)':>19}")
+    for n in args.tamanos:
+        r = medir(n)
+        print(f"{r['titulos']:>10} {r['grupos']:>8} {r['firmas_s']:>11.2f} {r['indice_s']:>11.2f} {r['consulta_us']:>14.1f} {r['fuerza_bruta_s']:>19.1f}")
@@ -0,0 +1,62 @@
+"""Benchmark del renderizador del reporte frente al armado anterior con iterrows y +=.
+
+Uso: python benchmarks/bench_render.py [--filas 10 1000 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from generar_reporte import safe_format_price, safe_format_rating, safe_get_int  # noqa: E402
+from sinteticos import generar_productos  # noqa: E402
+from render import ESTILOS, CABECERA, PIE, TARJETA, BADGE_TENDENCIA, BADGE_ENVIO, BADGE_OFICIAL, renderizar_reporte, escribir_reporte  # noqa: E402
+
+def renderizar_anterior(df, fecha, hora):
+    """El armado anterior: iterrows, accesos por fila y concatenación con +="""
+    df = df.fillna({'titulo': 'Sin título', 'precio': 0, 'ventas': 0, 'mensajes': 0, 'rating': 0,
+                    'envio_gratis': False, 'tienda_oficial': False, 'link': '#'})
+    html = CABECERA.format(estilos=ESTILOS, fecha=fecha, hora=hora)
+    for i, row in df.iterrows():
+        badges = []
+        if row.get('envio_gratis', False):
+            badges.append(BADGE_ENVIO)
+        if row.get('tienda_oficial', False):
+            badges.append(BADGE_OFICIAL)
+        titulo = str(row.get('titulo', 'Sin título'))[:100] + ('...' if len(str(row.get('titulo', ''))) > 100 else '')
+        ventas = safe_get_int(row, 'ventas', 0)
+        mensajes = safe_get_int(row, 'mensajes', 0)
+        html += TARJETA.format(
+            badge_tendencia=BADGE_TENDENCIA if mensajes > 50 or ventas > 100 else "",
+            titulo=titulo,
+            precio=safe_format_price(row.get('precio', 0)),
+            badges="".join(badges),
+            ventas=ventas,
+            clase_mensajes='highlight-stat' if mensajes > 20 else '',
+            mensajes=mensajes,
+            rating=safe_format_rating(row.get('rating', 0)),
+            por_que=f"Alto interés de compradores con {mensajes} mensajes en los últimos días",
+            link=str(row.get('link', '#'))
+        )
+    return html + PIE
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, nargs="+", default=[10, 1_000, 100_000])
+    args = parser.parse_args()
+
+    destino = os.path.join(tempfile.mkdtemp(), "index.html")
+    print(f"{'filas':>8} {'anterior (s)':>13} {'join (s)':>9} {'a disco (s)':>12} {'aceleración':>12}")
+    for n in args.filas:
+        df = generar_productos(n)
+        anterior = cronometrar(lambda: renderizar_anterior(df, "01/01/2025", "08:00"))
+        unido = cronometrar(lambda: renderizar_reporte(df, "01/01/2025", "08:00"))
+        a_disco = cronometrar(lambda: escribir_reporte(destino, df, "01/01/2025", "08:00"))
+        print(f"{n:>8} {anterior:>13.3f} {unido:>9.3f} {a_disco:>12.3f} {anterior / unido:>11.1f}x")
@@ -0,0 +1,121 @@
+"""Benchmark del scraping contra benchmarks/servidor_ml.py: páginas por minuto según concurrencia y estrategia de scroll.
+
+Uso: python benchmarks/bench_scraper.py [--concurrencia 1 4 8] [--quietud-ms 250 500 1000] [--scroll-max 10]
+     [--paginas 4] [--latencia 0.3] [--errores 0.05] [--tasa-429 0.02] [--captcha 0.01] [--salida bench.json]
+
+Necesita playwright con chromium instalado, pero no sale a internet: el
+scraper apunta a un servidor local con ML_BASE_URL. Cada combinación corre en
+un directorio temporal, así no retoma el checkpoint ni las cookies de la
+anterior. "tarjetas" es la fracción de las tarjetas de cada listado que llegó
+a extraerse: una quietud corta termina el scroll antes de que lleguen todas.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from servidor_ml import ITEMS_POR_PAGINA, agregar_argumentos, servidor_desde_args  # noqa: E402
+from sinteticos import CATEGORIAS  # noqa: E402
+
+def tarjetas_esperadas(servidor, urls):
+    """Tarjetas que el servidor tiene para cada URL de la cola, contando las que llegan con scroll"""
+    from parser_html import categoria_de_url, CATEGORIA_GENERAL
+    from scraper_ml_ve import ORDEN
+    total = 0
+    for url in urls:
+        categoria = categoria_de_url(url)
+        sufijo = url.rsplit("/", 1)[1]
+        desde = int(sufijo[len("_Desde_"):-len(ORDEN)]) if sufijo.startswith("_Desde_") else 1
+        disponibles = servidor.catalogo.total("" if categoria == CATEGORIA_GENERAL else categoria)
+        total += max(0, min(ITEMS_POR_PAGINA, disponibles - desde + 1))
+    return total
+
+def correr(servidor, urls, concurrencia, quietud_ms, scroll_max, pausa_host):
+    """Una corrida completa de scrape_ml_venezuela; devuelve sus métricas"""
+    import metricas
+    import scraper_ml_ve
+
+    scraper_ml_ve.SCROLL_QUIETUD_MS = quietud_ms
+    scraper_ml_ve.SCROLL_MAX = scroll_max
+    metricas._corrida["etapas"].pop("scrape_ml_venezuela", None)
+    servidor.reiniciar_contadores()
+
+    directorio_previo = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        try:
+            inicio = time.perf_counter()
+            # El scraper imprime cada navegación y cada scroll; acá solo interesa la tabla
+            with contextlib.redirect_stdout(io.StringIO()):
+                df = scraper_ml_ve.scrape_ml_venezuela(urls, concurrencia, pausa_host)
+            segundos = time.perf_counter() - inicio
+            fallidas = []
+            if os.path.exists(scraper_ml_ve.DEAD_LETTER_PATH):
+                with open(scraper_ml_ve.DEAD_LETTER_PATH, encoding="utf-8") as f:
+                    fallidas = json.load(f)
+        finally:
+            os.chdir(directorio_previo)
+
+    contadores = metricas._corrida["etapas"]["scrape_ml_venezuela"]["contadores"]
+    completas = len(urls) - len(fallidas)
+    return {
+        "concurrencia": concurrencia,
+        "quietud_ms": quietud_ms,
+        "scroll_max": scroll_max,
+        "segundos": round(segundos, 3),
+        "paginas": completas,
+        "fallidas": len(fallidas),
+        "paginas_por_minuto": round(completas / segundos * 60, 1),
+        "productos": len(df),
+        "tarjetas": round(len(df) / max(1, tarjetas_esperadas(servidor, urls)), 3),
+        "scrolls_por_pagina": round(contadores.get("scrolls", 0) / max(1, contadores.get("navegaciones", 0)), 2),
+        "espera_scroll_s": round(contadores.get("espera_scroll_s", 0.0), 2),
+        "reintentos": contadores.get("reintentos", 0),
+        "bloqueos": contadores.get("bloqueos", 0),
+        "servidor": dict(servidor.contadores)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--quietud-ms", type=int, nargs="+", default=[250, 500, 1000])
+    parser.add_argument("--scroll-max", type=int, nargs="+", default=[10])
+    parser.add_argument("--categorias", type=int, default=3, help="Cuántas categorías sintéticas recorrer")
+    parser.add_argument("--paginas", type=int, default=4, help="Páginas por categoría")
+    parser.add_argument("--pausa-host", type=float, default=0.0, help="Pausa entre navegaciones al host (0 = sin límite)")
+    parser.add_argument("--pausa-bloqueo", type=float, default=5.0, help="Segundos con el circuito abierto")
+    parser.add_argument("--salida", help="JSON donde guardar los resultados")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with servidor_desde_args(args) as servidor:
+        # BASE_URL se lee al importar el scraper
+        os.environ["ML_BASE_URL"] = servidor.url
+        import scraper_ml_ve
+        scraper_ml_ve.PAUSA_BLOQUEO = args.pausa_bloqueo
+        urls = scraper_ml_ve.construir_urls(CATEGORIAS[:args.categorias], args.paginas)
+
+        print(f"{len(urls)} listados en {servidor.url}, latencia {args.latencia}s, "
+              f"fallas 500/429/captcha {args.errores:.0%}/{args.tasa_429:.0%}/{args.captcha:.0%}")
+        print(f"{'concurrencia':>12} {'quietud (ms)':>12} {'scroll máx':>10} {'tiempo (s)':>10} {'páginas/min':>12} "
+              f"{'fallidas':>8} {'tarjetas':>9} {'scrolls/pág':>11} {'reintentos':>10}")
+        resultados = []
+        for concurrencia, quietud_ms, scroll_max in itertools.product(args.concurrencia, args.quietud_ms, args.scroll_max):
+            r = correr(servidor, urls, concurrencia, quietud_ms, scroll_max, args.pausa_host)
+            resultados.append(r)
+            print(f"{concurrencia:>12} {quietud_ms:>12} {scroll_max:>10} {r['segundos']:>10.2f} {r['paginas_por_minuto']:>12.1f} "
+                  f"{r['fallidas']:>8} {r['tarjetas']:>9.0%} {r['scrolls_por_pagina']:>11.2f} {r['reintentos']:>10}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"argumentos": vars(args), "resultados": resultados}, f, ensure_ascii=False, indent=2)
+        print(f"Resultados en {args.salida}")
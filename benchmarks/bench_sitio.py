@@ -0,0 +1,41 @@
+"""Benchmark del sitio estático: peso del índice y tiempo de publicación según la cantidad de productos.
+
+Uso: python benchmarks/bench_sitio.py [--productos 5 1000 50000] [--categorias 8]
+"""
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sinteticos import generar_productos  # noqa: E402
+from sitio import publicar_sitio  # noqa: E402
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productos", type=int, nargs="+", default=[5, 1_000, 50_000])
+    parser.add_argument("--categorias", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'productos':>10} {'índice (KB)':>12} {'índice gz (KB)':>15} {'archivos':>9} {'publicar (s)':>13} {'republicar (s)':>15}")
+    for n in args.productos:
+        df = generar_productos(n)
+        df["categoria"] = np.array([f"categoria-{i}" for i in range(args.categorias)])[np.arange(n) % args.categorias]
+        directorio = tempfile.mkdtemp()
+        publicar = cronometrar(lambda: publicar_sitio(directorio, df, "01/01/2025", "08:00"))
+        # Sin cambios en los datos no se reescribe ningún archivo con hash
+        republicar = cronometrar(lambda: publicar_sitio(directorio, df, "01/01/2025", "08:00"))
+        with open(os.path.join(directorio, "index.html"), "rb") as f:
+            indice = f.read()
+        archivos = sum(len(nombres) for _, _, nombres in os.walk(directorio))
+        print(f"{n:>10} {len(indice) / 1024:>12.1f} {len(gzip.compress(indice)) / 1024:>15.1f} {archivos:>9} {publicar:>13.2f} {republicar:>15.2f}")
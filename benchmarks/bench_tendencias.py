@@ -0,0 +1,46 @@
+"""Benchmark del motor de tendencias con un histórico sintético de items x días.
+
+Uso: python benchmarks/bench_tendencias.py [--items 100000] [--dias 7 30 90]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from tendencias import calcular_tendencias  # noqa: E402
+
+def generar_historico(items, dias, faltantes=0.1, movers=10, semilla=42):
+    """Contadores acumulados por item y día, con huecos y `movers` items que se disparan el último día"""
+    rng = np.random.default_rng(semilla)
+    mensajes = np.cumsum(rng.poisson(2, (items, dias)), axis=1)
+    mensajes[:movers, -1] += 500
+    ventas = mensajes // 3
+    fechas = pd.date_range(end=pd.Timestamp.now().normalize(), periods=dias, freq="D")
+    df = pd.DataFrame({
+        "item_id": np.repeat(np.array([f"MLV{i}" for i in range(items)], dtype=object), dias),
+        "fecha": np.tile(fechas.to_numpy(), items),
+        "mensajes": mensajes.ravel(),
+        "ventas": ventas.ravel(),
+        "precio": rng.uniform(10, 1000, items * dias)
+    })
+    return df[rng.random(len(df)) >= faltantes].reset_index(drop=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--dias", type=int, nargs="+", default=[7, 30, 90])
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'días':>5} {'filas':>10} {'tiempo (s)':>11} {'movers en top 10':>17}")
+    for dias in args.dias:
+        historico = generar_historico(args.items, dias)
+        inicio = time.perf_counter()
+        tabla = calcular_tendencias(historico, dias)
+        duracion = time.perf_counter() - inicio
+        encontrados = tabla.head(10)["item_id"].isin([f"MLV{i}" for i in range(10)]).sum()
+        print(f"{args.items:>8} {dias:>5} {len(historico):>10} {duracion:>11.2f} {encontrados:>17}")
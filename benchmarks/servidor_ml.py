@@ -0,0 +1,290 @@
+"""Servidor local que imita los listados de MercadoLibre Venezuela para probar el scraper sin red.
+
+Uso: python benchmarks/servidor_ml.py [--puerto 8765] [--latencia 0.2] [--errores 0.05] [--tasa-429 0.02] [--captcha 0.01]
+y luego ML_BASE_URL=http://127.0.0.1:8765 ML_CATEGORIAS=celulares-telefonos python src/scraper_ml_ve.py
+
+Sirve las mismas URLs que arma construir_urls (/<categoria>/_Desde_N_OrderId_MSGS)
+con tarjetas .ui-search-layout__item de benchmarks/sinteticos.py. Solo las
+primeras `iniciales` tarjetas vienen en el HTML; el resto llega por fetch al
+hacer scroll, en lotes de `lote_scroll`. Hasta aceptar las cookies cada página
+muestra el banner de consentimiento. Las fallas (500, 429 y redirección al
+captcha) se sortean por URL e intento a partir de la semilla, así que una
+corrida con la misma cola falla en los mismos lugares sin importar la
+concurrencia.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from sinteticos import CATEGORIAS, generar_productos, tarjeta_html
+
+ITEMS_POR_PAGINA = 50  # Igual que scraper_ml_ve.ITEMS_POR_PAGINA
+COOKIE_CONSENTIMIENTO = "cookies_aceptadas"
+RUTA_LISTADO_REGEX = r"^/(?:(?P<categoria>[a-z0-9-]+)/)?(?:_Desde_(?P<desde>\d+))?_OrderId_MSGS$"
+
+PAGINA = """<!DOCTYPE html>
+<html lang="es-VE">
+<head><meta charset="utf-8"><title>{titulo} | MercadoLibre Venezuela</title></head>
+<body>
+{banner}<main class="ui-search-main">
+<ol class="ui-search-layout ui-search-layout--grid" data-desde="{siguiente}" data-hasta="{hasta}" data-categoria="{categoria}">
+{tarjetas}</ol>
+</main>
+<script>
+(() => {{
+  const lista = document.querySelector(".ui-search-layout");
+  let cargando = false;
+  const cargar = () => {{
+    const desde = +lista.dataset.desde, hasta = +lista.dataset.hasta;
+    if (cargando || desde > hasta) return;
+    if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+    cargando = true;
+    fetch(`/api/tarjetas?categoria=${{lista.dataset.categoria}}&desde=${{desde}}&cantidad={lote}&hasta=${{hasta}}`)
+      .then(r => r.ok ? r.text() : "")
+      .then(fragmento => {{
+        lista.insertAdjacentHTML("beforeend", fragmento);
+        lista.dataset.desde = desde + {lote};
+      }})
+      .finally(() => {{ cargando = false; }});
+  }};
+  window.addEventListener("scroll", cargar, {{passive: true}});
+  const banner = document.querySelector(".cookie-consent-banner-opt-out");
+  if (banner) banner.querySelector("button").addEventListener("click", () => {{
+    document.cookie = "{cookie}=1; path=/; max-age=31536000";
+    banner.remove();
+  }});
+}})();
+</script>
+</body>
+</html>
+"""
+
+BANNER = """<div class="cookie-consent-banner-opt-out" style="position:fixed;bottom:0;left:0;right:0;padding:16px;background:#fff">
+  <p>Usamos cookies para mejorar tu experiencia en Mercado Libre.</p>
+  <button class="cookie-banner-lgpd-button">Aceptar cookies</button>
+</div>
+"""
+
+CAPTCHA = """<!DOCTYPE html>
+<html lang="es-VE">
+<head><meta charset="utf-8"><title>Verificación | MercadoLibre Venezuela</title></head>
+<body><form action="/captcha/validar" method="post"><div class="g-recaptcha" data-sitekey="local"></div></form></body>
+</html>
+"""
+
+class CatalogoML:
+    """Productos sintéticos agrupados por categoría; el listado sin categoría los incluye a todos"""
+
+    def __init__(self, productos_por_categoria, categorias=CATEGORIAS, semilla=42):
+        productos = generar_productos(productos_por_categoria * len(categorias), semilla)
+        productos["categoria"] = [categorias[i % len(categorias)] for i in range(len(productos))]
+        # Las tarjetas rotas no aportan al benchmark y MercadoLibre no muestra precios cero
+        productos = productos[(productos["titulo"] != "") & (productos["precio"] > 0)]
+        self.tarjetas = {"": [tarjeta_html(p) for p in productos.itertuples(index=False)]}
+        for categoria, grupo in productos.groupby("categoria", sort=False):
+            self.tarjetas[categoria] = [tarjeta_html(p) for p in grupo.itertuples(index=False)]
+
+    def total(self, categoria):
+        return len(self.tarjetas.get(categoria, ()))
+
+    def rango(self, categoria, desde, hasta):
+        """Tarjetas de las posiciones desde..hasta (base 1, inclusivas), como las cuenta _Desde_N"""
+        return self.tarjetas.get(categoria, [])[max(desde, 1) - 1:hasta]
+
+class ServidorML:
+    """ThreadingHTTPServer en un hilo daemon con el catálogo, las fallas configuradas y contadores de lo servido.
+
+    Se usa como context manager; `url` es la base para ML_BASE_URL.
+    """
+
+    def __init__(self, puerto=0, productos_por_categoria=500, iniciales=20, lote_scroll=10, latencia=0.0,
+                 latencia_scroll=None, errores=0.0, tasa_429=0.0, captcha=0.0, banner=True, semilla=42):
+        self.catalogo = CatalogoML(productos_por_categoria, semilla=semilla)
+        self.iniciales = iniciales
+        self.lote_scroll = lote_scroll
+        self.latencia = latencia
+        self.latencia_scroll = latencia if latencia_scroll is None else latencia_scroll
+        self.errores = errores
+        self.tasa_429 = tasa_429
+        self.captcha = captcha
+        self.banner = banner
+        self.semilla = semilla
+        self.contadores = {}
+        self._intentos = {}
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", puerto), _crear_handler(self))
+        self._servidor.daemon_threads = True
+        self._hilo = None
+
+    @property
+    def url(self):
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+        return False
+
+    def contar(self, nombre, cantidad=1):
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def reiniciar_contadores(self):
+        with self._lock:
+            self.contadores = {}
+            self._intentos = {}
+
+    def sortear_falla(self, ruta):
+        """Decide la falla de este intento a la URL: "error", "429", "captcha" o None"""
+        with self._lock:
+            intento = self._intentos[ruta] = self._intentos.get(ruta, 0) + 1
+        digest = hashlib.blake2b(f"{self.semilla}:{ruta}:{intento}".encode(), digest_size=8).digest()
+        sorteo = int.from_bytes(digest, "big") / 2 ** 64
+        for falla, tasa in (("error", self.errores), ("429", self.tasa_429), ("captcha", self.captcha)):
+            if sorteo < tasa:
+                return falla
+            sorteo -= tasa
+        return None
+
+def _crear_handler(servidor):
+    class HandlerML(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass  # Un log por solicitud taparía la salida del benchmark
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/api/tarjetas":
+                self._tarjetas(parse_qs(url.query))
+            elif url.path.startswith("/captcha"):
+                servidor.contar("captcha")
+                self._responder(200, CAPTCHA)
+            elif url.path == "/favicon.ico":
+                self._responder(404, "")
+            else:
+                match = re.match(RUTA_LISTADO_REGEX, url.path)
+                if match:
+                    self._listado(match.group("categoria") or "", int(match.group("desde") or 1))
+                else:
+                    servidor.contar("404")
+                    self._responder(404, "<h1>Parece que esta página no existe</h1>")
+
+        def _listado(self, categoria, desde):
+            time.sleep(servidor.latencia)
+            falla = servidor.sortear_falla(self.path)
+            if falla == "error":
+                servidor.contar("500")
+                return self._responder(500, "<h1>Hubo un error</h1>")
+            if falla == "429":
+                servidor.contar("429")
+                return self._responder(429, "<h1>Demasiadas solicitudes</h1>", {"Retry-After": "5"})
+            if falla == "captcha":
+                servidor.contar("redirecciones_captcha")
+                return self._responder(302, "", {"Location": f"/captcha?go={self.path}"})
+
+            hasta = min(desde + ITEMS_POR_PAGINA - 1, servidor.catalogo.total(categoria))
+            if desde > hasta:
+                servidor.contar("404")
+                return self._responder(404, "<h1>No hay publicaciones que coincidan con tu búsqueda</h1>")
+            iniciales = servidor.catalogo.rango(categoria, desde, min(hasta, desde + servidor.iniciales - 1))
+            consentido = f"{COOKIE_CONSENTIMIENTO}=1" in (self.headers.get("Cookie") or "")
+            servidor.contar("listados")
+            servidor.contar("tarjetas", len(iniciales))
+            self._responder(200, PAGINA.format(
+                titulo=html.escape(categoria.replace("-", " ").capitalize() or "Resultados"),
+                banner="" if consentido or not servidor.banner else BANNER,
+                siguiente=desde + len(iniciales),
+                hasta=hasta,
+                categoria=categoria,
+                tarjetas="".join(iniciales),
+                lote=servidor.lote_scroll,
+                cookie=COOKIE_CONSENTIMIENTO
+            ))
+
+        def _tarjetas(self, query):
+            time.sleep(servidor.latencia_scroll)
+            try:
+                desde = int(query["desde"][0])
+                hasta = min(desde + int(query["cantidad"][0]) - 1, int(query["hasta"][0]))
+            except (KeyError, ValueError):
+                return self._responder(400, "")
+            tarjetas = servidor.catalogo.rango(query.get("categoria", [""])[0], desde, hasta)
+            servidor.contar("fragmentos")
+            servidor.contar("tarjetas", len(tarjetas))
+            self._responder(200, "".join(tarjetas))
+
+        def _responder(self, estado, cuerpo, encabezados=None):
+            datos = cuerpo.encode("utf-8")
+            self.send_response(estado)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(datos)))
+            for nombre, valor in (encabezados or {}).items():
+                self.send_header(nombre, valor)
+            self.end_headers()
+            self.wfile.write(datos)
+
+    return HandlerML
+
+def agregar_argumentos(parser):
+    """Opciones del servidor compartidas con bench_scraper.py"""
+    parser.add_argument("--productos", type=int, default=500, help="Productos por categoría")
+    parser.add_argument("--iniciales", type=int, default=20, help="Tarjetas que vienen en el HTML; el resto se carga con scroll")
+    parser.add_argument("--lote-scroll", type=int, default=10, help="Tarjetas que trae cada scroll")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos de demora por listado")
+    parser.add_argument("--latencia-scroll", type=float, default=None, help="Segundos de demora por lote de scroll")
+    parser.add_argument("--errores", type=float, default=0.0, help="Fracción de listados que responden 500")
+    parser.add_argument("--tasa-429", type=float, default=0.0, help="Fracción de listados que responden 429")
+    parser.add_argument("--captcha", type=float, default=0.0, help="Fracción de listados que redirigen al captcha")
+    parser.add_argument("--sin-banner", action="store_true", help="No mostrar el banner de cookies")
+    parser.add_argument("--semilla", type=int, default=42)
+
+def servidor_desde_args(args, puerto=0):
+    return ServidorML(
+        puerto=puerto,
+        productos_por_categoria=args.productos,
+        iniciales=args.iniciales,
+        lote_scroll=args.lote_scroll,
+        latencia=args.latencia,
+        latencia_scroll=args.latencia_scroll,
+        errores=args.errores,
+        tasa_429=args.tasa_429,
+        captcha=args.captcha,
+        banner=not args.sin_banner,
+        semilla=args.semilla
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--puerto", type=int, default=int(os.environ.get("ML_PUERTO_SERVIDOR", "8765")))
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    servidor = servidor_desde_args(args, args.puerto).iniciar()
+    print(f"Sirviendo {len(CATEGORIAS)} categorías en {servidor.url} (Ctrl+C para terminar)")
+    print(f"  ML_BASE_URL={servidor.url} ML_CATEGORIAS={','.join(CATEGORIAS)} python src/scraper_ml_ve.py")
+    try:
+        while True:
+            time.sleep(60)
+            print(json.dumps(servidor.contadores, ensure_ascii=False))
+    except KeyboardInterrupt:
+        servidor.detener()
@@ -0,0 +1,160 @@
+"""Fixtures sintéticos de MercadoLibre Venezuela: listados HTML y raw.csv sin navegador ni red.
+
+Uso: python benchmarks/sinteticos.py --items 10000 --salida /tmp/fixtures [--items-html 1000]
+"""
+import argparse
+import datetime
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+PRODUCTOS = ["Celular", "Licuadora", "Nevera", "Televisor", "Zapatos Deportivos", "Laptop", "Audífonos Inalámbricos",
+             "Cafetera", "Lavadora", "Reloj Inteligente", "Aire Acondicionado", "Colchón Ortopédico", "Bicicleta Montañera",
+             "Cocina a Gas", "Impresora Multifuncional", "Tablet", "Secador de Cabello", "Juego de Sábanas", "Taladro Percutor"]
+MARCAS = ["Samsung", "Oster", "LG", "Xiaomi", "Nike", "HP", "Sony", "Hamilton Beach", "Whirlpool", "Casio",
+          "Adidas", "Lenovo", "Epson", "Black+Decker", "Mabe", "Motorola", "Remington", "Bosch"]
+ATRIBUTOS = ["128GB", "600W", "Negro", "Blanco", "Inverter", "Talla 42", "8GB RAM", "Bluetooth", "12 Tazas", "Digital",
+             "Original", "12000 BTU", "Matrimonial", "Rin 29", "Acero Inoxidable", "4 Hornillas", "Doble Cara", "5G"]
+RUIDO = ["Nuevo", "Oferta", "Envío Gratis", "Garantía", "Tienda Física", "Delivery", "Somos Tienda", "Sellado", "Caracas"]
+CATEGORIAS = ["celulares-telefonos", "electrodomesticos", "computacion", "ropa-zapatos-accesorios", "hogar-muebles", "deportes-fitness"]
+
+TARJETA = """<li class="ui-search-layout__item">
+  <div class="ui-search-result__wrapper">
+    <a class="ui-search-link" href="{link}">
+      <h2 class="ui-search-item__title">{titulo}</h2>
+    </a>
+    <div class="ui-search-price"><span class="andes-money-amount__currency-symbol">Bs.</span><span class="andes-money-amount__fraction">{precio}</span></div>
+    {rating}{ventas}{mensajes}{envio}{oficial}
+  </div>
+</li>
+"""
+
+PAGINA = """<!-- ml-url: {url} -->
+<!DOCTYPE html>
+<html lang="es-VE">
+<head><meta charset="utf-8"><title>Resultados | MercadoLibre Venezuela</title></head>
+<body>
+<main class="ui-search-main"><ol class="ui-search-layout ui-search-layout--grid">
+{tarjetas}</ol></main>
+</body>
+</html>
+"""
+
+def _slug(texto):
+    sin_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", sin_acentos.lower()).strip("-")
+
+def precio_ml(valor):
+    """Precio con el formato de MercadoLibre: punto de miles y coma decimal (1.234,56)"""
+    return f"{valor:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+def generar_productos(n, semilla=42, duplicados=0.3, invalidos=0.02, fecha=None):
+    """Productos como los escribe el scraper en raw.csv.
+
+    Una fracción `duplicados` son otras publicaciones del mismo producto (otro
+    vendedor, palabras de relleno, otro precio) y una fracción `invalidos` trae
+    título vacío o precio cero, como las tarjetas rotas que la limpieza descarta.
+    """
+    rng = np.random.default_rng(semilla)
+    fecha = fecha or datetime.date.today().isoformat()
+
+    bases = max(1, int(n * (1 - duplicados)))
+    modelos = np.char.add(
+        np.char.add(np.array(PRODUCTOS)[rng.integers(0, len(PRODUCTOS), bases)], " "),
+        np.char.add(np.char.add(np.array(MARCAS)[rng.integers(0, len(MARCAS), bases)], " "),
+                    np.array(ATRIBUTOS)[rng.integers(0, len(ATRIBUTOS), bases)])
+    )
+    modelos = np.char.add(np.char.add(modelos, " Modelo "), rng.integers(100, 99999, bases).astype(str))
+    base = np.concatenate([np.arange(bases), rng.integers(0, bases, n - bases)])
+    rng.shuffle(base)
+    titulos = modelos[base].astype(object)
+    con_ruido = rng.random(n) < 0.4
+    titulos[con_ruido] = titulos[con_ruido] + " " + np.array(RUIDO, dtype=object)[rng.integers(0, len(RUIDO), con_ruido.sum())]
+    mayusculas = rng.random(n) < 0.1
+    titulos[mayusculas] = [t.upper() for t in titulos[mayusculas]]
+
+    # Precios en bolívares con cola larga; cada publicación del mismo modelo varía un poco
+    precio_base = np.round(rng.lognormal(6.5, 1.4, bases), 2)
+    precios = np.round(precio_base[base] * rng.uniform(0.9, 1.15, n), 2)
+    mensajes = rng.negative_binomial(1, 0.08, n)
+    ventas = np.minimum(rng.negative_binomial(1, 0.02, n), 5000)
+    ratings = np.where(rng.random(n) < 0.7, np.round(rng.uniform(3.0, 5.0, n), 1), 0.0)
+
+    # IDs únicos de 9 dígitos: uno al azar dentro de cada tramo, en orden mezclado
+    tramo = 900_000_000 // n
+    item_ids = rng.permutation(100_000_000 + np.arange(n) * tramo + rng.integers(0, tramo, n))
+    links = [f"https://articulo.mercadolibre.com.ve/MLV-{i}-{_slug(t)[:60]}-_JM" for i, t in zip(item_ids, titulos)]
+
+    df = pd.DataFrame({
+        "titulo": titulos,
+        "precio": precios,
+        "ventas": ventas,
+        "mensajes": mensajes,
+        "rating": ratings,
+        "envio_gratis": rng.random(n) < 0.45,
+        "tienda_oficial": rng.random(n) < 0.12,
+        "link": links,
+        "fecha": fecha,
+        "item_id": np.char.add("MLV", item_ids.astype(str)),
+        "categoria": np.array(CATEGORIAS)[rng.integers(0, len(CATEGORIAS), n)]
+    })
+    rotos = np.flatnonzero(rng.random(n) < invalidos)
+    df.loc[rotos[::2], "titulo"] = ""
+    df.loc[rotos[1::2], "precio"] = 0.0
+    return df
+
+def tarjeta_html(producto):
+    """Una tarjeta del listado con los selectores de parser_html.SELECTORES"""
+    estrellas = f"{producto.rating:.1f}".replace(".", ",")
+    rating = (f'<span class="ui-search-reviews__rating" aria-label="Calificación {estrellas} de 5 estrellas">{estrellas}</span>'
+              if producto.rating > 0 else "")
+    return TARJETA.format(
+        link=producto.link,
+        titulo=producto.titulo,
+        precio=precio_ml(producto.precio),
+        rating=rating,
+        ventas=f'<span class="ui-search-item__sold-quantity">+{producto.ventas} vendidos</span>' if producto.ventas else "",
+        mensajes=f'<span class="ui-search-item__questions">{producto.mensajes} preguntas</span>' if producto.mensajes else "",
+        envio='<p class="ui-search-shipping">Envío gratis</p>' if producto.envio_gratis else '<p class="ui-search-shipping">Llega mañana</p>',
+        oficial='<p class="ui-search-official-store-label">Tienda oficial</p>' if producto.tienda_oficial else ""
+    )
+
+def paginas_html(df, por_pagina=50):
+    """Listados HTML de `por_pagina` tarjetas por categoría, con el comentario de URL de origen que deja guardar_html"""
+    for categoria, productos in df.groupby("categoria", sort=False):
+        for inicio in range(0, len(productos), por_pagina):
+            bloque = productos.iloc[inicio:inicio + por_pagina]
+            url = f"https://listado.mercadolibre.com.ve/{categoria}/_Desde_{inicio + 1}_OrderId_MSGS"
+            yield PAGINA.format(url=url, tarjetas="".join(tarjeta_html(p) for p in bloque.itertuples(index=False)))
+
+def escribir_fixtures(directorio, n, items_html=None, semilla=42):
+    """Escribe raw.csv con `n` productos y los primeros `items_html` (por defecto todos) como listados en directorio/pages.
+
+    Devuelve (ruta_raw, rutas_html).
+    """
+    os.makedirs(os.path.join(directorio, "pages"), exist_ok=True)
+    df = generar_productos(n, semilla)
+    ruta_raw = os.path.join(directorio, "raw.csv")
+    df.to_csv(ruta_raw, index=False, encoding="utf-8")
+
+    rutas = []
+    for numero, html in enumerate(paginas_html(df.iloc[:items_html]), 1):
+        ruta = os.path.join(directorio, "pages", f"listado_{numero:05d}.html")
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(html)
+        rutas.append(ruta)
+    return ruta_raw, rutas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--salida", default="data/sinteticos")
+    parser.add_argument("--items-html", type=int, default=None, help="Productos que también se escriben como listados HTML (por defecto todos)")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    ruta_raw, rutas = escribir_fixtures(args.salida, args.items, args.items_html, args.semilla)
+    print(f"{args.items} productos en {ruta_raw}, {len(rutas)} listados HTML en {os.path.join(args.salida, 'pages')}")
@@ -0,0 +1,270 @@
+"""Suite de benchmarks de punta a punta sobre fixtures sintéticos, sin navegador ni red.
+
+Mide cada etapa (parseo/extracción, limpieza, clustering TF-IDF+KMeans e incremental, top-k, render,
+sitio y procesar_productos completo) a varios tamaños: tiempo, registros/s y
+memoria pico. Cada medición corre en un proceso hijo con un directorio de
+trabajo vacío, así la memoria es la de la etapa y los modelos o caches en
+disco no pasan de una repetición a otra.
+
+Uso:
+    python benchmarks/suite.py [--tamanos 100 10000 1000000] [--etapas limpiar render]
+    python benchmarks/suite.py --guardar-base            # escribe la línea base
+    python benchmarks/suite.py --comparar [--umbral 0.2] # falla si una etapa empeora más que el umbral
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sinteticos import escribir_fixtures  # noqa: E402
+
+TAMANOS = (100, 10_000, 1_000_000)
+BASE_PATH = os.path.join(os.path.dirname(__file__), "linea_base.json")
+UMBRAL = float(os.environ.get("ML_BENCH_UMBRAL", "0.2"))  # Empeoramiento de tiempo tolerado frente a la base
+UMBRAL_MEMORIA = float(os.environ.get("ML_BENCH_UMBRAL_MEMORIA", "0.5"))
+MINIMO_S = 0.05  # Por debajo de esto el ruido pesa más que la etapa: no se compara
+MINIMO_MB = 20.0
+
+class Fixtures:
+    """Entradas de un tamaño, preparadas una vez en el proceso padre y compartidas por fork"""
+
+    def __init__(self, directorio, n, items_html, items_elementos):
+        from bs4 import BeautifulSoup
+        from ingesta import cargar_limpio
+        from parser_html import SELECTOR_ITEMS
+
+        self.n = n
+        self.raw, self.rutas_html = escribir_fixtures(directorio, n, min(n, items_html))
+        self.limpio, _ = cargar_limpio(self.raw)
+        self.grupos = np.random.default_rng(42).integers(0, 15, len(self.limpio))
+        self.elementos = []
+        for ruta in self.rutas_html:
+            if len(self.elementos) >= items_elementos:
+                break
+            with open(ruta, encoding="utf-8") as f:
+                self.elementos.extend(BeautifulSoup(f.read(), "lxml").select(SELECTOR_ITEMS))
+        self.elementos = self.elementos[:items_elementos]
+
+def etapa_extraer_html(f):
+    from parser_html import parsear_archivos
+    return len(parsear_archivos(f.rutas_html, workers=1))
+
+def etapa_extract_product_data(f):
+    # Sobre nodos de BeautifulSoup: mide la lógica de la extracción, sin el ida y vuelta al navegador
+    from parser_html import ElementoHTML
+    from scraper_ml_ve import extract_product_data
+
+    async def extraer():
+        return [await extract_product_data(ElementoHTML(elemento)) for elemento in f.elementos]
+    return len(asyncio.run(extraer()))
+
+def etapa_limpiar(f):
+    from ingesta import cargar_limpio
+    _, leidas = cargar_limpio(f.raw)
+    return leidas
+
+def etapa_clustering_completo(f):
+    from clustering import asignar_grupos
+    asignar_grupos(f.limpio["titulo"], modo="completo")
+    return len(f.limpio)
+
+def etapa_clustering_incremental(f):
+    from clustering import asignar_grupos
+    asignar_grupos(f.limpio["titulo"], modo="incremental", reentrenar=True, path="modelos/kmeans.joblib",
+                   cache_dir="modelos/cache_features")
+    return len(f.limpio)
+
+def etapa_top_k(f):
+    from ranking import calcular_popularidad, seleccionar_top, mas_barato_por_grupo, top_k_por_grupo
+    df = f.limpio.assign(popularidad=calcular_popularidad(f.limpio), grupo=f.grupos)
+    mas_barato_por_grupo(seleccionar_top(df, 30), "grupo")
+    top_k_por_grupo(df, "categoria", 5)
+    return len(df)
+
+def etapa_render(f):
+    from generar_reporte import generate_success_html
+    generate_success_html(f.limpio, "01/01/2025", "08:00", None)
+    return len(f.limpio)
+
+def etapa_sitio(f):
+    from sitio import publicar_sitio
+    publicar_sitio("docs", f.limpio, "01/01/2025", "08:00")
+    return len(f.limpio)
+
+def etapa_procesar_productos(f):
+    from procesamiento import procesar_productos
+    os.makedirs("data", exist_ok=True)
+    os.symlink(os.path.abspath(f.raw), "data/raw.csv")
+    procesar_productos(guardar_csv=False)
+    return f.n
+
+ETAPAS = {
+    "extraer_html": etapa_extraer_html,
+    "extract_product_data": etapa_extract_product_data,
+    "limpiar": etapa_limpiar,
+    "clustering_completo": etapa_clustering_completo,
+    "clustering_incremental": etapa_clustering_incremental,
+    "top_k": etapa_top_k,
+    "render": etapa_render,
+    "sitio": etapa_sitio,
+    "procesar_productos": etapa_procesar_productos
+}
+
+def _rss_actual_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+def _correr_hijo(etapa, fixtures, conexion):
+    trabajo = tempfile.mkdtemp(prefix=f"bench_{etapa}_")
+    try:
+        os.chdir(trabajo)
+        inicio_mb = _rss_actual_mb()
+        inicio = time.perf_counter()
+        registros = ETAPAS[etapa](fixtures)
+        segundos = time.perf_counter() - inicio
+        pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - inicio_mb
+        conexion.send({"segundos": segundos, "registros": registros, "memoria_pico_mb": max(pico_mb, 0.0)})
+    except Exception as e:
+        conexion.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+
+def medir_etapa(etapa, fixtures, repeticiones):
+    """Mejor tiempo de `repeticiones` corridas, cada una en un proceso hijo recién creado"""
+    contexto = multiprocessing.get_context("fork")
+    mediciones = []
+    for _ in range(repeticiones):
+        recibir, enviar = contexto.Pipe(duplex=False)
+        proceso = contexto.Process(target=_correr_hijo, args=(etapa, fixtures, enviar))
+        proceso.start()
+        enviar.close()
+        try:
+            medicion = recibir.recv()
+        except EOFError:
+            medicion = {"error": f"el proceso terminó con código {proceso.exitcode}"}
+        proceso.join()
+        if "error" in medicion:
+            return medicion
+        mediciones.append(medicion)
+    mejor = min(mediciones, key=lambda m: m["segundos"])
+    mejor["memoria_pico_mb"] = round(max(m["memoria_pico_mb"] for m in mediciones), 1)
+    mejor["registros_por_s"] = round(mejor["registros"] / mejor["segundos"], 1) if mejor["segundos"] > 0 else None
+    mejor["segundos"] = round(mejor["segundos"], 4)
+    return mejor
+
+def _precargar():
+    """Importa en el padre lo que usan las etapas, para que los hijos no midan el costo de importar"""
+    import generar_reporte, ingesta, parser_html, procesamiento, ranking, scraper_ml_ve, sitio  # noqa: F401
+    import sklearn.cluster, sklearn.feature_extraction.text  # noqa: F401
+
+def correr(tamanos, etapas, repeticiones, items_html, items_elementos):
+    _precargar()
+    resultados = {}
+    for n in tamanos:
+        directorio = tempfile.mkdtemp(prefix=f"bench_fixtures_{n}_")
+        try:
+            fixtures = Fixtures(directorio, n, items_html, items_elementos)
+            resultados[str(n)] = {}
+            for etapa in etapas:
+                medicion = medir_etapa(etapa, fixtures, repeticiones)
+                resultados[str(n)][etapa] = medicion
+                imprimir_fila(n, etapa, medicion)
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+    return {
+        "creado": datetime.datetime.now().isoformat(timespec="seconds"),
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "repeticiones": repeticiones,
+        "resultados": resultados
+    }
+
+def imprimir_fila(n, etapa, medicion):
+    if "error" in medicion:
+        print(f"{n:>9} {etapa:<22} error: {medicion['error']}")
+        return
+    por_s = f"{medicion['registros_por_s']:.0f}" if medicion["registros_por_s"] else "-"
+    print(f"{n:>9} {etapa:<22} {medicion['registros']:>9} {medicion['segundos']:>10.3f} {por_s:>13} {medicion['memoria_pico_mb']:>11.1f}")
+
+def comparar(actual, base, umbral=UMBRAL, umbral_memoria=UMBRAL_MEMORIA):
+    """Filas (tamaño, etapa, medida, base, actual, variación, regresión) de las etapas medidas en ambas corridas.
+
+    Una etapa que falló en esta corrida es siempre una regresión, con el mensaje de error como valor actual.
+    """
+    filas = []
+    for tamano, etapas in actual["resultados"].items():
+        for etapa, medicion in etapas.items():
+            previa = base.get("resultados", {}).get(tamano, {}).get(etapa)
+            if "error" in medicion:
+                filas.append((tamano, etapa, "error", None, medicion["error"], None, True))
+                continue
+            if not previa or "error" in previa:
+                continue
+            for medida, limite, minimo in (("segundos", umbral, MINIMO_S), ("memoria_pico_mb", umbral_memoria, MINIMO_MB)):
+                if previa[medida] < minimo:
+                    continue
+                variacion = medicion[medida] / previa[medida] - 1
+                filas.append((tamano, etapa, medida, previa[medida], medicion[medida], variacion, variacion > limite))
+    return filas
+
+def _escribir_json(path, datos):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporal = f"{path}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument("--repeticiones", type=int, default=3, help="Se toma el mejor tiempo")
+    parser.add_argument("--items-html", type=int, default=5_000, help="Productos escritos como HTML para el parseo")
+    parser.add_argument("--items-elementos", type=int, default=2_000, help="Tarjetas para extract_product_data")
+    parser.add_argument("--salida", help="JSON donde guardar los resultados de esta corrida")
+    parser.add_argument("--base", default=BASE_PATH, help="JSON de la línea base")
+    parser.add_argument("--guardar-base", action="store_true", help="Guardar esta corrida como línea base")
+    parser.add_argument("--comparar", action="store_true", help="Comparar con la línea base y fallar si hay regresiones")
+    parser.add_argument("--umbral", type=float, default=UMBRAL)
+    parser.add_argument("--umbral-memoria", type=float, default=UMBRAL_MEMORIA)
+    args = parser.parse_args()
+
+    # Los módulos del pipeline loguean cada paso; acá solo interesa la tabla
+    logging.disable(logging.WARNING)
+    print(f"{'tamaño':>9} {'etapa':<22} {'registros':>9} {'tiempo (s)':>10} {'registros/s':>13} {'pico (MB)':>11}")
+    actual = correr(args.tamanos, args.etapas, args.repeticiones, args.items_html, args.items_elementos)
+
+    if args.salida:
+        _escribir_json(args.salida, actual)
+    if args.guardar_base:
+        _escribir_json(args.base, actual)
+        print(f"Línea base guardada en {args.base}")
+    if args.comparar:
+        try:
+            with open(args.base, encoding="utf-8") as f:
+                base = json.load(f)
+        except FileNotFoundError:
+            sys.exit(f"No hay línea base en {args.base}; generarla con --guardar-base")
+        filas = comparar(actual, base, args.umbral, args.umbral_memoria)
+        print(f"\n{'tamaño':>9} {'etapa':<22} {'medida':<16} {'base':>10} {'actual':>10} {'variación':>10}")
+        for tamano, etapa, medida, previa, valor, variacion, regresion in filas:
+            if medida == "error":
+                print(f"{tamano:>9} {etapa:<22} {medida:<16} {valor}  REGRESIÓN")
+                continue
+            print(f"{tamano:>9} {etapa:<22} {medida:<16} {previa:>10.3f} {valor:>10.3f} {variacion:>+10.0%}" + ("  REGRESIÓN" if regresion else ""))
+        regresiones = sum(fila[-1] for fila in filas)
+        if regresiones:
+            sys.exit(f"{regresiones} regresiones por encima del umbral")
+        print("Sin regresiones")
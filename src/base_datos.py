@@ -0,0 +1,201 @@
+import pandas as pd
+from datetime import datetime, timedelta
+import argparse
+import os
+import sqlite3
+
+from parser_html import ITEM_ID_REGEX
+
+DB_PATH = os.environ.get("ML_SQLITE", "data/ml_venezuela.db")
+
+# Bits de la columna flags
+FLAG_ENVIO_GRATIS = 1
+FLAG_TIENDA_OFICIAL = 2
+
+METRICAS = ("precio", "ventas", "mensajes", "rating")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    item_id TEXT PRIMARY KEY,
+    titulo TEXT,
+    link TEXT,
+    primera_vez TEXT,
+    ultima_vez TEXT
+);
+CREATE TABLE IF NOT EXISTS observations (
+    item_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    precio REAL,
+    ventas INTEGER,
+    mensajes INTEGER,
+    rating REAL,
+    flags INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_observations_item_ts ON observations (item_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_observations_ts ON observations (timestamp);
+CREATE INDEX IF NOT EXISTS idx_observations_precio ON observations (precio);
+"""
+
+def conectar(path=DB_PATH):
+    """Abre la base en modo WAL y crea el esquema si no existe"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(ESQUEMA)
+    return conn
+
+def _preparar(df, timestamp):
+    """Normaliza un DataFrame de productos a las columnas de la base"""
+    df = df.copy()
+    if "item_id" not in df.columns:
+        partes = df["link"].astype(str).str.extract(ITEM_ID_REGEX)
+        df["item_id"] = (partes[0] + partes[1]).fillna("")
+    df = df[df["item_id"].fillna("") != ""].drop_duplicates("item_id")
+
+    if timestamp is None and ("capturado" in df.columns or "fecha" in df.columns):
+        # Cada fila lleva el momento de su captura; los CSV anteriores a esa columna caen a su fecha
+        capturado = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+        for columna in ("capturado", "fecha"):
+            if columna in df.columns:
+                capturado = capturado.fillna(pd.to_datetime(df[columna].astype(str), errors="coerce", format="mixed"))
+        df["timestamp"] = capturado.fillna(pd.Timestamp(datetime.now()).normalize()).dt.strftime("%Y-%m-%d %H:%M:%S")
+    else:
+        df["timestamp"] = (timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+
+    for columna, defecto in [("precio", 0.0), ("ventas", 0), ("mensajes", 0), ("rating", 0.0), ("envio_gratis", False), ("tienda_oficial", False)]:
+        if columna not in df.columns:
+            df[columna] = defecto
+    df["flags"] = (
+        df["envio_gratis"].fillna(False).astype(bool).astype(int) * FLAG_ENVIO_GRATIS +
+        df["tienda_oficial"].fillna(False).astype(bool).astype(int) * FLAG_TIENDA_OFICIAL
+    )
+    return df
+
+def guardar_observaciones(conn, df, timestamp=None):
+    """Inserta en bloque los productos y sus observaciones; devuelve cuántas se escribieron.
+
+    Sin `timestamp` se usa el momento de captura de cada fila (o su fecha en
+    CSV viejos): dos scrapings del mismo día quedan como observaciones
+    distintas y re-procesar los mismos datos reemplaza las suyas.
+    """
+    df = _preparar(df, timestamp)
+    if df.empty:
+        return 0
+
+    productos = list(zip(df["item_id"], df["titulo"].fillna(""), df["link"].fillna("#"), df["timestamp"], df["timestamp"]))
+    observaciones = list(zip(
+        df["item_id"], df["timestamp"],
+        df["precio"].fillna(0.0).astype(float), df["ventas"].fillna(0).astype(int).tolist(),
+        df["mensajes"].fillna(0).astype(int).tolist(), df["rating"].fillna(0.0).astype(float), df["flags"].tolist()
+    ))
+    with conn:
+        conn.executemany(
+            """INSERT INTO products (item_id, titulo, link, primera_vez, ultima_vez) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (item_id) DO UPDATE SET
+                   titulo = excluded.titulo,
+                   link = excluded.link,
+                   primera_vez = MIN(primera_vez, excluded.primera_vez),
+                   ultima_vez = MAX(ultima_vez, excluded.ultima_vez)""",
+            productos
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO observations (item_id, timestamp, precio, ventas, mensajes, rating, flags) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            observaciones
+        )
+    return len(observaciones)
+
+def observaciones_item(conn, item_id):
+    """Todas las observaciones de un item, en orden cronológico"""
+    return pd.read_sql_query(
+        "SELECT * FROM observations WHERE item_id = ? ORDER BY timestamp", conn, params=(item_id,)
+    )
+
+def leer_observaciones(conn, desde=None, hasta=None):
+    """Observaciones con título y link en un rango de fechas (inclusive)"""
+    desde = pd.Timestamp(desde or "1970-01-01").strftime("%Y-%m-%d")
+    hasta = (pd.Timestamp(hasta or datetime.now()) + timedelta(days=1)).strftime("%Y-%m-%d")
+    df = pd.read_sql_query(
+        """SELECT o.*, p.titulo, p.link FROM observations o JOIN products p USING (item_id)
+           WHERE o.timestamp >= ? AND o.timestamp < ? ORDER BY o.timestamp""",
+        conn, params=(desde, hasta)
+    )
+    df["envio_gratis"] = (df["flags"] & FLAG_ENVIO_GRATIS).astype(bool)
+    df["tienda_oficial"] = (df["flags"] & FLAG_TIENDA_OFICIAL).astype(bool)
+    df["fecha"] = pd.to_datetime(df["timestamp"]).dt.normalize()
+    return df
+
+def huella_observaciones(conn, desde=None, hasta=None):
+    """Resumen de las observaciones de un rango para saber si cambiaron sin leerlas"""
+    desde = pd.Timestamp(desde or "1970-01-01").strftime("%Y-%m-%d")
+    hasta = (pd.Timestamp(hasta or datetime.now()) + timedelta(days=1)).strftime("%Y-%m-%d")
+    return list(conn.execute(
+        """SELECT COUNT(*), MAX(timestamp), TOTAL(precio), TOTAL(ventas), TOTAL(mensajes), TOTAL(rating), TOTAL(flags)
+           FROM observations WHERE timestamp >= ? AND timestamp < ?""",
+        (desde, hasta)
+    ).fetchone())
+
+def top_movers(conn, fecha=None, metrica="mensajes", limite=10):
+    """Items cuya métrica más subió en `fecha` (por defecto ayer) respecto del día anterior"""
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica no soportada: {metrica}")
+    dia = pd.Timestamp(fecha or datetime.now() - timedelta(days=1)).normalize()
+    inicio, fin, inicio_previo = (d.strftime("%Y-%m-%d") for d in (dia, dia + timedelta(days=1), dia - timedelta(days=1)))
+    return pd.read_sql_query(
+        f"""WITH dia AS (
+                SELECT item_id, {metrica} AS valor,
+                       ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY timestamp DESC) AS n
+                FROM observations WHERE timestamp >= :inicio AND timestamp < :fin
+            ), previo AS (
+                SELECT item_id, {metrica} AS valor,
+                       ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY timestamp DESC) AS n
+                FROM observations WHERE timestamp >= :inicio_previo AND timestamp < :inicio
+            )
+            SELECT d.item_id, p.titulo, p.link, pr.valor AS anterior, d.valor AS actual, d.valor - pr.valor AS delta
+            FROM dia d
+            JOIN previo pr ON pr.item_id = d.item_id AND pr.n = 1
+            JOIN products p ON p.item_id = d.item_id
+            WHERE d.n = 1
+            ORDER BY delta DESC
+            LIMIT :limite""",
+        conn, params={"inicio": inicio, "fin": fin, "inicio_previo": inicio_previo, "limite": limite}
+    )
+
+def items_en_rango_precio(conn, minimo, maximo, fecha=None):
+    """Items observados en `fecha` (por defecto hoy) con precio entre minimo y maximo"""
+    dia = pd.Timestamp(fecha or datetime.now()).normalize()
+    return pd.read_sql_query(
+        """SELECT o.item_id, p.titulo, p.link, o.precio, o.timestamp FROM observations o JOIN products p USING (item_id)
+           WHERE o.precio BETWEEN ? AND ? AND o.timestamp >= ? AND o.timestamp < ?
+           ORDER BY o.precio""",
+        conn, params=(minimo, maximo, dia.strftime("%Y-%m-%d"), (dia + timedelta(days=1)).strftime("%Y-%m-%d"))
+    )
+
+def importar_csv(conn, paths):
+    """Importa raw.csv/processed.csv existentes usando su captura (o su fecha) como timestamp"""
+    total = 0
+    for path in paths:
+        try:
+            df = pd.read_csv(path, encoding="utf-8")
+        except (FileNotFoundError, pd.errors.EmptyDataError) as e:
+            print(f"⚠️ No se pudo importar {path}: {e}")
+            continue
+        if df.empty:
+            continue
+        timestamp = None if "capturado" in df.columns or "fecha" in df.columns else datetime.fromtimestamp(os.path.getmtime(path))
+        escritas = guardar_observaciones(conn, df, timestamp)
+        print(f"📥 {path}: {escritas} observaciones importadas")
+        total += escritas
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Base SQLite de productos y observaciones")
+    parser.add_argument("--importar", nargs="+", metavar="CSV", help="Importar raw.csv/processed.csv existentes")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    conn = conectar(args.db)
+    if args.importar:
+        total = importar_csv(conn, args.importar)
+        print(f"✅ Importación completada: {total} observaciones en {args.db}")
+    conn.close()
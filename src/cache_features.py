@@ -0,0 +1,132 @@
+import numpy as np
+import scipy.sparse as sp
+import logging
+import os
+from datetime import date
+
+from texto import normalizar_titulo, hash_titulo
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "data/modelos/cache_features"
+MAX_ENTRADAS = int(os.environ.get("ML_CACHE_MAX_ENTRADAS", "500000"))  # Al superarlo se descartan las menos usadas
+
+class CacheFeatures:
+    """Cache en disco de filas dispersas por hash del título normalizado.
+
+    Los índices y valores de todas las filas viven en dos archivos binarios
+    append-only que se leen con np.memmap; un índice ordenado por clave guarda
+    offset, longitud y último día de uso de cada fila.
+    """
+
+    def __init__(self, vectorizador, version, directorio=CACHE_DIR, max_entradas=MAX_ENTRADAS):
+        self.vectorizador = vectorizador
+        self.version = version
+        self.directorio = directorio
+        self.max_entradas = max_entradas
+        self._indices_path = os.path.join(directorio, "indices.bin")
+        self._datos_path = os.path.join(directorio, "datos.bin")
+        self._indice_path = os.path.join(directorio, "indice.npz")
+        os.makedirs(directorio, exist_ok=True)
+        self._cargar()
+
+    def _vaciar(self):
+        self.claves = np.empty(0, dtype=np.uint64)
+        self.offsets = np.empty(0, dtype=np.int64)
+        self.longitudes = np.empty(0, dtype=np.int32)
+        self.ultimo_uso = np.empty(0, dtype=np.int32)
+        for path in (self._indices_path, self._datos_path):
+            open(path, "wb").close()
+
+    def _cargar(self):
+        if not os.path.exists(self._indice_path):
+            self._vaciar()
+            return
+        try:
+            with np.load(self._indice_path) as indice:
+                if str(indice["version"]) != self.version:
+                    logger.info("Configuración del vectorizador cambió: cache de features invalidada")
+                    self._vaciar()
+                    return
+                self.claves = indice["claves"]
+                self.offsets = indice["offsets"]
+                self.longitudes = indice["longitudes"]
+                self.ultimo_uso = indice["ultimo_uso"]
+        except Exception as e:
+            logger.warning(f"Cache de features ilegible, se reconstruye: {str(e)}")
+            self._vaciar()
+
+    def _guardar_indice(self):
+        temporal = f"{self._indice_path}.tmp.npz"
+        np.savez(temporal, version=self.version, claves=self.claves, offsets=self.offsets,
+                 longitudes=self.longitudes, ultimo_uso=self.ultimo_uso)
+        os.replace(temporal, self._indice_path)
+
+    def _leer_filas(self, posiciones):
+        """Arma una matriz CSR con las filas del cache en el orden de `posiciones`"""
+        longitudes = self.longitudes[posiciones].astype(np.int64)
+        indptr = np.concatenate([[0], np.cumsum(longitudes)])
+        total = int(indptr[-1])
+        if total == 0:
+            return sp.csr_matrix((len(posiciones), self.vectorizador.n_features), dtype=np.float64)
+        cursor = np.repeat(self.offsets[posiciones] - indptr[:-1], longitudes) + np.arange(total)
+        indices = np.memmap(self._indices_path, dtype=np.int32, mode="r")[cursor]
+        # Se guardan en float32 pero se devuelven en float64, el tipo que produce el vectorizador
+        datos = np.memmap(self._datos_path, dtype=np.float32, mode="r")[cursor].astype(np.float64)
+        return sp.csr_matrix((datos, indices, indptr), shape=(len(posiciones), self.vectorizador.n_features))
+
+    def _agregar(self, claves, titulos):
+        """Vectoriza los títulos que faltan y los agrega al final de los archivos"""
+        matriz = self.vectorizador.transform(titulos).tocsr()
+        matriz.sort_indices()
+        inicio = os.path.getsize(self._indices_path) // np.dtype(np.int32).itemsize
+        with open(self._indices_path, "ab") as f:
+            f.write(matriz.indices.astype(np.int32).tobytes())
+        with open(self._datos_path, "ab") as f:
+            f.write(matriz.data.astype(np.float32).tobytes())
+
+        claves = np.concatenate([self.claves, claves])
+        orden = np.argsort(claves, kind="stable")
+        self.claves = claves[orden]
+        self.offsets = np.concatenate([self.offsets, inicio + matriz.indptr[:-1].astype(np.int64)])[orden]
+        self.longitudes = np.concatenate([self.longitudes, np.diff(matriz.indptr).astype(np.int32)])[orden]
+        self.ultimo_uso = np.concatenate([self.ultimo_uso, np.zeros(len(titulos), dtype=np.int32)])[orden]
+
+    def _desalojar(self):
+        """Descarta las entradas usadas hace más tiempo y compacta los archivos"""
+        sobrantes = len(self.claves) - self.max_entradas
+        if sobrantes <= 0:
+            return
+        conservar = np.sort(np.argsort(self.ultimo_uso, kind="stable")[sobrantes:])
+        filas = self._leer_filas(conservar)
+        self.claves = self.claves[conservar]
+        self.ultimo_uso = self.ultimo_uso[conservar]
+        self.longitudes = np.diff(filas.indptr).astype(np.int32)
+        self.offsets = filas.indptr[:-1].astype(np.int64)
+        for path, valores in ((self._indices_path, filas.indices.astype(np.int32)), (self._datos_path, filas.data.astype(np.float32))):
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(valores.tobytes())
+            os.replace(f"{path}.tmp", path)
+        logger.info(f"Cache de features: {sobrantes} entradas desalojadas")
+
+    def transformar(self, titulos):
+        """Devuelve la matriz de features de los títulos vectorizando solo los que no están en cache"""
+        titulos = list(titulos)
+        claves = np.fromiter((hash_titulo(t) for t in titulos), dtype=np.uint64, count=len(titulos))
+
+        posiciones = np.minimum(np.searchsorted(self.claves, claves), max(len(self.claves) - 1, 0))
+        aciertos = (self.claves[posiciones] == claves) if len(self.claves) else np.zeros(len(claves), dtype=bool)
+
+        faltantes, primeros = np.unique(claves[~aciertos], return_index=True)
+        if len(faltantes):
+            indices_faltantes = np.flatnonzero(~aciertos)[primeros]
+            self._agregar(faltantes, [normalizar_titulo(titulos[i]) for i in indices_faltantes])
+        logger.info(f"Cache de features: {int(aciertos.sum())} aciertos, {len(claves) - int(aciertos.sum())} fallos")
+
+        posiciones = np.searchsorted(self.claves, claves)
+        self.ultimo_uso[posiciones] = (date.today() - date(1970, 1, 1)).days
+        matriz = self._leer_filas(posiciones)
+
+        self._desalojar()
+        self._guardar_indice()
+        return matriz
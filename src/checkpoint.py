@@ -0,0 +1,96 @@
+import pandas as pd
+import datetime
+import json
+import os
+import shutil
+
+STREAM_DIR = "data/stream"
+TAMANO_LOTE = int(os.environ.get("ML_LOTE_STREAM", "100"))  # Registros en memoria antes de escribir a disco
+
+class EscritorCheckpoint:
+    """Escribe los productos a un JSON Lines append-only por lotes y recuerda qué URLs terminaron.
+
+    Una URL solo se marca como terminada cuando todos sus registros ya están en
+    disco, así que una corrida interrumpida se puede retomar el mismo día
+    saltando las URLs completas.
+    """
+
+    def __init__(self, directorio=STREAM_DIR, tamano_lote=TAMANO_LOTE):
+        self.registros_path = os.path.join(directorio, "registros.jsonl")
+        self.checkpoint_path = os.path.join(directorio, "checkpoint.json")
+        self.tamano_lote = tamano_lote
+        self.fecha = datetime.date.today().isoformat()
+        self.completadas = set()
+        self._buffer = []
+        self._por_confirmar = []
+        os.makedirs(directorio, exist_ok=True)
+        self._retomar()
+
+    def _retomar(self):
+        """Carga el checkpoint del día y descarta registros de URLs que no llegaron a terminar"""
+        if not os.path.exists(self.checkpoint_path):
+            limpiar_stream(os.path.dirname(self.registros_path), recrear=True)
+            return
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            checkpoint = {}
+        if checkpoint.get("fecha") != self.fecha:
+            limpiar_stream(os.path.dirname(self.registros_path), recrear=True)
+            return
+
+        self.completadas = set(checkpoint.get("completadas", []))
+        if os.path.exists(self.registros_path):
+            temporal = f"{self.registros_path}.tmp"
+            with open(self.registros_path, encoding="utf-8") as origen, open(temporal, "w", encoding="utf-8") as destino:
+                for linea in origen:
+                    try:
+                        if json.loads(linea)["_url"] in self.completadas:
+                            destino.write(linea)
+                    except (ValueError, KeyError):
+                        continue  # Línea truncada por una interrupción a mitad de escritura
+            os.replace(temporal, self.registros_path)
+        print(f"♻️ Retomando corrida: {len(self.completadas)} URLs ya completadas")
+
+    def pendientes(self, urls):
+        return [url for url in urls if url not in self.completadas]
+
+    def agregar(self, url, posicion, productos):
+        """Agrega los productos de una URL terminada; escribe a disco al llenar el lote"""
+        self._buffer.extend({**producto, "_url": url, "_posicion": posicion} for producto in productos)
+        self._por_confirmar.append(url)
+        if len(self._buffer) >= self.tamano_lote:
+            self.flush()
+
+    def flush(self):
+        """Escribe el lote pendiente y luego actualiza el checkpoint"""
+        if self._buffer:
+            with open(self.registros_path, "a", encoding="utf-8") as f:
+                for registro in self._buffer:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._buffer = []
+        if self._por_confirmar:
+            self.completadas.update(self._por_confirmar)
+            self._por_confirmar = []
+            temporal = f"{self.checkpoint_path}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump({"fecha": self.fecha, "completadas": sorted(self.completadas)}, f)
+            os.replace(temporal, self.checkpoint_path)
+
+    def consolidar(self, columnas=None):
+        """Une los lotes escritos en un DataFrame en el orden original de las URLs"""
+        self.flush()
+        if not os.path.exists(self.registros_path) or os.path.getsize(self.registros_path) == 0:
+            return pd.DataFrame(columns=columnas)
+        df = pd.read_json(self.registros_path, lines=True, dtype=False, convert_dates=False)
+        df = df.sort_values("_posicion", kind="stable").drop(columns=["_url", "_posicion"])
+        return df.reset_index(drop=True) if columnas is None else df.reindex(columns=columnas).reset_index(drop=True)
+
+def limpiar_stream(directorio=STREAM_DIR, recrear=False):
+    """Borra los lotes y el checkpoint una vez que raw.csv quedó escrito"""
+    shutil.rmtree(directorio, ignore_errors=True)
+    if recrear:
+        os.makedirs(directorio, exist_ok=True)
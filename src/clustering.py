@@ -0,0 +1,112 @@
+import numpy as np
+import joblib
+import logging
+import os
+
+from texto import normalizar_titulo, hash_titulo
+from cache_features import CACHE_DIR, CacheFeatures
+
+logger = logging.getLogger(__name__)
+
+MODELOS_DIR = "data/modelos"
+MODO_CLUSTERING = os.environ.get("ML_CLUSTERING", "incremental")  # "incremental" o "completo" (TF-IDF + KMeans por corrida)
+REENTRENAR = os.environ.get("ML_REENTRENAR", "0") == "1"  # Descarta el modelo persistido y lo vuelve a ajustar
+CACHE_FEATURES = os.environ.get("ML_CACHE_FEATURES", "1") == "1"
+
+STOP_WORDS = ['de', 'en', 'con', 'para', 'y', 'el', 'la', 'los', 'las', 'un', 'una']
+N_FEATURES = 2 ** 14  # Dimensión fija del hashing: no hay vocabulario que reajustar
+N_CLUSTERS = 15
+VERSION_FEATURES = f"hashing-{N_FEATURES}-{'/'.join(STOP_WORDS)}"  # Cambiarla invalida la cache de features
+
+def crear_vectorizador():
+    """HashingVectorizer sobre el título normalizado, la misma forma que usa la clave de la cache"""
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(
+        n_features=N_FEATURES,
+        stop_words=STOP_WORDS,
+        preprocessor=normalizar_titulo,
+        alternate_sign=False,
+        norm='l2'
+    )
+
+def vectorizar_titulos(titulos, directorio=CACHE_DIR):
+    """Features de los títulos, reutilizando la cache en disco si está activa"""
+    if CACHE_FEATURES:
+        return CacheFeatures(crear_vectorizador(), VERSION_FEATURES, directorio).transformar(titulos)
+    return crear_vectorizador().transform(titulos)
+
+def asignar_grupos_completo(titulos):
+    """TF-IDF + KMeans ajustados desde cero con los títulos de esta corrida"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.cluster import KMeans
+
+    vectorizer = TfidfVectorizer(
+        stop_words=STOP_WORDS,
+        max_features=500,
+        lowercase=True,
+        strip_accents='unicode'
+    )
+    tfidf = vectorizer.fit_transform(titulos)
+
+    n_clusters = min(15, max(2, len(titulos) // 2))
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    return kmeans.fit_predict(tfidf)
+
+def cargar_modelo(path):
+    """Carga el MiniBatchKMeans persistido y los hashes de títulos ya aprendidos"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path)
+    except Exception as e:
+        logger.warning(f"Modelo de clustering ilegible, se reentrena: {str(e)}")
+        return None
+
+def guardar_modelo(modelo, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporal = f"{path}.tmp"
+    joblib.dump(modelo, temporal)
+    os.replace(temporal, path)
+
+def asignar_grupos_incremental(titulos, reentrenar=REENTRENAR, path=None, cache_dir=CACHE_DIR):
+    """Asigna grupos estables entre corridas actualizando el modelo solo con títulos nuevos"""
+    from sklearn.cluster import MiniBatchKMeans
+
+    path = path or os.path.join(MODELOS_DIR, "kmeans_incremental.joblib")
+    modelo = None if reentrenar else cargar_modelo(path)
+    matriz = vectorizar_titulos(titulos, cache_dir)
+    hashes = np.fromiter((hash_titulo(t) for t in titulos), dtype=np.uint64, count=len(titulos))
+
+    if modelo is not None and modelo["kmeans"].n_clusters < N_CLUSTERS <= len(titulos):
+        # Un modelo nacido de una corrida chica no puede crecer: con títulos suficientes se reemplaza
+        logger.info(f"Modelo de clustering con {modelo['kmeans'].n_clusters} grupos, se reajusta con {N_CLUSTERS}")
+        modelo = None
+
+    if modelo is None:
+        # El número de grupos queda fijo durante la vida del modelo para que los IDs sean comparables
+        if len(titulos) < N_CLUSTERS:
+            # Con menos títulos que grupos no se persiste: el próximo ajuste usará N_CLUSTERS. La
+            # agrupación provisional sigue la regla del KMeans completo, un grupo cada dos títulos
+            logger.info(f"Solo {len(titulos)} títulos: agrupación provisional sin guardar el modelo")
+            kmeans = MiniBatchKMeans(n_clusters=min(len(titulos), max(2, len(titulos) // 2)), random_state=42, n_init=3, batch_size=1024)
+            return kmeans.fit(matriz).predict(matriz)
+        kmeans = MiniBatchKMeans(n_clusters=N_CLUSTERS, random_state=42, n_init=3, batch_size=1024)
+        kmeans.partial_fit(matriz)
+        modelo = {"kmeans": kmeans, "vistos": np.unique(hashes)}
+        logger.info(f"Modelo de clustering ajustado desde cero con {len(titulos)} títulos")
+    else:
+        nuevos = ~np.isin(hashes, modelo["vistos"])
+        if nuevos.any():
+            modelo["kmeans"].partial_fit(matriz[nuevos])
+            modelo["vistos"] = np.union1d(modelo["vistos"], hashes[nuevos])
+        logger.info(f"Modelo de clustering actualizado con {int(nuevos.sum())} títulos nuevos de {len(titulos)}")
+
+    guardar_modelo(modelo, path)
+    return modelo["kmeans"].predict(matriz)
+
+def asignar_grupos(titulos, modo=MODO_CLUSTERING, reentrenar=REENTRENAR, path=None, cache_dir=CACHE_DIR):
+    """Devuelve el grupo de cada título según el modo de clustering configurado"""
+    titulos = list(titulos)
+    if modo == "completo":
+        return asignar_grupos_completo(titulos)
+    return asignar_grupos_incremental(titulos, reentrenar=reentrenar, path=path, cache_dir=cache_dir)
@@ -0,0 +1,164 @@
+import numpy as np
+import logging
+import os
+
+from texto import normalizar_titulo, hash_titulo
+
+logger = logging.getLogger(__name__)
+
+INDICE_PATH = "data/modelos/minhash_lsh.npz"
+DEDUP = os.environ.get("ML_DEDUP", "1") == "1"
+
+SHINGLE = 4  # Caracteres por shingle; en ASCII un shingle cabe exacto en 32 bits
+NUM_PERM = 64
+BANDAS = 16  # 16 bandas de 4 filas: umbral efectivo de Jaccard ~0.5
+UMBRAL = float(os.environ.get("ML_DEDUP_UMBRAL", "0.7"))  # Jaccard estimado mínimo para considerar duplicado
+PRIMO = np.uint64(4294967311)  # Primo > 2^32 para el hashing universal (a*h + b) mod p
+LOTE = 1024  # Títulos por bloque al calcular firmas
+
+_rng = np.random.default_rng(42)
+_A = _rng.integers(1, 2 ** 31, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 31, NUM_PERM, dtype=np.uint64)
+_COEF_BANDA = _rng.integers(1, 2 ** 63, NUM_PERM // BANDAS, dtype=np.uint64)
+
+def calcular_firmas(titulos):
+    """Firmas MinHash (n x NUM_PERM) de los shingles de caracteres de cada título normalizado"""
+    normalizados = [normalizar_titulo(t).ljust(SHINGLE) for t in titulos]
+    firmas = np.empty((len(normalizados), NUM_PERM), dtype=np.uint64)
+
+    for inicio in range(0, len(normalizados), LOTE):
+        lote = normalizados[inicio:inicio + LOTE]
+        datos = np.frombuffer("".join(lote).encode("ascii"), dtype=np.uint8).astype(np.uint64)
+        longitudes = np.fromiter((len(t) for t in lote), dtype=np.int64, count=len(lote))
+        por_titulo = longitudes - SHINGLE + 1
+        desplazamientos = np.cumsum(por_titulo) - por_titulo
+
+        # Posición en `datos` del primer carácter de cada shingle de todo el lote
+        comienzo_titulo = np.cumsum(longitudes) - longitudes
+        posiciones = np.repeat(comienzo_titulo - desplazamientos, por_titulo) + np.arange(por_titulo.sum())
+        shingles = (datos[posiciones] << 24) | (datos[posiciones + 1] << 16) | (datos[posiciones + 2] << 8) | datos[posiciones + 3]
+
+        permutados = (_A[:, None] * shingles[None, :] + _B[:, None]) % PRIMO
+        firmas[inicio:inicio + len(lote)] = np.minimum.reduceat(permutados, desplazamientos, axis=1).T
+    return firmas
+
+def claves_banda(firmas):
+    """Clave de cada banda (n x BANDAS): combinación de las filas de la banda"""
+    filas = NUM_PERM // BANDAS
+    with np.errstate(over="ignore"):
+        return (firmas.reshape(len(firmas), BANDAS, filas) * _COEF_BANDA).sum(axis=2, dtype=np.uint64)
+
+class IndiceLSH:
+    """Índice LSH de firmas MinHash que asigna un dedup_group a cada título"""
+
+    def __init__(self):
+        self.claves = np.empty(0, dtype=np.uint64)
+        self.firmas = np.empty((0, NUM_PERM), dtype=np.uint64)
+        self.grupos = np.empty(0, dtype=np.int64)
+        self._por_clave = {}
+        self._buckets = [{} for _ in range(BANDAS)]
+
+    @classmethod
+    def cargar(cls, path=INDICE_PATH):
+        indice = cls()
+        if os.path.exists(path):
+            try:
+                with np.load(path) as datos:
+                    indice._agregar(datos["claves"], datos["firmas"], datos["grupos"])
+            except Exception as e:
+                logger.warning(f"Índice de duplicados ilegible, se reconstruye: {str(e)}")
+                return cls()
+        return indice
+
+    def guardar(self, path=INDICE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporal = f"{path}.tmp.npz"
+        np.savez(temporal, claves=self.claves, firmas=self.firmas, grupos=self.grupos)
+        os.replace(temporal, path)
+
+    def _agregar(self, claves, firmas, grupos):
+        base = len(self.claves)
+        self.claves = np.concatenate([self.claves, claves])
+        self.firmas = np.concatenate([self.firmas, firmas])
+        self.grupos = np.concatenate([self.grupos, grupos])
+        representados = set(self.grupos[:base].tolist())
+        for desplazamiento, bandas in enumerate(claves_banda(firmas).tolist()):
+            posicion = base + desplazamiento
+            grupo = int(self.grupos[posicion])
+            self._indexar(posicion, bandas if grupo not in representados else None)
+            representados.add(grupo)
+
+    def _indexar(self, posicion, bandas=None):
+        """Registra la clave exacta; solo el representante de cada grupo entra en los buckets.
+
+        Así cada bucket crece con los productos canónicos y no con cada
+        publicación repetida, y las consultas siguen siendo sublineales.
+        """
+        self._por_clave.setdefault(int(self.claves[posicion]), posicion)
+        if bandas is not None:
+            for banda, valor in enumerate(bandas):
+                self._buckets[banda].setdefault(valor, []).append(posicion)
+
+    def _consultar(self, firma, bandas):
+        """Grupo del candidato más parecido por encima del umbral, o None"""
+        candidatos = set()
+        for banda, valor in enumerate(bandas):
+            candidatos.update(self._buckets[banda].get(valor, ()))
+        if not candidatos:
+            return None
+        candidatos = np.fromiter(candidatos, dtype=np.int64, count=len(candidatos))
+        similitud = (self.firmas[candidatos] == firma).mean(axis=1)
+        mejor = similitud.argmax()
+        return int(self.grupos[candidatos[mejor]]) if similitud[mejor] >= UMBRAL else None
+
+    def asignar(self, titulos):
+        """Devuelve el dedup_group de cada título, agregando al índice los que no conocía"""
+        titulos = list(titulos)
+        claves = np.fromiter((hash_titulo(t) for t in titulos), dtype=np.uint64, count=len(titulos))
+        grupos = np.empty(len(titulos), dtype=np.int64)
+        siguiente = int(self.grupos.max()) + 1 if len(self.grupos) else 0
+
+        # Títulos ya indexados (o repetidos dentro del lote): grupo directo sin consultar
+        pendientes = []
+        repetidos = {}
+        primero_en_lote = {}
+        for i, clave in enumerate(claves.tolist()):
+            posicion = self._por_clave.get(clave)
+            if posicion is not None:
+                grupos[i] = self.grupos[posicion]
+            elif clave in primero_en_lote:
+                repetidos[i] = primero_en_lote[clave]
+            else:
+                primero_en_lote[clave] = i
+                pendientes.append(i)
+
+        if pendientes:
+            firmas = calcular_firmas([titulos[i] for i in pendientes])
+            bandas = claves_banda(firmas).tolist()
+            base = len(self.claves)
+            self.claves = np.concatenate([self.claves, claves[pendientes]])
+            self.firmas = np.concatenate([self.firmas, firmas])
+            self.grupos = np.concatenate([self.grupos, np.full(len(pendientes), -1, dtype=np.int64)])
+            for j, i in enumerate(pendientes):
+                grupo = self._consultar(firmas[j], bandas[j])
+                nuevo = grupo is None
+                if nuevo:
+                    grupo = siguiente
+                    siguiente += 1
+                grupos[i] = self.grupos[base + j] = grupo
+                # Se indexa de inmediato para que los duplicados dentro del mismo lote se encuentren
+                self._indexar(base + j, bandas[j] if nuevo else None)
+
+        for i, primero in repetidos.items():
+            grupos[i] = grupos[primero]
+
+        logger.info(f"Duplicados: {len(pendientes)} títulos nuevos indexados, "
+                    f"{len(np.unique(grupos))} productos canónicos entre {len(titulos)} publicaciones")
+        return grupos
+
+def asignar_dedup_group(titulos, path=INDICE_PATH):
+    """Asigna dedup_group usando (y actualizando) el índice persistido en disco"""
+    indice = IndiceLSH.cargar(path)
+    grupos = indice.asignar(titulos)
+    indice.guardar(path)
+    return grupos
@@ -0,0 +1,83 @@
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pandas as pd
+import datetime
+import glob
+import hashlib
+import os
+
+HISTORICO_DIR = "data/historico"
+
+# Columnas tipadas del snapshot; la fecha va como partición (fecha=YYYY-MM-DD)
+ESQUEMA = pa.schema([
+    ("item_id", pa.string()),
+    ("titulo", pa.string()),
+    ("precio", pa.float64()),
+    ("ventas", pa.int32()),
+    ("mensajes", pa.int32()),
+    ("rating", pa.float32()),
+    ("envio_gratis", pa.bool_()),
+    ("tienda_oficial", pa.bool_()),
+    ("link", pa.string()),
+    ("popularidad", pa.float64()),
+    ("capturado", pa.timestamp("s"))
+])
+PARTICION = ds.partitioning(pa.schema([("fecha", pa.date32())]), flavor="hive")
+
+def id_scrape(df):
+    """Identifica el scraping por su contenido: re-procesar el mismo raw.csv da el mismo id"""
+    columnas = [c for c in ("item_id", "precio", "ventas", "mensajes", "rating", "capturado") if c in df.columns]
+    filas = pd.util.hash_pandas_object(df[columnas].astype(str), index=False).to_numpy()
+    return hashlib.blake2b(filas.tobytes(), digest_size=8).hexdigest()
+
+def guardar_snapshot(df, directorio=HISTORICO_DIR, fecha=None, capturado=None):
+    """Agrega el snapshot limpio de un scraping a la partición de su fecha; re-procesarlo lo reemplaza"""
+    capturado = capturado or datetime.datetime.now().replace(microsecond=0)
+    if fecha is None:
+        fecha = df["fecha"].astype(str).max() if "fecha" in df.columns and not df.empty else capturado.strftime("%Y-%m-%d")
+
+    snapshot = df.reindex(columns=ESQUEMA.names).copy()
+    # Momento de captura de cada fila; `capturado` cubre los raw.csv anteriores a esa columna
+    snapshot["capturado"] = pd.to_datetime(snapshot["capturado"].astype(str), errors="coerce", format="mixed").fillna(pd.Timestamp(capturado))
+    snapshot["item_id"] = snapshot["item_id"].fillna("").astype(str)
+    snapshot["popularidad"] = snapshot["popularidad"].fillna(0.0)
+    tabla = pa.Table.from_pandas(snapshot, schema=ESQUEMA, preserve_index=False)
+
+    # Un archivo por scraping dentro de la partición del día: varios scrapings diarios no se pisan, pero
+    # re-procesar el mismo (o caer al raw.csv de ayer) reescribe su archivo en lugar de contarlo dos veces
+    particion = os.path.join(directorio, f"fecha={fecha}")
+    os.makedirs(particion, exist_ok=True)
+    nombre = f"snapshot_{id_scrape(df)}.parquet"
+    path = os.path.join(particion, nombre)
+    temporal = os.path.join(particion, f".{nombre}.tmp")  # El prefijo "." lo deja fuera del dataset
+    pq.write_table(tabla, temporal, compression="zstd")
+    os.replace(temporal, path)
+    return path
+
+def leer_historico(columnas=None, desde=None, hasta=None, directorio=HISTORICO_DIR):
+    """Lee solo las columnas y el rango de fechas pedidos, podando particiones fuera del rango"""
+    if not os.path.isdir(directorio):
+        return pd.DataFrame(columns=(columnas or ESQUEMA.names) + ["fecha"])
+
+    dataset = ds.dataset(directorio, format="parquet", partitioning=PARTICION, schema=ESQUEMA.append(pa.field("fecha", pa.date32())))
+    filtro = None
+    if desde is not None:
+        filtro = ds.field("fecha") >= pa.scalar(pd.Timestamp(desde).date(), pa.date32())
+    if hasta is not None:
+        condicion = ds.field("fecha") <= pa.scalar(pd.Timestamp(hasta).date(), pa.date32())
+        filtro = condicion if filtro is None else filtro & condicion
+
+    if columnas is not None:
+        columnas = list(dict.fromkeys(list(columnas) + ["fecha"]))
+    return dataset.to_table(columns=columnas, filter=filtro).to_pandas(date_as_object=False)
+
+def huella_historico(desde=None, hasta=None, directorio=HISTORICO_DIR):
+    """Nombre y tamaño de los snapshots del rango: alcanza para saber si cambió sin leerlo, porque no se reescriben"""
+    archivos = []
+    for particion in sorted(glob.glob(os.path.join(directorio, "fecha=*"))):
+        fecha = pd.Timestamp(particion.rsplit("=", 1)[1]).date()
+        if (desde is None or fecha >= pd.Timestamp(desde).date()) and (hasta is None or fecha <= pd.Timestamp(hasta).date()):
+            for path in sorted(glob.glob(os.path.join(particion, "*.parquet"))):
+                archivos.append(f"{os.path.relpath(path, directorio)}:{os.path.getsize(path)}")
+    return archivos
@@ -0,0 +1,86 @@
+import pandas as pd
+import datetime
+import hashlib
+import json
+import os
+
+INDICE_PATH = "data/indice_items.json"
+DELTA_PATH = "data/raw_delta.csv"
+
+# Campos que definen si una publicación cambió (el link y la fecha no cuentan)
+CAMPOS_CONTENIDO = ["titulo", "precio", "ventas", "mensajes", "rating", "envio_gratis", "tienda_oficial"]
+
+def hash_contenido(df):
+    """Hash estable de los campos extraídos de cada fila"""
+    texto = (
+        df["titulo"].astype(str) + "|" +
+        df["precio"].astype(float).map("{:.2f}".format) + "|" +
+        df["ventas"].astype(int).astype(str) + "|" +
+        df["mensajes"].astype(int).astype(str) + "|" +
+        df["rating"].astype(float).map("{:.1f}".format) + "|" +
+        df["envio_gratis"].astype(bool).astype(str) + "|" +
+        df["tienda_oficial"].astype(bool).astype(str)
+    )
+    return texto.map(lambda t: hashlib.sha1(t.encode("utf-8")).hexdigest())
+
+def cargar_indice(path=INDICE_PATH):
+    """Carga el índice item_id -> [hash, último visto]"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Índice de items ilegible, se reconstruye: {e}")
+        return {}
+
+def guardar_indice(indice, path=INDICE_PATH):
+    """Escribe el índice de forma atómica"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporal = f"{path}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(indice, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporal, path)
+
+def aplicar_indice(df, indice, visto=None):
+    """Marca cada publicación como nueva, modificada o vista y actualiza el índice en memoria.
+
+    Devuelve el delta: filas completas para las nuevas y modificadas, y solo
+    item_id/fecha/estado para las que no cambiaron.
+    """
+    visto = visto or datetime.datetime.now().isoformat(timespec="seconds")
+    df = df.copy()
+    df["hash"] = hash_contenido(df)
+
+    # Las publicaciones sin ID no se pueden seguir entre corridas: siempre cuentan como nuevas
+    con_id = df["item_id"] != ""
+    df = pd.concat([df[con_id].drop_duplicates("item_id"), df[~con_id]])
+
+    anteriores = df["item_id"].map(lambda item_id: indice.get(item_id, [None])[0])
+    df["estado"] = "modificado"
+    df.loc[anteriores.isna(), "estado"] = "nuevo"
+    df.loc[anteriores == df["hash"], "estado"] = "visto"
+
+    for item_id, hash_actual in zip(df.loc[con_id, "item_id"], df.loc[con_id, "hash"]):
+        indice[item_id] = [hash_actual, visto]
+
+    # Para las que no cambiaron basta el marcador de "vista"
+    vistos = df["estado"] == "visto"
+    omitidos = CAMPOS_CONTENIDO + ["link"]
+    df = df.drop(columns=["hash"]).astype({columna: object for columna in omitidos})
+    df.loc[vistos, omitidos] = None
+    return df
+
+def registrar_corrida(df, indice_path=INDICE_PATH, delta_path=DELTA_PATH):
+    """Aplica el índice a una corrida y escribe solo los cambios en raw_delta.csv"""
+    indice = cargar_indice(indice_path)
+    delta = aplicar_indice(df, indice)
+    delta.to_csv(delta_path, index=False, encoding="utf-8")
+    guardar_indice(indice, indice_path)
+
+    conteo = delta["estado"].value_counts()
+    print(
+        f"🗂️ Delta: {conteo.get('nuevo', 0)} nuevos, {conteo.get('modificado', 0)} modificados, "
+        f"{conteo.get('visto', 0)} sin cambios ({len(indice)} items en el índice)"
+    )
+    return delta
@@ -0,0 +1,139 @@
+import pandas as pd
+import argparse
+import logging
+import os
+import tracemalloc
+
+from parser_html import CATEGORIA_GENERAL
+
+logger = logging.getLogger(__name__)
+
+RAW_PATH = "data/raw.csv"
+CHUNKSIZE = int(os.environ.get("ML_CHUNKSIZE", "200000"))  # Filas por bloque al leer raw.csv (0 = de una vez)
+USAR_PYARROW = os.environ.get("ML_PYARROW_STRINGS", "1") == "1"
+
+VALORES_FALTANTES = {
+    'ventas': 0,
+    'mensajes': 0,
+    'rating': 0.0,
+    'envio_gratis': False,
+    'tienda_oficial': False,
+    'titulo': '',
+    'precio': 0.0,
+    'categoria': CATEGORIA_GENERAL
+}
+
+def esquema_raw(usar_pyarrow=USAR_PYARROW):
+    """Tipos explícitos de raw.csv; los enteros se leen como float y se reducen tras limpiar los faltantes"""
+    texto = "string[pyarrow]" if usar_pyarrow else "object"
+    return {
+        "titulo": texto,
+        "precio": "float64",
+        "ventas": "float64",
+        "mensajes": "float64",
+        "rating": "float64",  # float32 altera la popularidad (4.7 -> 4.69999...) y con ella los empates
+        "envio_gratis": "boolean",
+        "tienda_oficial": "boolean",
+        "link": texto,
+        "fecha": "category",
+        "item_id": texto,
+        "categoria": texto,
+        "capturado": texto  # Ausente en los raw.csv anteriores; base_datos cae entonces a la fecha
+    }
+
+def limpiar(df):
+    """Rellena faltantes, filtra filas inválidas y reduce los tipos, sin copias intermedias del bloque"""
+    df = df.fillna({columna: valor for columna, valor in VALORES_FALTANTES.items() if columna in df.columns})
+    df = df[
+        (df['titulo'].str.len() > 3) &
+        (df['precio'] > 0) &
+        (df['precio'] < 1000000) &
+        (df['ventas'] >= 0) &
+        (df['mensajes'] >= 0) &
+        (df['rating'].between(0, 5))
+    ]
+    return df.astype({
+        "ventas": "int32",
+        "mensajes": "int32",
+        "envio_gratis": bool,
+        "tienda_oficial": bool
+    })
+
+def limpiar_dataframe(df, usar_pyarrow=USAR_PYARROW):
+    """Aplica el esquema de raw.csv a un DataFrame ya en memoria y lo limpia.
+
+    Devuelve (df_limpio, filas_leidas), igual que cargar_limpio.
+    """
+    esquema = esquema_raw(usar_pyarrow)
+    tipado = df.astype({columna: tipo for columna, tipo in esquema.items() if columna in df.columns and columna != "fecha"})
+    if "fecha" in tipado.columns:
+        tipado["fecha"] = tipado["fecha"].astype(str).astype("category")
+    return limpiar(tipado).reset_index(drop=True), len(df)
+
+def cargar_limpio(path=RAW_PATH, chunksize=CHUNKSIZE, usar_pyarrow=USAR_PYARROW):
+    """Lee raw.csv con esquema explícito limpiando cada bloque mientras se lee.
+
+    Devuelve (df_limpio, filas_leidas). En modo por bloques solo se mantienen
+    en memoria el bloque actual y las filas que sobrevivieron al filtro.
+    """
+    opciones = {"dtype": esquema_raw(usar_pyarrow), "encoding": "utf-8"}
+    if not chunksize:
+        df = pd.read_csv(path, **opciones)
+        return limpiar(df).reset_index(drop=True), len(df)
+
+    partes = []
+    leidas = 0
+    for bloque in pd.read_csv(path, chunksize=chunksize, **opciones):
+        leidas += len(bloque)
+        partes.append(limpiar(bloque))
+    if not partes:
+        return pd.DataFrame(columns=list(opciones["dtype"])), 0
+    df = pd.concat(partes, ignore_index=True)
+    # concat de categorías distintas por bloque vuelve a object
+    if "fecha" in df.columns:
+        df["fecha"] = df["fecha"].astype("category")
+    return df, leidas
+
+def _ruta_original(path):
+    """Ingesta anterior: tipos inferidos, fillna y máscara con .copy()"""
+    df = pd.read_csv(path, encoding='utf-8')
+    df.fillna(VALORES_FALTANTES, inplace=True)
+    return df[
+        (df['titulo'].str.len() > 3) &
+        (df['precio'] > 0) &
+        (df['precio'] < 1000000) &
+        (df['ventas'] >= 0) &
+        (df['mensajes'] >= 0) &
+        (df['rating'].between(0, 5))
+    ].copy()
+
+def comparar_memoria(path=RAW_PATH, chunksize=CHUNKSIZE):
+    """Mide el pico de memoria de la ingesta anterior frente a la tipada por bloques.
+
+    tracemalloc ve las asignaciones de Python y NumPy, no los buffers de Arrow,
+    por eso también se informa el tamaño real del resultado.
+    """
+    resultados = {}
+    for nombre, funcion in [("original", lambda: _ruta_original(path)),
+                            ("tipada", lambda: cargar_limpio(path, chunksize=0)[0]),
+                            ("por_bloques", lambda: cargar_limpio(path, chunksize=chunksize)[0])]:
+        tracemalloc.start()
+        df = funcion()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultados[nombre] = {
+            "pico_mb": pico / 1024 / 1024,
+            "resultado_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
+            "filas": len(df)
+        }
+        logger.info(f"{nombre}: pico {resultados[nombre]['pico_mb']:.1f} MB, "
+                    f"resultado {resultados[nombre]['resultado_mb']:.1f} MB, {len(df)} filas")
+    return resultados
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Ingesta tipada de raw.csv")
+    parser.add_argument("path", nargs="?", default=RAW_PATH)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+    comparar_memoria(args.path, args.chunksize)
@@ -0,0 +1,213 @@
+import contextvars
+import cProfile
+import datetime
+import functools
+import inspect
+import json
+import logging
+import os
+import resource
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+METRICAS_DIR = "data/metricas"
+HISTORIAL_PATH = os.path.join(METRICAS_DIR, "historial.json")
+MAX_HISTORIAL = int(os.environ.get("ML_METRICAS_HISTORIAL", "60"))  # Corridas que se conservan en el historial
+PROFILE = os.environ.get("ML_PROFILE", "0") == "1"  # Vuelca un .prof de cProfile por etapa
+TRACEMALLOC = os.environ.get("ML_TRACEMALLOC", "0") == "1"  # Vuelca las líneas que más memoria asignaron por etapa
+
+CORRIDA_ID = os.environ.get("ML_CORRIDA_ID") or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+_corrida = {"id": CORRIDA_ID, "inicio": datetime.datetime.now().isoformat(timespec="seconds"), "etapas": {}}
+_activas = contextvars.ContextVar("medir_activas", default=())
+_perfilando = False
+
+def _rss_pico_mb(quien=resource.RUSAGE_SELF):
+    # ru_maxrss está en KB en Linux y es el pico desde que arrancó el proceso, no el de una etapa
+    return resource.getrusage(quien).ru_maxrss / 1024
+
+def _rss_actual_mb():
+    """RSS actual del proceso según /proc/self/statm; None donde no existe (macOS, Windows)"""
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+class medir:
+    """Mide tiempo de pared, CPU, variación de RSS y contadores de una etapa.
+
+    Se usa como context manager o como decorador de funciones normales y
+    async. Las llamadas repetidas a la misma etapa se acumulan. Con
+    guardar=True, al salir se reescribe el JSON de la corrida y el historial.
+    `registros` recibe el resultado de la función decorada y devuelve cuántos
+    registros procesó.
+
+    rss_delta_mb es lo que creció el RSS durante la etapa (aproximado si otras
+    etapas corren a la vez en el mismo proceso); rss_pico_proceso_mb y
+    rss_pico_hijos_mb son los picos del proceso y de sus hijos desde el
+    arranque, no de la etapa. Los contadores y etapas medidos dentro de los
+    workers de un ProcessPoolExecutor quedan en esos procesos y no se suman
+    a la corrida.
+    """
+
+    def __init__(self, etapa, registros=None, guardar=True, perfilar=True):
+        self.etapa = etapa
+        self.registros = registros
+        self.guardar = guardar
+        self.perfilar = perfilar
+        self.contadores = {}
+
+    def contar(self, nombre, cantidad=1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def __enter__(self):
+        global _perfilando
+        self.contadores = {}
+        self._perfil = None
+        self._tracemalloc = False
+        if self.perfilar and PROFILE and not _perfilando:
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+            _perfilando = True
+        if self.perfilar and TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc = True
+        self._token = _activas.set(_activas.get() + (self,))
+        self._inicio = time.perf_counter()
+        self._cpu = time.process_time()
+        self._rss = _rss_actual_mb()
+        return self
+
+    def __exit__(self, *exc):
+        global _perfilando
+        pared = time.perf_counter() - self._inicio
+        cpu = time.process_time() - self._cpu
+        rss = _rss_actual_mb()
+        rss_delta = rss - self._rss if rss is not None and self._rss is not None else None
+        _activas.reset(self._token)
+        if self._perfil is not None:
+            self._perfil.disable()
+            _perfilando = False
+            self._perfil.dump_stats(self._ruta("prof"))
+        if self._tracemalloc:
+            lineas = tracemalloc.take_snapshot().statistics("lineno")[:25]
+            tracemalloc.stop()
+            with open(self._ruta("txt"), "w", encoding="utf-8") as f:
+                f.write("\n".join(str(linea) for linea in lineas))
+        self._acumular(pared, cpu, rss_delta)
+        return False
+
+    def __call__(self, funcion):
+        if inspect.iscoroutinefunction(funcion):
+            @functools.wraps(funcion)
+            async def envoltura(*args, **kwargs):
+                with medir(self.etapa, guardar=self.guardar, perfilar=self.perfilar) as medicion:
+                    resultado = await funcion(*args, **kwargs)
+                    medicion._contar_resultado(self.registros, resultado)
+                    return resultado
+        else:
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with medir(self.etapa, guardar=self.guardar, perfilar=self.perfilar) as medicion:
+                    resultado = funcion(*args, **kwargs)
+                    medicion._contar_resultado(self.registros, resultado)
+                    return resultado
+        return envoltura
+
+    def _contar_resultado(self, registros, resultado):
+        if registros is not None and resultado is not None:
+            self.contar("registros", registros(resultado))
+
+    def _ruta(self, extension):
+        os.makedirs(METRICAS_DIR, exist_ok=True)
+        return os.path.join(METRICAS_DIR, f"{CORRIDA_ID}_{self.etapa}.{extension}")
+
+    def _acumular(self, pared, cpu, rss_delta=None):
+        etapa = _corrida["etapas"].setdefault(self.etapa, {"llamadas": 0, "pared_s": 0.0, "cpu_s": 0.0, "contadores": {}})
+        etapa["llamadas"] += 1
+        etapa["pared_s"] += pared
+        etapa["cpu_s"] += cpu
+        if rss_delta is not None:
+            etapa["rss_delta_mb"] = round(etapa.get("rss_delta_mb", 0.0) + rss_delta, 1)
+        etapa["rss_pico_proceso_mb"] = round(_rss_pico_mb(), 1)
+        etapa["rss_pico_hijos_mb"] = round(_rss_pico_mb(resource.RUSAGE_CHILDREN), 1)
+        for nombre, cantidad in self.contadores.items():
+            etapa["contadores"][nombre] = etapa["contadores"].get(nombre, 0) + cantidad
+        registros = etapa["contadores"].get("registros")
+        if registros is not None and etapa["pared_s"] > 0:
+            etapa["registros_por_s"] = round(registros / etapa["pared_s"], 1)
+
+        if self.guardar:
+            logger.info(f"⏱️ {self.etapa}: {pared:.2f}s pared, {cpu:.2f}s CPU"
+                        + (f", RSS {rss_delta:+.0f} MB" if rss_delta is not None else "")
+                        + f", RSS pico del proceso {etapa['rss_pico_proceso_mb']:.0f} MB"
+                        + (f", {etapa['registros_por_s']} registros/s" if "registros_por_s" in etapa else ""))
+            try:
+                guardar_corrida()
+            except Exception as e:
+                logger.warning(f"No se pudieron guardar las métricas: {str(e)}")
+
+def contar(nombre, cantidad=1):
+    """Suma a un contador de la etapa medida más interna; sin etapa activa no hace nada"""
+    activas = _activas.get()
+    if activas:
+        activas[-1].contar(nombre, cantidad)
+
+def _escribir_json(path, datos):
+    temporal = f"{path}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, path)
+
+def cargar_historial(path=HISTORIAL_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+def guardar_corrida(directorio=METRICAS_DIR):
+    """Escribe las métricas de esta corrida y la reemplaza (o agrega) en el historial acotado"""
+    os.makedirs(directorio, exist_ok=True)
+    _escribir_json(os.path.join(directorio, f"corrida_{CORRIDA_ID}.json"), _corrida)
+    historial_path = os.path.join(directorio, os.path.basename(HISTORIAL_PATH))
+    historial = [c for c in cargar_historial(historial_path) if c.get("id") != CORRIDA_ID]
+    historial.append({"id": CORRIDA_ID, "inicio": _corrida["inicio"], "etapas": {
+        nombre: {k: v for k, v in etapa.items() if k != "contadores"} | {"registros": etapa["contadores"].get("registros")}
+        for nombre, etapa in _corrida["etapas"].items()
+    }})
+    _escribir_json(historial_path, historial[-MAX_HISTORIAL:])
+
+def comparar(historial=None, corridas=7):
+    """Tiempo de pared de la última corrida por etapa frente a la mediana de las anteriores"""
+    historial = cargar_historial() if historial is None else historial
+    if not historial:
+        return []
+    ultima, previas = historial[-1], historial[-1 - corridas:-1]
+    filas = []
+    for etapa, datos in ultima["etapas"].items():
+        anteriores = sorted(c["etapas"][etapa]["pared_s"] for c in previas if etapa in c["etapas"])
+        mediana = anteriores[len(anteriores) // 2] if anteriores else None
+        filas.append({
+            "etapa": etapa,
+            "pared_s": datos["pared_s"],
+            "mediana_previa_s": mediana,
+            "variacion": datos["pared_s"] / mediana - 1 if mediana else None,
+            "registros_por_s": datos.get("registros_por_s")
+        })
+    return filas
+
+if __name__ == "__main__":
+    filas = comparar()
+    if not filas:
+        print("Sin métricas registradas")
+    else:
+        print(f"{'etapa':<28} {'pared (s)':>10} {'mediana previa (s)':>19} {'variación':>10} {'registros/s':>12}")
+        for f in filas:
+            mediana = f"{f['mediana_previa_s']:.2f}" if f["mediana_previa_s"] is not None else "-"
+            variacion = f"{f['variacion']:+.0%}" if f["variacion"] is not None else "-"
+            por_s = f"{f['registros_por_s']:.0f}" if f["registros_por_s"] is not None else "-"
+            print(f"{f['etapa']:<28} {f['pared_s']:>10.2f} {mediana:>19} {variacion:>10} {por_s:>12}")
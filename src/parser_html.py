@@ -0,0 +1,160 @@
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import datetime
+import glob
+import os
+import re
+from urllib.parse import urlparse
+
+COLUMNAS = ["titulo", "precio", "ventas", "mensajes", "rating", "envio_gratis", "tienda_oficial", "link", "fecha", "item_id", "categoria", "capturado"]
+CATEGORIA_GENERAL = "general"  # Listado raíz, sin slug de categoría
+FORMATO_CAPTURADO = "%Y-%m-%d %H:%M:%S"  # Momento de la captura; fecha queda solo para agrupar por día
+
+# ID canónico de la publicación (MLV-123456789 o /p/MLV123456789), sin el ruido de tracking del link
+ITEM_ID_REGEX = r"(MLV)-?(\d+)"
+
+# Comentario con la URL de origen al inicio de las páginas guardadas, para recuperar su categoría
+URL_ORIGEN_REGEX = r"<!-- ml-url: (\S+) -->"
+
+# Selectores actualizados (Junio 2024), compartidos por todas las rutas de extracción
+SELECTOR_ITEMS = ".ui-search-layout__item, .andes-card"
+SELECTORES = {
+    "titulo": ".ui-search-item__title, .ui-search-item__group__element",
+    "precio": ".andes-money-amount__fraction, .price-tag-fraction",
+    "mensajes": ".ui-search-item__questions, .ui-search-item__action--question",
+    "ventas": ".ui-search-item__sold-quantity",
+    "rating": ".ui-search-reviews__rating",
+    "envio": ".ui-search-shipping",
+    "oficial": ".ui-search-official-store-label",
+    "link": "a.ui-search-link"
+}
+
+def extraer_item_id(link):
+    """Devuelve el ID canónico MLV de un link de producto, o cadena vacía si no lo tiene"""
+    match = re.search(ITEM_ID_REGEX, link or "")
+    return f"{match.group(1)}{match.group(2)}" if match else ""
+
+def categoria_de_url(url):
+    """Slug de la categoría de una URL de listado, sin los segmentos de paginación y orden"""
+    partes = [p for p in urlparse(url or "").path.split("/") if p and not p.startswith("_")]
+    slug = re.sub(r"[^a-z0-9]+", "-", "-".join(partes).lower()).strip("-")
+    return slug or CATEGORIA_GENERAL
+
+class ElementoHTML:
+    """Lo que extract_product_data usa de un ElementHandle de Playwright, sobre un nodo de BeautifulSoup.
+
+    Permite correr la extracción por elemento sin navegador (benchmarks y
+    pruebas); no incluye el costo de ida y vuelta de cada query_selector.
+    """
+
+    def __init__(self, nodo):
+        self.nodo = nodo
+
+    async def query_selector(self, selector):
+        nodo = self.nodo.select_one(selector)
+        return ElementoHTML(nodo) if nodo is not None else None
+
+    async def text_content(self):
+        return self.nodo.get_text()
+
+    async def get_attribute(self, nombre):
+        return self.nodo.get(nombre)
+
+def extraer_registros_html(html):
+    """Extrae los textos crudos de cada tarjeta de un HTML de listado ya renderizado"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "lxml")
+    registros = []
+    for item in soup.select(SELECTOR_ITEMS):
+        def texto(clave):
+            elem = item.select_one(SELECTORES[clave])
+            return elem.get_text() if elem else None
+
+        def atributo(clave, nombre):
+            elem = item.select_one(SELECTORES[clave])
+            return elem.get(nombre) if elem else None
+
+        registros.append({
+            "titulo": texto("titulo"),
+            "precio": texto("precio"),
+            "mensajes": texto("mensajes"),
+            "ventas": texto("ventas"),
+            "rating": atributo("rating", "aria-label"),
+            "envio": texto("envio"),
+            "oficial": item.select_one(SELECTORES["oficial"]) is not None,
+            "link": atributo("link", "href")
+        })
+    return registros
+
+def normalizar_registros(registros, fecha=None, categoria=None, capturado=None):
+    """Convierte los textos crudos de las tarjetas al esquema de extract_product_data"""
+    crudo = pd.DataFrame(registros, columns=list(SELECTORES), dtype=object)
+    df = pd.DataFrame(index=crudo.index)
+
+    df["titulo"] = crudo["titulo"].fillna("").astype(str).str.strip()
+
+    precio = (
+        crudo["precio"].fillna("").astype(str).str.strip()
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+    df["precio"] = pd.to_numeric(precio, errors="coerce").fillna(0.0).astype(float)
+
+    # Primer número del texto, igual que re.findall(r"\d+", ...)[0]
+    for columna in ["ventas", "mensajes"]:
+        numeros = crudo[columna].fillna("").astype(str).str.extract(r"(\d+)", expand=False)
+        df[columna] = pd.to_numeric(numeros, errors="coerce").fillna(0).astype(int)
+
+    rating = crudo["rating"].fillna("").astype(str).str.extract(r"(\d+[.,]\d+)", expand=False)
+    df["rating"] = pd.to_numeric(rating.str.replace(",", ".", regex=False), errors="coerce").fillna(0.0).astype(float)
+
+    df["envio_gratis"] = crudo["envio"].fillna("").astype(str).str.lower().str.contains("gratis", regex=False)
+    df["tienda_oficial"] = crudo["oficial"].fillna(False).astype(bool)
+
+    href = crudo["link"].fillna("").astype(str)
+    df["link"] = href.where(href.str.startswith("http"), "https://mercadolibre.com.ve" + href).where(href != "", "#")
+
+    capturado = capturado or datetime.datetime.now()
+    df["fecha"] = fecha or capturado.strftime("%Y-%m-%d")
+
+    partes_id = df["link"].str.extract(ITEM_ID_REGEX)
+    df["item_id"] = (partes_id[0] + partes_id[1]).fillna("")
+    df["categoria"] = categoria or CATEGORIA_GENERAL
+    df["capturado"] = capturado.strftime(FORMATO_CAPTURADO)
+    return df[COLUMNAS]
+
+def filtrar_validos(df):
+    """Descarta tarjetas sin título o sin precio, igual que el scraper en vivo"""
+    return df[(df["titulo"] != "") & (df["precio"] > 0)]
+
+def extraer_productos_html(html, fecha=None, categoria=None, capturado=None):
+    """Parsea un HTML de listado y devuelve los productos válidos como DataFrame"""
+    return filtrar_validos(normalizar_registros(extraer_registros_html(html), fecha, categoria, capturado))
+
+def _parsear_archivo(ruta):
+    """Parsea una página guardada usando su fecha de modificación como momento de la captura"""
+    capturado = datetime.datetime.fromtimestamp(int(os.path.getmtime(ruta)))
+    with open(ruta, encoding="utf-8") as f:
+        html = f.read()
+    origen = re.match(URL_ORIGEN_REGEX, html)
+    return extraer_productos_html(html, categoria=categoria_de_url(origen.group(1)) if origen else None, capturado=capturado)
+
+def expandir_rutas(patrones):
+    """Expande patrones glob conservando el orden y sin repetir archivos"""
+    rutas = []
+    for patron in patrones:
+        for ruta in sorted(glob.glob(patron)) or [patron]:
+            if ruta not in rutas and os.path.isfile(ruta):
+                rutas.append(ruta)
+    return rutas
+
+def parsear_archivos(rutas, workers=None):
+    """Parsea lotes de páginas guardadas repartiéndolas en un pool de procesos"""
+    if not rutas:
+        return pd.DataFrame(columns=COLUMNAS)
+    if workers == 1 or len(rutas) == 1:
+        partes = [_parsear_archivo(ruta) for ruta in rutas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partes = list(executor.map(_parsear_archivo, rutas, chunksize=max(1, len(rutas) // 32)))
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,74 @@
+"""Corre scraping, procesamiento y reporte en un solo proceso pasando DataFrames en memoria.
+
+Uso: python src/pipeline.py [--stage scrape|process|report|all] [--checkpoints] [--force]
+
+Cada etapa suelta lee y escribe sus archivos como siempre (raw.csv,
+processed.csv). En --stage all los CSV intermedios solo se escriben con
+--checkpoints. Los módulos de cada etapa se importan recién al correrla, así
+--stage report no carga playwright ni sklearn. El reporte no se vuelve a
+publicar si sus entradas no cambiaron, salvo con --force.
+"""
+import argparse
+import logging
+import os
+
+from metricas import medir
+
+logger = logging.getLogger(__name__)
+
+ETAPAS = ("scrape", "process", "report", "all")
+CHECKPOINTS = os.environ.get("ML_CHECKPOINTS", "0") == "1"  # Escribe raw.csv y processed.csv también en --stage all
+LIMITE_SCRAPE = float(os.environ.get("ML_LIMITE_SCRAPE", "480"))  # Segundos de scraping en --stage all; al vencer sigue con lo parcial (0 = sin límite)
+
+def etapa_scrape(guardar_csv=True, replay=None, workers=None, limite=None):
+    from scraper_ml_ve import ejecutar_scraping
+    return ejecutar_scraping(replay, workers, guardar_csv=guardar_csv, limite=limite)
+
+def etapa_process(df=None, guardar_csv=True):
+    from procesamiento import procesar_productos
+    return procesar_productos(df, guardar_csv=guardar_csv)
+
+def etapa_report(df=None, forzar=False):
+    from generar_reporte import crear_reporte_html
+    crear_reporte_html(df, forzar)
+
+def _cronometrar(nombre, funcion, *args, **kwargs):
+    with medir(f"pipeline_{nombre}", perfilar=False):
+        return funcion(*args, **kwargs)
+
+def ejecutar(etapa="all", checkpoints=CHECKPOINTS, replay=None, workers=None, forzar=False, limite_scrape=LIMITE_SCRAPE):
+    """Corre una etapa suelta o las tres encadenadas"""
+    if etapa == "scrape":
+        return _cronometrar("scrape", etapa_scrape, True, replay, workers)
+    if etapa == "process":
+        return _cronometrar("process", etapa_process)
+    if etapa == "report":
+        return _cronometrar("report", etapa_report, None, forzar)
+
+    # El scraping se corta al agotar su límite y sigue con lo parcial: un navegador colgado no puede
+    # consumir el timeout del job. Solo si falla o no trae nada se procesa el último raw.csv
+    try:
+        crudo = _cronometrar("scrape", etapa_scrape, checkpoints, replay, workers, limite_scrape or None)
+    except Exception as e:
+        logger.error(f"Scraping falló, se usa data/raw.csv: {str(e)}")
+        crudo = None
+    if crudo is not None and crudo.empty:
+        logger.warning("El scraping no trajo productos, se usa data/raw.csv")
+        crudo = None
+
+    procesado = _cronometrar("process", etapa_process, crudo, checkpoints)
+    # Sin productos nuevos el reporte usa el último processed.csv, igual que antes
+    _cronometrar("report", etapa_report, procesado if procesado is not None and not procesado.empty else None, forzar)
+    return procesado
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Pipeline de MercadoLibre Venezuela en un solo proceso")
+    parser.add_argument("--stage", choices=ETAPAS, default="all")
+    parser.add_argument("--checkpoints", action="store_true", default=CHECKPOINTS, help="Escribir raw.csv y processed.csv entre etapas")
+    parser.add_argument("--replay", nargs="+", metavar="HTML", help="Re-parsear páginas guardadas en lugar de navegar")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para el re-parseo")
+    parser.add_argument("--force", action="store_true", help="Publicar el reporte aunque sus entradas no hayan cambiado")
+    args = parser.parse_args()
+
+    ejecutar(args.stage, args.checkpoints, args.replay, args.workers, args.force)
@@ -0,0 +1,175 @@
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import time
+
+from metricas import contar
+
+class BloqueoDetectado(Exception):
+    """La página devolvió un captcha, un 403/429 u otra señal de bloqueo; `espera` viene del Retry-After"""
+
+    def __init__(self, mensaje, espera=None):
+        super().__init__(mensaje)
+        self.espera = espera
+
+def segundos_retry_after(valor):
+    """Segundos a esperar según un encabezado Retry-After (segundos o fecha HTTP); None si no se entiende"""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (fecha - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+class TokenBucket:
+    """Limita la tasa de navegaciones: `tasa` por segundo con ráfagas de hasta `capacidad`"""
+
+    def __init__(self, tasa, capacidad=1):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = capacidad
+        self._ultimo = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def adquirir(self):
+        async with self._lock:
+            while True:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.tasa)
+
+class CircuitBreaker:
+    """Pausa toda la corrida tras varios bloqueos seguidos y la corta si se repiten demasiado"""
+
+    def __init__(self, umbral, pausa, max_aperturas):
+        self.umbral = umbral
+        self.pausa = pausa
+        self.max_aperturas = max_aperturas
+        self.bloqueos_seguidos = 0
+        self.aperturas = 0
+        self._abierto_hasta = 0.0
+
+    @property
+    def agotado(self):
+        return self.aperturas > self.max_aperturas
+
+    async def esperar(self):
+        espera = self._abierto_hasta - time.monotonic()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+    def exito(self):
+        self.bloqueos_seguidos = 0
+
+    def bloqueo(self):
+        self.bloqueos_seguidos += 1
+        if self.bloqueos_seguidos >= self.umbral and time.monotonic() >= self._abierto_hasta:
+            self.aperturas += 1
+            self.bloqueos_seguidos = 0
+            self._abierto_hasta = time.monotonic() + self.pausa
+            if self.agotado:
+                print(f"🛑 Circuito abierto {self.aperturas} veces: se detiene la corrida")
+            else:
+                print(f"🛑 {self.umbral} bloqueos seguidos: pausando la corrida {self.pausa:.0f}s")
+
+class Planificador:
+    """Envuelve cada navegación con rate limit por host, reintentos con backoff y circuit breaker"""
+
+    def __init__(self, tasa_host, rafaga_host=1, max_reintentos=3, backoff_base=2.0, backoff_max=60.0,
+                 umbral_bloqueos=3, pausa_bloqueo=120.0, max_aperturas=2):
+        self.tasa_host = tasa_host
+        self.rafaga_host = rafaga_host
+        self.max_reintentos = max_reintentos
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(umbral_bloqueos, pausa_bloqueo, max_aperturas)
+        self.dead_letter = []
+        self._buckets = {}
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.tasa_host, self.rafaga_host)
+        return self._buckets[host]
+
+    def backoff(self, intento):
+        """Backoff exponencial con jitter completo"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** intento))
+
+    async def ejecutar(self, url, funcion):
+        """Ejecuta `funcion()` para la URL; si se agotan los reintentos la manda al dead-letter y devuelve None"""
+        for intento in range(self.max_reintentos + 1):
+            retry_after = None
+            if self.breaker.agotado:
+                break
+            inicio_espera = time.monotonic()
+            await self.breaker.esperar()
+            await self._bucket(url).adquirir()
+            contar("espera_limite_s", time.monotonic() - inicio_espera)
+            try:
+                resultado = await funcion()
+                self.breaker.exito()
+                return resultado
+            except BloqueoDetectado as e:
+                print(f"🚧 Bloqueo en {url}: {e}")
+                contar("bloqueos")
+                self.breaker.bloqueo()
+                retry_after = e.espera
+            except Exception as e:
+                print(f"⚠️ Intento {intento + 1} fallido para {url}: {e}")
+            if retry_after is not None and retry_after > self.backoff_max:
+                # Un Retry-After más largo que el backoff máximo dejaría al worker dormido: va al dead-letter
+                print(f"📮 {url} pide esperar {retry_after:.0f}s: se deja para la próxima corrida")
+                break
+            if intento < self.max_reintentos:
+                # El Retry-After del servidor manda sobre el backoff genérico
+                espera = retry_after if retry_after is not None else self.backoff(intento)
+                contar("reintentos")
+                contar("espera_backoff_s", espera)
+                await asyncio.sleep(espera)
+
+        self.dead_letter.append(url)
+        return None
+
+    def tomar_dead_letter(self):
+        """Devuelve y vacía la lista de URLs fallidas"""
+        urls, self.dead_letter = self.dead_letter, []
+        return urls
+
+    @staticmethod
+    def cargar_dead_letter(path):
+        """URLs que quedaron sin completar en la corrida anterior, para volver a encolarlas"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                urls = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Dead-letter ilegible en {path}: {e}")
+            return []
+        return [url for url in urls if isinstance(url, str)]
+
+    def guardar_dead_letter(self, path):
+        """Persiste las URLs que siguieron fallando para la próxima corrida"""
+        if not self.dead_letter:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.dead_letter, f, ensure_ascii=False, indent=2)
+        print(f"📮 {len(self.dead_letter)} URLs sin completar guardadas en {path}")
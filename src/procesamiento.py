@@ -1,119 +1,163 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+from clustering import MODELOS_DIR, asignar_grupos
+from cache_features import CACHE_DIR
+from duplicados import DEDUP, INDICE_PATH, asignar_dedup_group
+from historico import guardar_snapshot
+from ingesta import cargar_limpio, limpiar_dataframe
+from ranking import calcular_popularidad, seleccionar_top, mas_barato_por_grupo
+from parser_html import CATEGORIA_GENERAL
+from metricas import medir, contar
+import base_datos
 import os
+from concurrent.futures import ProcessPoolExecutor
 import logging
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def procesar_productos():
-    logger.info("Iniciando procesamiento de datos...")
-    os.makedirs("data", exist_ok=True)
-    
-    try:
-        df = pd.read_csv("data/raw.csv", encoding='utf-8')
-        logger.info(f"Datos cargados: {len(df)} registros")
-    except Exception as e:
-        logger.error(f"Error leyendo raw.csv: {str(e)}")
-        return pd.DataFrame()
-    
-    if df.empty:
-        logger.warning("DataFrame vacío. No hay datos para procesar.")
-        return pd.DataFrame()
-    
-    # Manejo de valores faltantes
-    df.fillna({
-        'ventas': 0,
-        'mensajes': 0,
-        'rating': 0.0,
-        'envio_gratis': False,
-        'tienda_oficial': False,
-        'titulo': '',
-        'precio': 0.0
-    }, inplace=True)
-    
-    # Validar y limpiar datos
-    df = df[
-        (df['titulo'].str.len() > 3) & 
-        (df['precio'] > 0) &
-        (df['precio'] < 1000000) &
-        (df['ventas'] >= 0) &
-        (df['mensajes'] >= 0) &
-        (df['rating'].between(0, 5))
-    ].copy()  # Agregar .copy() para evitar warnings
-    
-    if df.empty:
-        logger.warning("No quedan productos válidos después de la limpieza")
-        return pd.DataFrame()
-    
-    logger.info(f"Productos válidos: {len(df)}")
-    
-    # Calcular popularidad con pesos ajustados
-    df['popularidad'] = (
-        (df['mensajes'] * 0.8) +  # Mayor peso a los mensajes
-        (df['ventas'] * 0.5) + 
-        (df['rating'] * 20) +
-        (df['envio_gratis'].astype(int) * 15) +
-        (df['tienda_oficial'].astype(int) * 10)
-    )
+WORKERS_CATEGORIAS = int(os.environ.get("ML_WORKERS_CATEGORIAS", "0"))  # Procesos para las categorías (0 = un núcleo por categoría)
+
+def _ruta_categoria(path, categoria):
+    """Modelo/índice propio de cada categoría; la general conserva las rutas de siempre"""
+    if categoria == CATEGORIA_GENERAL:
+        return path
+    base, extension = os.path.splitext(path)
+    return f"{base}_{categoria}{extension}"
+
+def seleccionar_productos(df, categoria=CATEGORIA_GENERAL):
+    """Deduplica, agrupa y elige el top 5 de una categoría; corre en un proceso del pool"""
+    # Colapsar publicaciones duplicadas de distintos vendedores en su producto canónico:
+    # queda el vendedor más barato con sus propias métricas (precio, link, ventas) y el
+    # producto se rankea por la mayor popularidad observada entre sus publicaciones
+    ranking = 'popularidad'
+    if DEDUP:
+        try:
+            df['dedup_group'] = asignar_dedup_group(df['titulo'], _ruta_categoria(INDICE_PATH, categoria))
+            canonicos = df.groupby('dedup_group', sort=False)
+            mejor_vendedor = df.loc[canonicos['precio'].idxmin()].copy()
+            mejor_vendedor['popularidad_grupo'] = canonicos['popularidad'].max().to_numpy()
+            df = mejor_vendedor
+            ranking = 'popularidad_grupo'
+            logger.info(f"Productos canónicos tras deduplicar: {len(df)}")
+        except Exception as e:
+            logger.error(f"Error detectando duplicados: {str(e)}")
     
     # Clasificar productos similares
     if len(df) > 1:
-        logger.info("Agrupando productos similares...")
+        logger.info(f"Agrupando productos similares ({categoria})...")
         try:
             # Filtrar títulos vacíos antes del TF-IDF
             df_with_titles = df[df['titulo'].str.strip() != ''].copy()
             
             if len(df_with_titles) == 0:
                 logger.warning("No hay títulos válidos para clustering")
-                top_5 = df.sort_values('popularidad', ascending=False).head(5)
+                top_5 = seleccionar_top(df, 5, ranking)
             else:
-                vectorizer = TfidfVectorizer(
-                    stop_words=['de', 'en', 'con', 'para', 'y', 'el', 'la', 'los', 'las', 'un', 'una'],
-                    max_features=500,
-                    lowercase=True,
-                    strip_accents='unicode'
+                df_with_titles['grupo'] = asignar_grupos(
+                    df_with_titles['titulo'],
+                    path=_ruta_categoria(os.path.join(MODELOS_DIR, 'kmeans_incremental.joblib'), categoria),
+                    cache_dir=_ruta_categoria(CACHE_DIR, categoria)
                 )
-                tfidf = vectorizer.fit_transform(df_with_titles['titulo'])
-                
-                n_clusters = min(15, max(2, len(df_with_titles) // 2))
-                kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-                df_with_titles['grupo'] = kmeans.fit_predict(tfidf)
                 
-                # Seleccionar top productos por popularidad
-                top_products = df_with_titles.sort_values('popularidad', ascending=False).head(30)
+                # Seleccionar top productos por popularidad (la del grupo si se deduplicó)
+                top_products = seleccionar_top(df_with_titles, 30, ranking)
                 
                 # Mejor oferta por grupo
-                mejores_ofertas = []
-                for grupo_id in top_products['grupo'].unique():
-                    grupo = top_products[top_products['grupo'] == grupo_id]
-                    if not grupo.empty:
-                        mejor = grupo.loc[grupo['precio'].idxmin()]
-                        mejores_ofertas.append(mejor)
+                mejores_ofertas = mas_barato_por_grupo(top_products, 'grupo')
                 
-                if mejores_ofertas:
-                    top_5 = pd.DataFrame(mejores_ofertas).head(5)
+                if not mejores_ofertas.empty:
+                    top_5 = mejores_ofertas.head(5)
                     logger.info(f"Top 5 productos seleccionados por clustering")
                 else:
-                    top_5 = df.sort_values('popularidad', ascending=False).head(5)
+                    top_5 = seleccionar_top(df, 5, ranking)
                     logger.info("Fallback: Top 5 por popularidad")
             
         except Exception as e:
             logger.error(f"Error en clustering: {str(e)}")
             # Fallback: seleccionar los 5 más populares
-            top_5 = df.sort_values('popularidad', ascending=False).head(5)
+            top_5 = seleccionar_top(df, 5, ranking)
             logger.info("Fallback: Top 5 por popularidad")
     else:
-        top_5 = df.sort_values('popularidad', ascending=False).head(5)
+        top_5 = seleccionar_top(df, 5, ranking)
         logger.info("Solo un producto disponible")
     
+    return categoria, top_5
+
+@medir("procesar_productos")
+def procesar_productos(df=None, guardar_csv=True):
+    """Procesa los productos crudos: recibe el DataFrame del scraping o lee data/raw.csv"""
+    logger.info("Iniciando procesamiento de datos...")
+    os.makedirs("data", exist_ok=True)
+    
+    try:
+        if df is None:
+            df, leidos = cargar_limpio("data/raw.csv")
+        else:
+            df, leidos = limpiar_dataframe(df)
+        logger.info(f"Datos cargados: {leidos} registros")
+        contar("registros", leidos)
+    except Exception as e:
+        logger.error(f"Error leyendo raw.csv: {str(e)}")
+        return pd.DataFrame()
+    
+    if leidos == 0:
+        logger.warning("DataFrame vacío. No hay datos para procesar.")
+        return pd.DataFrame()
+    
+    if df.empty:
+        logger.warning("No quedan productos válidos después de la limpieza")
+        return pd.DataFrame()
+    
+    logger.info(f"Productos válidos: {len(df)}")
+    
+    # Calcular popularidad con pesos ajustados (ranking.PESOS_POPULARIDAD)
+    df['popularidad'] = calcular_popularidad(df)
+    
+    # Guardar el snapshot limpio completo para el análisis histórico
+    try:
+        path = guardar_snapshot(df)
+        logger.info(f"Snapshot histórico guardado: {path}")
+    except Exception as e:
+        logger.error(f"Error guardando snapshot histórico: {str(e)}")
+    
+    # Registrar las observaciones en la base SQLite con la fecha del scraping, no la del procesamiento
+    try:
+        conn = base_datos.conectar()
+        escritas = base_datos.guardar_observaciones(conn, df)
+        conn.close()
+        logger.info(f"Observaciones registradas en SQLite: {escritas}")
+    except Exception as e:
+        logger.error(f"Error registrando observaciones en SQLite: {str(e)}")
+    
+    # Cada categoría se deduplica y agrupa por separado (no mezclar celulares con zapatos)
+    if 'categoria' not in df.columns:
+        df['categoria'] = CATEGORIA_GENERAL
+    particiones = [(grupo, categoria) for categoria, grupo in df.groupby('categoria', sort=False, observed=True)]
+    workers = min(WORKERS_CATEGORIAS or os.cpu_count() or 1, len(particiones))
+    with medir("seleccion_por_categoria", guardar=False):
+        contar("categorias", len(particiones))
+        if workers > 1:
+            logger.info(f"Procesando {len(particiones)} categorías en {workers} procesos")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                resultados = list(executor.map(seleccionar_productos, *zip(*particiones)))
+        else:
+            resultados = [seleccionar_productos(grupo, categoria) for grupo, categoria in particiones]
+    
+    if guardar_csv and len(resultados) > 1:
+        for categoria, top_categoria in resultados:
+            try:
+                top_categoria.to_csv(f"data/processed_{categoria}.csv", index=False, encoding='utf-8')
+            except Exception as e:
+                logger.error(f"Error guardando processed_{categoria}.csv: {str(e)}")
+    top_5 = pd.concat([top_categoria for _, top_categoria in resultados])
+    
     # Guardar resultados
     try:
-        top_5.to_csv("data/processed.csv", index=False, encoding='utf-8')
-        logger.info(f"Datos procesados guardados: {len(top_5)} productos")
+        if guardar_csv:
+            top_5.to_csv("data/processed.csv", index=False, encoding='utf-8')
+            logger.info(f"Datos procesados guardados: {len(top_5)} productos")
         
         # Log de resumen
         if not top_5.empty:
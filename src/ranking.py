@@ -0,0 +1,81 @@
+import pandas as pd
+import numpy as np
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Peso de cada columna en la popularidad; el orden es el de la suma original
+PESOS_POPULARIDAD = {
+    "mensajes": 0.8,  # Mayor peso a los mensajes
+    "ventas": 0.5,
+    "rating": 20.0,
+    "envio_gratis": 15.0,
+    "tienda_oficial": 10.0
+}
+
+def _pesos_env(valor):
+    """Pesos desde ML_PESOS_POPULARIDAD, p. ej. "mensajes=1,ventas=0.5"; las columnas omitidas conservan su peso"""
+    pesos = dict(PESOS_POPULARIDAD)
+    for par in filter(None, (p.strip() for p in valor.split(","))):
+        columna, _, peso = par.partition("=")
+        pesos[columna.strip()] = float(peso)
+    return pesos
+
+if os.environ.get("ML_PESOS_POPULARIDAD"):
+    PESOS_POPULARIDAD = _pesos_env(os.environ["ML_PESOS_POPULARIDAD"])
+
+def calcular_popularidad(df, pesos=None):
+    """Popularidad como un único producto matriz-vector de las columnas por sus pesos"""
+    pesos = pesos or PESOS_POPULARIDAD
+    matriz = np.column_stack([df[columna].to_numpy(dtype=np.float64) for columna in pesos])
+    return matriz @ np.fromiter(pesos.values(), dtype=np.float64, count=len(pesos))
+
+def _clave_descendente(valores):
+    """Clave ascendente equivalente a ordenar `valores` de mayor a menor con los NaN al final"""
+    valores = np.asarray(valores, dtype=np.float64)
+    return np.where(np.isnan(valores), np.inf, -valores)
+
+def top_k(valores, k):
+    """Posiciones de los k mayores valores, en orden descendente.
+
+    Selección parcial con argpartition: solo se ordenan los k candidatos. Los
+    empates se resuelven por posición, igual que un sort estable descendente.
+    """
+    clave = _clave_descendente(valores)
+    n = len(clave)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        corte = np.partition(clave, k - 1)[k - 1]
+        menores = np.flatnonzero(clave < corte)
+        # En el valor de corte entran los primeros por posición hasta completar k
+        en_corte = np.flatnonzero(clave == corte)[:k - len(menores)]
+        candidatos = np.concatenate([menores, en_corte])
+    else:
+        candidatos = np.arange(n)
+    return candidatos[np.lexsort((candidatos, clave[candidatos]))]
+
+def seleccionar_top(df, k, columna="popularidad"):
+    """Las k filas con mayor `columna`, como df.sort_values(columna, ascending=False, kind="stable").head(k)"""
+    return df.iloc[top_k(df[columna].to_numpy(), k)]
+
+def mas_barato_por_grupo(df, columna_grupo, columna_precio="precio"):
+    """Fila de menor precio de cada grupo en una sola pasada, con los grupos en orden de aparición"""
+    return df.loc[df.groupby(columna_grupo, sort=False)[columna_precio].idxmin()]
+
+def top_k_por_grupo(df, columna_grupo, k, columna="popularidad"):
+    """Las k filas con mayor `columna` de cada grupo (p. ej. categoría) en una sola pasada.
+
+    Un único lexsort por (grupo, valor descendente, posición) y el rango dentro
+    del grupo sale de restar el inicio de cada grupo.
+    """
+    if df.empty:
+        return df
+    codigos, _ = pd.factorize(df[columna_grupo], sort=True)
+    posiciones = np.arange(len(df))
+    orden = np.lexsort((posiciones, _clave_descendente(df[columna].to_numpy()), codigos))
+    grupos_ordenados = codigos[orden]
+    inicios = np.flatnonzero(np.r_[True, grupos_ordenados[1:] != grupos_ordenados[:-1]])
+    rango = posiciones - np.repeat(inicios, np.diff(np.r_[inicios, len(orden)]))
+    return df.iloc[orden[rango < k]]
@@ -0,0 +1,465 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+import pandas as pd
+import numpy as np
+import os
+from string import Formatter
+
+# Hoja de estilos del reporte; va embebida en la página única y como archivo propio en el sitio
+ESTILOS = """
+            /* Estilos iguales al original */
+            * { box-sizing: border-box; margin: 0; padding: 0; }
+            :root {
+                --primary: #2968c8;
+                --secondary: #e67e22;
+                --success: #27ae60;
+                --danger: #e74c3c;
+                --light: #f8f9fa;
+                --dark: #2c3e50;
+            }
+            body { 
+                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
+                line-height: 1.6; 
+                background: linear-gradient(135deg, #f5f7fa 0%, #e4e7f1 100%);
+                color: #333;
+                padding: 20px;
+            }
+            .container { 
+                max-width: 1000px; 
+                margin: 0 auto; 
+                background: white; 
+                border-radius: 15px; 
+                padding: 30px; 
+                box-shadow: 0 10px 30px rgba(0,0,0,0.1);
+            }
+            header { 
+                text-align: center; 
+                margin-bottom: 30px; 
+                padding-bottom: 20px;
+                border-bottom: 1px solid #eee;
+            }
+            h1 { 
+                color: var(--primary);
+                margin-bottom: 10px;
+                font-size: 2.2rem;
+            }
+            .subtitle {
+                color: #7f8c8d; 
+                margin-bottom: 5px;
+            }
+            .timestamp {
+                color: #95a5a6;
+                font-size: 0.9rem;
+            }
+            .products-grid {
+                display: grid;
+                grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
+                gap: 25px;
+                margin-top: 30px;
+            }
+            .product-card {
+                border: 1px solid #e1e4e8; 
+                border-radius: 12px; 
+                padding: 25px; 
+                transition: all 0.3s ease;
+                background: white;
+                position: relative;
+                overflow: hidden;
+            }
+            .product-card:hover {
+                transform: translateY(-8px); 
+                box-shadow: 0 15px 30px rgba(0,0,0,0.1);
+            }
+            .product-badge {
+                position: absolute;
+                top: 15px;
+                right: 15px;
+                background: var(--secondary);
+                color: white;
+                padding: 5px 12px;
+                border-radius: 20px;
+                font-weight: 600;
+                font-size: 0.9rem;
+            }
+            .product-title {
+                font-size: 1.3rem; 
+                margin-bottom: 15px; 
+                color: var(--dark);
+                min-height: 60px;
+            }
+            .product-price {
+                font-size: 1.8rem; 
+                color: var(--success); 
+                font-weight: bold; 
+                margin-bottom: 15px;
+            }
+            .badges-container {
+                display: flex; 
+                flex-wrap: wrap; 
+                gap: 10px; 
+                margin-bottom: 20px;
+            }
+            .badge {
+                display: inline-block; 
+                padding: 7px 15px; 
+                border-radius: 20px; 
+                font-size: 0.9rem; 
+                font-weight: 500;
+            }
+            .envio { background-color: #e1f0fa; color: #2980b9; }
+            .oficial { background-color: #e8f5e9; color: #2ecc71; }
+            .stats-container {
+                display: grid;
+                grid-template-columns: repeat(3, 1fr);
+                gap: 15px;
+                margin: 20px 0;
+            }
+            .stat-card {
+                background: #f8f9fa; 
+                padding: 15px; 
+                border-radius: 10px; 
+                text-align: center;
+                transition: transform 0.2s;
+            }
+            .stat-card:hover {
+                transform: scale(1.05);
+            }
+            .stat-value {
+                font-size: 1.5rem; 
+                font-weight: bold; 
+                color: var(--primary);
+                margin-bottom: 5px;
+            }
+            .stat-label {
+                font-size: 0.85rem; 
+                color: #7f8c8d;
+            }
+            .highlight-stat { 
+                background: linear-gradient(135deg, #2968c8 0%, #3a9efd 100%);
+                color: white;
+            }
+            .highlight-stat .stat-value { color: white; }
+            .highlight-stat .stat-label { color: rgba(255,255,255,0.9); }
+            .why-box {
+                background: #fef9e7; 
+                padding: 15px; 
+                border-radius: 10px; 
+                margin: 20px 0;
+                border-left: 4px solid var(--secondary);
+            }
+            .btn {
+                display: block;
+                width: 100%;
+                background: linear-gradient(135deg, var(--primary) 0%, #3a9efd 100%);
+                color: white;
+                padding: 12px;
+                border-radius: 8px;
+                text-decoration: none;
+                font-weight: 600;
+                text-align: center;
+                margin-top: 15px;
+                transition: all 0.3s;
+            }
+            .btn:hover {
+                transform: translateY(-3px);
+                box-shadow: 0 5px 15px rgba(41, 104, 200, 0.4);
+            }
+            footer { 
+                text-align: center; 
+                margin-top: 40px; 
+                color: #7f8c8d; 
+                font-size: 0.9rem;
+                padding-top: 20px;
+                border-top: 1px solid #eee;
+            }
+            @media (max-width: 768px) {
+                .products-grid {
+                    grid-template-columns: 1fr;
+                }
+                .stats-container {
+                    grid-template-columns: 1fr;
+                }
+            }
+"""
+
+# Plantillas del reporte; se completan con str.format
+CABECERA = """
+    <!DOCTYPE html>
+    <html lang="es">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Top Productos con Más Mensajes - MercadoLibre VE</title>
+        <style>{estilos}        </style>
+    </head>
+    <body>
+        <div class="container">
+            <header>
+                <h1>🔥 Productos con Más Mensajes</h1>
+                <p class="subtitle">MercadoLibre Venezuela - Reporte diario</p>
+                <p class="timestamp">Actualizado: {fecha} a las {hora}</p>
+            </header>
+            
+            <div class="products-grid">
+    """
+
+TARJETA = """
+        <div class="product-card">
+            {badge_tendencia}
+            <div class="product-title">{titulo}</div>
+            <div class="product-price">{precio}</div>
+            
+            <div class="badges-container">
+                {badges}
+            </div>
+            
+            <div class="stats-container">
+                <div class="stat-card">
+                    <div class="stat-value">{ventas}</div>
+                    <div class="stat-label">Ventas</div>
+                </div>
+                <div class="stat-card {clase_mensajes}">
+                    <div class="stat-value">{mensajes}</div>
+                    <div class="stat-label">Mensajes</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-value">{rating}</div>
+                    <div class="stat-label">Rating</div>
+                </div>
+            </div>
+            
+            <div class="why-box">
+                <strong>💡 Por qué destaca:</strong> {por_que}
+            </div>
+            
+            <a href="{link}" class="btn" target="_blank">Ver Producto en MercadoLibre</a>
+        </div>
+        """
+
+PIE = """
+            </div>
+            
+            <footer>
+                <p>Reporte generado automáticamente - Actualizado diariamente</p>
+                <p>⚠️ Este es un proyecto de automatización, no afiliado a MercadoLibre</p>
+            </footer>
+        </div>
+    </body>
+    </html>
+    """
+
+PAGINA_ERROR = """
+    <!DOCTYPE html>
+    <html lang="es">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Reporte Diario - MercadoLibre VE</title>
+        <style>
+            body {{ 
+                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
+                background: linear-gradient(135deg, #f5f7fa 0%, #e4e7f1 100%);
+                color: #333;
+                text-align: center;
+                padding: 50px 20px;
+            }}
+            .container {{
+                max-width: 800px;
+                margin: 0 auto;
+                background: white;
+                border-radius: 15px;
+                padding: 40px;
+                box-shadow: 0 10px 30px rgba(0,0,0,0.1);
+            }}
+            h1 {{ 
+                color: #e74c3c;
+                margin-bottom: 20px;
+            }}
+            .error-icon {{
+                font-size: 80px;
+                color: #e74c3c;
+                margin: 20px 0;
+            }}
+            .suggestions {{
+                text-align: left;
+                background: #f8f9fa;
+                padding: 20px;
+                border-radius: 10px;
+                margin: 30px 0;
+            }}
+            .suggestions ul {{
+                padding-left: 20px;
+            }}
+            .suggestions li {{
+                margin-bottom: 10px;
+            }}
+            .timestamp {{
+                color: #7f8c8d;
+                margin-top: 30px;
+                font-size: 0.9em;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="error-icon">⚠️</div>
+            <h1>No se encontraron productos hoy</h1>
+            <p>El scraping no recuperó datos en la ejecución de hoy</p>
+            
+            <div class="suggestions">
+                <p><strong>Posibles causas:</strong></p>
+                <ul>
+                    <li>Cambios en la estructura de MercadoLibre</li>
+                    <li>Bloqueo temporal de las solicitudes</li>
+                    <li>Problemas de conectividad</li>
+                    <li>Actualizaciones en los selectores CSS</li>
+                </ul>
+                <p><strong>Acciones recomendadas:</strong></p>
+                <ul>
+                    <li>Revisar los logs de GitHub Actions</li>
+                    <li>Verificar los screenshots en la carpeta /data</li>
+                    <li>Actualizar los selectores en el código</li>
+                    <li>Intentar nuevamente mañana</li>
+                </ul>
+            </div>
+            
+            <div class="timestamp">
+                <p>Reporte generado el: {fecha} a las {hora}</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+BADGE_TENDENCIA = "<span class='product-badge'>🔥 TENDENCIA</span>"
+BADGE_ENVIO = '<span class="badge envio">🚚 Envío Gratis</span>'
+BADGE_OFICIAL = '<span class="badge oficial">🏬 Tienda Oficial</span>'
+
+# La plantilla de tarjeta se parte una vez en literales y campos; cada tarjeta se arma
+# concatenando columnas completas en Arrow, sin un format por fila
+_PARTES_TARJETA = [(literal, campo) for literal, campo, _, _ in Formatter().parse(TARJETA)]
+CAMPOS_TARJETA = tuple(campo for _, campo in _PARTES_TARJETA if campo)
+
+def formatear_precios(columna):
+    """Columna de precios a texto: igual que safe_format_price pero de una vez"""
+    numeros = pd.to_numeric(columna, errors="coerce")
+    texto = np.array(["Bs. {:,.2f}".format(v) for v in numeros.fillna(0).to_numpy(dtype=float)], dtype=object)
+    texto[numeros.isna().to_numpy() & columna.notna().to_numpy()] = "Precio no válido"
+    texto[columna.isna().to_numpy()] = "No disponible"
+    return texto
+
+def formatear_enteros(columna, defecto=0):
+    """Columna a enteros truncados, con `defecto` para faltantes e inválidos (safe_get_int)"""
+    numeros = pd.to_numeric(columna, errors="coerce")
+    return np.trunc(numeros.fillna(defecto).to_numpy(dtype=float)).astype(np.int64)
+
+def formatear_ratings(columna):
+    """Columna de ratings a texto: igual que safe_format_rating pero de una vez"""
+    numeros = pd.to_numeric(columna, errors="coerce")
+    texto = np.array(["{:.1f}/5".format(v) for v in numeros.fillna(0).to_numpy(dtype=float)], dtype=object)
+    texto[numeros.isna().to_numpy() & columna.notna().to_numpy()] = "N/A"
+    texto[columna.isna().to_numpy()] = "Sin rating"
+    return texto
+
+def escapar(columna):
+    """html.escape(quote=True) sobre toda la columna con los reemplazos de texto de Arrow"""
+    texto = columna.astype("string[pyarrow]")
+    for original, entidad in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")):
+        texto = texto.str.replace(original, entidad, regex=False)
+    return texto
+
+def _columna(df, nombre, defecto):
+    return df[nombre] if nombre in df.columns else pd.Series(defecto, index=df.index)
+
+def preparar_tarjetas(df, en_tendencia=None, ventana=None):
+    """Calcula por columnas todos los campos de las tarjetas ya formateados y escapados.
+
+    `en_tendencia` es un dict item_id -> subida de mensajes; si es None se usa
+    el umbral fijo de siempre (mensajes > 50 o ventas > 100).
+    """
+    df = df.fillna({
+        'titulo': 'Sin título',
+        'precio': 0,
+        'ventas': 0,
+        'mensajes': 0,
+        'rating': 0,
+        'envio_gratis': False,
+        'tienda_oficial': False,
+        'link': '#'
+    })
+    titulos = _columna(df, 'titulo', 'Sin título').astype(str).astype("string[pyarrow]")
+    cortos = titulos.str.slice(0, 100).where(titulos.str.len() <= 100, titulos.str.slice(0, 100) + '...')
+    ventas = formatear_enteros(_columna(df, 'ventas', 0))
+    mensajes = formatear_enteros(_columna(df, 'mensajes', 0))
+
+    envio = _columna(df, 'envio_gratis', False).astype(bool).to_numpy()
+    oficial = _columna(df, 'tienda_oficial', False).astype(bool).to_numpy()
+    badges = np.where(envio, BADGE_ENVIO, '').astype(object) + np.where(oficial, BADGE_OFICIAL, '').astype(object)
+
+    por_que = np.array([f"Alto interés de compradores con {m} mensajes en los últimos días" for m in mensajes], dtype=object)
+    if en_tendencia is not None:
+        item_ids = _columna(df, 'item_id', '').astype(str)
+        subida = item_ids.map(en_tendencia)
+        tendencia = subida.notna().to_numpy()
+        por_que[tendencia] = [f"+{int(s)} mensajes en los últimos {ventana} días, muy por encima de su ritmo habitual"
+                              for s in subida[tendencia]]
+    else:
+        tendencia = (mensajes > 50) | (ventas > 100)
+
+    return {
+        "badge_tendencia": np.where(tendencia, BADGE_TENDENCIA, ''),
+        "titulo": escapar(cortos),
+        "precio": formatear_precios(_columna(df, 'precio', 0)),
+        "badges": badges,
+        "ventas": ventas,
+        "clase_mensajes": np.where(mensajes > 20, 'highlight-stat', ''),
+        "mensajes": mensajes,
+        "rating": formatear_ratings(_columna(df, 'rating', 0)),
+        "por_que": por_que,
+        "link": escapar(_columna(df, 'link', '#').astype(str))
+    }
+
+def _texto_arrow(valores):
+    """Columna (Series, ndarray o lista) como arreglo Arrow de texto sin nulos"""
+    arreglo = pa.array(valores.astype(str) if isinstance(valores, np.ndarray) and valores.dtype.kind in "iufb" else valores)
+    if isinstance(arreglo, pa.ChunkedArray):
+        arreglo = arreglo.combine_chunks()
+    return pc.cast(arreglo, pa.large_string())
+
+def tarjetas_arrow(campos):
+    """Todas las tarjetas como un arreglo Arrow, en una concatenación elemento a elemento"""
+    columnas = {campo: _texto_arrow(campos[campo]) for campo in CAMPOS_TARJETA}
+    partes = []
+    for literal, campo in _PARTES_TARJETA:
+        if literal:
+            partes.append(pa.scalar(literal, pa.large_string()))
+        if campo:
+            partes.append(columnas[campo])
+    return pc.binary_join_element_wise(*partes, pa.scalar("", pa.large_string()))
+
+def bytes_tarjetas(tarjetas):
+    """El buffer de datos de un arreglo de texto Arrow ya es la concatenación de sus valores"""
+    if len(tarjetas) == 0:
+        return b""
+    _, offsets, datos = tarjetas.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64)[tarjetas.offset:tarjetas.offset + len(tarjetas) + 1]
+    return memoryview(datos)[offsets[0]:offsets[-1]]
+
+def renderizar_reporte(df, fecha, hora, en_tendencia=None, ventana=None):
+    """HTML completo del reporte como texto"""
+    tarjetas = tarjetas_arrow(preparar_tarjetas(df, en_tendencia, ventana))
+    return "".join([CABECERA.format(estilos=ESTILOS, fecha=fecha, hora=hora), str(bytes_tarjetas(tarjetas), "utf-8"), PIE])
+
+def escribir_reporte(path, df, fecha, hora, en_tendencia=None, ventana=None):
+    """Escribe el reporte directo al archivo desde el buffer Arrow, sin armar la página como str"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tarjetas = tarjetas_arrow(preparar_tarjetas(df, en_tendencia, ventana))
+    temporal = f"{path}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(CABECERA.format(estilos=ESTILOS, fecha=fecha, hora=hora).encode("utf-8"))
+        f.write(bytes_tarjetas(tarjetas))
+        f.write(PIE.encode("utf-8"))
+    os.replace(temporal, path)
+
+def renderizar_error(fecha, hora):
+    return PAGINA_ERROR.format(fecha=fecha, hora=hora)
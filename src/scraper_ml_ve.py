@@ -1,4 +1,10 @@
-from playwright.sync_api import sync_playwright
+from parser_html import COLUMNAS, SELECTOR_ITEMS, SELECTORES, normalizar_registros, filtrar_validos, expandir_rutas, parsear_archivos, extraer_item_id, categoria_de_url, CATEGORIA_GENERAL, FORMATO_CAPTURADO
+from indice_items import registrar_corrida
+from planificador import Planificador, BloqueoDetectado, segundos_retry_after
+from checkpoint import EscritorCheckpoint, limpiar_stream
+from metricas import medir, contar
+import argparse
+import asyncio
 import pandas as pd
 import re
 import datetime
@@ -6,101 +12,493 @@ import os
 import time
 import random
 
-def scrape_ml_venezuela():
+# Configuración del scraping
+BASE_URL = os.environ.get("ML_BASE_URL", "https://listado.mercadolibre.com.ve").rstrip("/")  # Otro host, p. ej. benchmarks/servidor_ml.py
+ORDEN = "_OrderId_MSGS"  # Productos con más mensajes
+ITEMS_POR_PAGINA = 50  # Offset de paginación de MercadoLibre (_Desde_N)
+
+def _lista_env(nombre, defecto=""):
+    """Lee una lista separada por comas desde una variable de entorno"""
+    return [v.strip() for v in os.environ.get(nombre, defecto).split(",") if v.strip()]
+
+CATEGORIAS = _lista_env("ML_CATEGORIAS")
+PAGINAS_POR_CATEGORIA = int(os.environ.get("ML_PAGINAS", "1"))
+CONCURRENCIA = int(os.environ.get("ML_CONCURRENCIA", "4"))  # Páginas en vuelo a la vez
+PAUSA_POR_HOST = float(os.environ.get("ML_PAUSA_HOST", "1.0"))  # Segundos promedio entre navegaciones al mismo host
+RAFAGA_POR_HOST = int(os.environ.get("ML_RAFAGA_HOST", "1"))  # Navegaciones que pueden salir juntas tras un periodo ocioso
+MAX_REINTENTOS = int(os.environ.get("ML_REINTENTOS", "3"))
+UMBRAL_BLOQUEOS = int(os.environ.get("ML_UMBRAL_BLOQUEOS", "3"))  # Bloqueos seguidos que abren el circuito
+PAUSA_BLOQUEO = float(os.environ.get("ML_PAUSA_BLOQUEO", "120"))  # Segundos de pausa con el circuito abierto
+DEAD_LETTER_PATH = "data/dead_letter.json"
+EXTRACCION = os.environ.get("ML_EXTRACCION", "masiva")  # "masiva" (un solo page.evaluate) o "individual" (por elemento)
+SCREENSHOT = os.environ.get("ML_SCREENSHOT", "error")  # "siempre", "error" o "nunca"
+GUARDAR_HTML = os.environ.get("ML_GUARDAR_HTML", "0") == "1"  # Guarda el listado renderizado para --replay
+PAGES_DIR = "data/pages"
+INCREMENTAL = os.environ.get("ML_INCREMENTAL", "1") == "1"  # Escribe data/raw_delta.csv con solo nuevos/modificados
+ESTADO_PATH = os.environ.get("ML_ESTADO", "data/storage_state.json")  # Cookies de consentimiento y locale entre corridas
+
+# Señales de que MercadoLibre nos está bloqueando en lugar de mostrar el listado
+CAPTCHA_SELECTOR = "iframe[src*='captcha'], .g-recaptcha, #captcha, form[action*='captcha']"
+URL_BLOQUEO_PATRONES = ["captcha", "account-verification", "/security/"]
+
+POPUP_SELECTORES = [
+    "button:has-text('Aceptar cookies')",
+    "button:has-text('Entendido')",
+    "button:has-text('Continuar')",
+    ".cookie-banner-lgpd-button",
+    "button:has-text('Aceptar')"
+]
+
+# Scroll adaptativo: se detiene cuando el número de tarjetas deja de crecer
+SCROLL_MAX = int(os.environ.get("ML_SCROLL_MAX", "10"))  # Scrolls máximos por página
+SCROLL_QUIETUD_MS = int(os.environ.get("ML_SCROLL_QUIETUD_MS", "500"))  # Sin mutaciones ni red durante este tiempo = estable
+SCROLL_ESPERA_MS = int(os.environ.get("ML_SCROLL_ESPERA_MS", "3000"))  # Espera máxima por cada scroll
+SCROLL_TECHO_MS = int(os.environ.get("ML_SCROLL_TECHO_MS", "15000"))  # Techo total de espera por página
+SCROLL_SIN_CRECER = int(os.environ.get("ML_SCROLL_SIN_CRECER", "2"))  # Scrolls seguidos sin tarjetas nuevas para dar la página por completa
+
+# Modo ligero: solo necesitamos el texto de las tarjetas, no imágenes, fuentes ni analítica
+MODO_LIGERO = os.environ.get("ML_MODO_LIGERO", "1") == "1"
+BLOQUEAR_TIPOS = set(_lista_env("ML_BLOQUEAR_TIPOS", "image,media,font,stylesheet"))
+BLOQUEAR_PATRONES = _lista_env(
+    "ML_BLOQUEAR_PATRONES",
+    "google-analytics,googletagmanager,doubleclick,googlesyndication,facebook,hotjar,mercadoclics,/tracks,/ads/"
+)
+PERMITIR_PATRONES = _lista_env("ML_PERMITIR_PATRONES")  # Tienen prioridad sobre los bloqueos
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36"
+]
+
+# Recorre todas las tarjetas en el navegador y devuelve textos crudos en un solo viaje
+EXTRAER_TARJETAS_JS = """
+({items, sel}) => Array.from(document.querySelectorAll(items)).map(item => {
+    const texto = s => { const el = item.querySelector(s); return el ? el.textContent : null; };
+    const atributo = (s, a) => { const el = item.querySelector(s); return el ? el.getAttribute(a) : null; };
+    return {
+        titulo: texto(sel.titulo),
+        precio: texto(sel.precio),
+        mensajes: texto(sel.mensajes),
+        ventas: texto(sel.ventas),
+        rating: atributo(sel.rating, "aria-label"),
+        envio: texto(sel.envio),
+        oficial: item.querySelector(sel.oficial) !== null,
+        link: atributo(sel.link, "href")
+    };
+})
+"""
+
+# Hace scroll y resuelve apenas crece el número de tarjetas, o cuando el DOM y la red
+# quedan quietos durante `quietud` ms sin fetch/XHR en vuelo, o al llegar a `maximo` ms
+SCROLL_Y_ESPERAR_JS = """
+({sel, previos, quietud, maximo}) => new Promise(resolve => {
+    if (window.__mlEnVuelo === undefined) {
+        // Cuenta los fetch/XHR pendientes: la carga perezosa puede tardar más que la quietud
+        window.__mlEnVuelo = 0;
+        const fetchOriginal = window.fetch;
+        window.fetch = (...args) => {
+            window.__mlEnVuelo++;
+            return fetchOriginal.apply(window, args).finally(() => { window.__mlEnVuelo--; });
+        };
+        const enviarOriginal = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function (...args) {
+            window.__mlEnVuelo++;
+            this.addEventListener("loadend", () => { window.__mlEnVuelo--; }, {once: true});
+            return enviarOriginal.apply(this, args);
+        };
+    }
+    const contar = () => document.querySelectorAll(sel).length;
+    let quieto, techo, observadorRed;
+    const observadorDom = new MutationObserver(() => contar() > previos ? terminar() : reiniciar());
+    const terminar = () => {
+        observadorDom.disconnect();
+        if (observadorRed) observadorRed.disconnect();
+        clearTimeout(quieto);
+        clearTimeout(techo);
+        resolve(contar());
+    };
+    const alQuedarQuieto = () => window.__mlEnVuelo > 0 ? reiniciar() : terminar();
+    const reiniciar = () => { clearTimeout(quieto); quieto = setTimeout(alQuedarQuieto, quietud); };
+    observadorDom.observe(document.body, {childList: true, subtree: true});
+    if (window.PerformanceObserver) {
+        observadorRed = new PerformanceObserver(reiniciar);
+        observadorRed.observe({type: "resource"});
+    }
+    techo = setTimeout(terminar, maximo);
+    reiniciar();
+    window.scrollTo(0, document.body.scrollHeight);
+})
+"""
+
+def construir_urls(categorias=None, paginas=PAGINAS_POR_CATEGORIA):
+    """Genera la cola de URLs de listado: cada categoría por cada offset de paginación"""
+    slugs = categorias if categorias is not None else CATEGORIAS
+    urls = []
+    for slug in slugs or [""]:
+        prefijo = f"{BASE_URL}/{slug.strip('/')}" if slug else BASE_URL
+        for pagina in range(paginas):
+            desde = pagina * ITEMS_POR_PAGINA + 1
+            sufijo = f"_Desde_{desde}{ORDEN}" if desde > 1 else ORDEN
+            urls.append(f"{prefijo}/{sufijo}")
+    return urls
+
+class EstadoNavegador:
+    """Comparte el storage_state (cookies) entre corridas y entre los contextos de una corrida"""
+
+    def __init__(self, path):
+        self.path = path
+        self.version = 0
+        self._cookies = []
+
+    def inicial(self):
+        return self.path if os.path.exists(self.path) else None
+
+    async def guardar(self, context):
+        try:
+            estado = await context.storage_state(path=self.path)
+            self._cookies = estado.get("cookies", [])
+            self.version += 1
+            print(f"🍪 Estado del navegador guardado: {self.path}")
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar el estado del navegador: {e}")
+
+    async def sincronizar(self, context, version_contexto):
+        """Copia al contexto las cookies guardadas por otro worker; devuelve la versión aplicada"""
+        if self.version > version_contexto and self._cookies:
+            await context.add_cookies(self._cookies)
+        return self.version
+
+def debe_bloquear(url, tipo_recurso):
+    """Decide si una solicitud se aborta según las listas de permitidos/bloqueados"""
+    if any(patron in url for patron in PERMITIR_PATRONES):
+        return False
+    return tipo_recurso in BLOQUEAR_TIPOS or any(patron in url for patron in BLOQUEAR_PATRONES)
+
+class ContadorRed:
+    """Intercepta las solicitudes de los contextos y contabiliza tráfico y bloqueos"""
+
+    def __init__(self):
+        self.solicitudes = 0
+        self.bloqueadas = 0
+        self.bytes = 0
+        self._pendientes = set()
+
+    async def instalar(self, context):
+        if MODO_LIGERO:
+            await context.route("**/*", self._interceptar)
+        context.on("requestfinished", self._al_terminar)
+
+    async def _interceptar(self, route):
+        request = route.request
+        if debe_bloquear(request.url, request.resource_type):
+            self.bloqueadas += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _al_terminar(self, request):
+        tarea = asyncio.ensure_future(self._sumar_bytes(request))
+        self._pendientes.add(tarea)
+        tarea.add_done_callback(self._pendientes.discard)
+
+    async def _sumar_bytes(self, request):
+        self.solicitudes += 1
+        try:
+            tamanos = await request.sizes()
+            self.bytes += tamanos["responseBodySize"] + tamanos["responseHeadersSize"]
+        except Exception:
+            pass
+
+    async def esperar_pendientes(self):
+        if self._pendientes:
+            await asyncio.gather(*self._pendientes, return_exceptions=True)
+
+    def resumen(self):
+        return f"{self.solicitudes} solicitudes, {self.bloqueadas} bloqueadas, {self.bytes / 1024 / 1024:.2f} MB transferidos"
+
+@medir("scrape_ml_venezuela", registros=len)
+def scrape_ml_venezuela(urls=None, concurrencia=CONCURRENCIA, pausa_host=PAUSA_POR_HOST, limite=None):
+    """Scrapea la cola de URLs.
+
+    Con `limite` (segundos) la corrida se corta al vencer: las URLs sin
+    terminar van al dead-letter y se devuelve lo que ya quedó en el checkpoint.
+    """
     print("🚀 Iniciando scraping de MercadoLibre Venezuela")
     os.makedirs("data", exist_ok=True)
-    
-    # Configuración de Playwright con opciones stealth
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent=random.choice([
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
-                "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36"
-            ]),
-            viewport={"width": 1280, "height": 1024},
-            locale="es-VE"
-        )
-        
-        page = context.new_page()
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")  # Definir timestamp aquí
-        
+    urls = urls or construir_urls()
+    # Las URLs que agotaron sus reintentos la corrida anterior vuelven a la cola
+    en_cola = set(urls)
+    pendientes_previas = [url for url in Planificador.cargar_dead_letter(DEAD_LETTER_PATH) if url not in en_cola]
+    if pendientes_previas:
+        print(f"📮 {len(pendientes_previas)} URLs del dead-letter anterior vuelven a la cola")
+        urls = urls + pendientes_previas
+    print(f"🧭 {len(urls)} URLs en cola con {concurrencia} páginas concurrentes")
+    return asyncio.run(_scrape_async(urls, concurrencia, pausa_host, limite))
+
+async def _scrape_async(urls, concurrencia, pausa_host, limite=None):
+    # Playwright se importa recién aquí: --replay y el resto del pipeline no lo necesitan
+    from playwright.async_api import async_playwright
+
+    fin = time.monotonic() + limite if limite else None
+    vencido = False
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    posiciones = {url: posicion for posicion, url in enumerate(urls)}
+    escritor = EscritorCheckpoint()
+    pendientes = escritor.pendientes(urls)
+    if not pendientes:
+        print("✅ Todas las URLs ya estaban completas en el checkpoint")
+        return escritor.consolidar(COLUMNAS)
+    planificador = Planificador(
+        tasa_host=1 / pausa_host if pausa_host > 0 else 1e9,
+        rafaga_host=RAFAGA_POR_HOST,
+        max_reintentos=MAX_REINTENTOS,
+        umbral_bloqueos=UMBRAL_BLOQUEOS,
+        pausa_bloqueo=PAUSA_BLOQUEO
+    )
+    red = ContadorRed()
+    estado = EstadoNavegador(ESTADO_PATH)
+
+    # Un solo navegador compartido por un pool acotado de contextos
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
         try:
-            # URL optimizada para productos con más mensajes
-            url = "https://listado.mercadolibre.com.ve/_OrderId_MSGS"
-            print(f"🌍 Accediendo a: {url}")
-            
-            # Navegación con timeout extendido
-            page.goto(url, timeout=60000)
-            page.wait_for_selector(".ui-search-layout__item", timeout=30000)
-            
-            # Manejar posibles popups
-            handle_popups(page)  # CORREGIDO: Quitar self.
-            
-            # Scroll para cargar más productos
-            print("🖱️ Realizando scroll para cargar productos...")
-            for _ in range(5):
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                time.sleep(random.uniform(1.5, 3.0))
-                page.wait_for_timeout(1000)
-            
-            # Tomar screenshot para depuración
-            screenshot_path = f"data/screenshot_{timestamp}.png"
-            page.screenshot(path=screenshot_path, full_page=True)
-            print(f"📸 Captura guardada: {screenshot_path}")
-            
-            # Extraer productos
-            productos = []
-            items = page.query_selector_all(".ui-search-layout__item, .andes-card")
-            print(f"🔍 {len(items)} productos encontrados en la página")
-            
-            for item in items:
+            # Primera pasada con toda la cola y una ronda final con el dead-letter
+            for ronda in range(2):
+                cola = asyncio.Queue()
+                for url in pendientes:
+                    cola.put_nowait((posiciones[url], url))
+                workers = [
+                    _worker(browser, cola, planificador, red, estado, escritor, timestamp)
+                    for _ in range(max(1, min(concurrencia, len(pendientes))))
+                ]
                 try:
-                    product_data = extract_product_data(item)  # CORREGIDO: Quitar self.
-                    if product_data["titulo"] and product_data["precio"] > 0:
-                        productos.append(product_data)
-                except Exception as e:
-                    print(f"⚠️ Error procesando item: {str(e)}")
-                    continue
-            
-            return pd.DataFrame(productos)
-            
-        except Exception as e:
-            print(f"❌ Error durante el scraping: {str(e)}")
-            # Guardar HTML para diagnóstico
-            html_path = f"data/error_{timestamp}.html"
-            try:
-                with open(html_path, "w", encoding="utf-8") as f:
-                    f.write(page.content())
-                print(f"📄 HTML guardado para diagnóstico: {html_path}")
-            except Exception as file_error:
-                print(f"⚠️ No se pudo guardar HTML: {file_error}")
-            return pd.DataFrame()
-            
+                    await asyncio.wait_for(asyncio.gather(*workers), None if fin is None else fin - time.monotonic())
+                except asyncio.TimeoutError:
+                    # Cancela los workers; lo que ya terminaron está en el checkpoint
+                    vencido = True
+                    print(f"⏱️ Límite de {limite:.0f}s alcanzado: se conservan los resultados parciales")
+                    break
+
+                pendientes = planificador.tomar_dead_letter()
+                if not pendientes or planificador.breaker.agotado or ronda == 1:
+                    break
+                print(f"🔁 Reintentando {len(pendientes)} URLs fallidas al final de la corrida")
+            planificador.dead_letter = pendientes
         finally:
-            browser.close()
-
-def handle_popups(page):
-    """Maneja popups y banners de cookies"""
-    popup_selectors = [
-        "button:has-text('Aceptar cookies')",
-        "button:has-text('Entendido')",
-        "button:has-text('Continuar')",
-        ".cookie-banner-lgpd-button",
-        "button:has-text('Aceptar')"
-    ]
-    
-    for selector in popup_selectors:
+            escritor.flush()
+            # Si la corrida se cortó por el límite, un navegador colgado no debe trabar el cierre
+            try:
+                await asyncio.wait_for(browser.close(), 10)
+            except Exception:
+                pass
+
+    if vencido:
+        # Todo lo que no llegó a confirmarse en el checkpoint se reintenta en la próxima corrida
+        planificador.dead_letter = escritor.pendientes(urls)
+
+    planificador.guardar_dead_letter(DEAD_LETTER_PATH)
+    print(f"📶 Red: {red.resumen()}")
+
+    # Unir los lotes escritos respetando el orden de la cola
+    return escritor.consolidar(COLUMNAS)
+
+async def _worker(browser, cola, planificador, red, estado, escritor, timestamp):
+    """Toma URLs de la cola hasta vaciarla usando su propio contexto y página"""
+    context = await browser.new_context(
+        user_agent=random.choice(USER_AGENTS),
+        viewport={"width": 1280, "height": 1024},
+        locale="es-VE",
+        storage_state=estado.inicial()
+    )
+    version_estado = estado.version
+    await red.instalar(context)
+    page = await context.new_page()
+    try:
+        while True:
+            try:
+                posicion, url = cola.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            version_estado = await estado.sincronizar(context, version_estado)
+            sufijo = f"{timestamp}_{posicion}"
+            productos = await planificador.ejecutar(url, lambda: scrape_pagina(page, url, sufijo, estado))
+            if productos is None:
+                if not planificador.breaker.agotado:
+                    await guardar_diagnostico(page, sufijo)
+                continue
+            escritor.agregar(url, posicion, productos)
+    finally:
+        await red.esperar_pendientes()
+        try:
+            await asyncio.wait_for(context.close(), 10)
+        except Exception:
+            pass
+
+async def scrape_pagina(page, url, sufijo, estado=None):
+    """Navega a una URL de listado y devuelve la lista de productos extraídos.
+
+    Los errores se propagan para que el planificador decida si reintentar.
+    """
+    print(f"🌍 Accediendo a: {url}")
+    contar("navegaciones")
+
+    # Navegación con timeout extendido
+    respuesta = await page.goto(url, timeout=60000)
+    await verificar_bloqueo(page, respuesta)
+    await page.wait_for_selector(".ui-search-layout__item", timeout=30000)
+
+    # Manejar posibles popups y recordar el consentimiento para las siguientes páginas
+    if await handle_popups(page) and estado:
+        await estado.guardar(page.context)
+
+    # Scroll adaptativo para cargar más productos
+    await cargar_hasta_estable(page)
+
+    if SCREENSHOT == "siempre":
+        await guardar_screenshot(page, sufijo)
+
+    if GUARDAR_HTML:
+        await guardar_html(page, sufijo, url)
+
+    # Extraer productos
+    if EXTRACCION == "masiva":
+        return await extraer_productos_masivo(page, url)
+
+    return await extraer_productos_individual(page, url)
+
+@medir("extraer_productos_individual", registros=len, guardar=False, perfilar=False)
+async def extraer_productos_individual(page, url):
+    """Extrae tarjeta por tarjeta con extract_product_data; se mide la página entera, no cada tarjeta"""
+    productos = []
+    items = await page.query_selector_all(SELECTOR_ITEMS)
+    print(f"🔍 {len(items)} productos encontrados en {url}")
+    contar("tarjetas", len(items))
+
+    for item in items:
         try:
-            page.click(selector, timeout=5000)
-            print(f"✅ Popup cerrado: {selector}")
-            time.sleep(1)
-        except:
+            product_data = await extract_product_data(item)
+            product_data["categoria"] = categoria_de_url(url)
+            if product_data["titulo"] and product_data["precio"] > 0:
+                productos.append(product_data)
+        except Exception as e:
+            print(f"⚠️ Error procesando item: {str(e)}")
+            continue
+
+    return productos
+
+async def verificar_bloqueo(page, respuesta):
+    """Lanza BloqueoDetectado si la respuesta es un 403/429 o una página de captcha"""
+    if respuesta is not None and respuesta.status in (403, 429):
+        espera = segundos_retry_after(respuesta.headers.get("retry-after"))
+        raise BloqueoDetectado(f"HTTP {respuesta.status}", espera)
+    if any(patron in page.url.lower() for patron in URL_BLOQUEO_PATRONES):
+        raise BloqueoDetectado(f"redirigido a {page.url}")
+    if await page.locator(CAPTCHA_SELECTOR).count():
+        raise BloqueoDetectado("captcha en la página")
+
+async def guardar_diagnostico(page, sufijo):
+    """Guarda HTML (y screenshot según ML_SCREENSHOT) de una URL que agotó sus reintentos"""
+    html_path = f"data/error_{sufijo}.html"
+    try:
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(await page.content())
+        print(f"📄 HTML guardado para diagnóstico: {html_path}")
+    except Exception as file_error:
+        print(f"⚠️ No se pudo guardar HTML: {file_error}")
+    if SCREENSHOT in ("siempre", "error"):
+        await guardar_screenshot(page, f"error_{sufijo}")
+
+async def cargar_hasta_estable(page):
+    """Hace scroll hasta que el número de tarjetas deja de crecer o se agota el techo de espera.
+
+    Un solo scroll sin tarjetas nuevas no alcanza para cortar: una respuesta
+    lenta de la carga perezosa haría perder el resto de la página.
+    """
+    total = await page.evaluate("sel => document.querySelectorAll(sel).length", SELECTOR_ITEMS)
+    sin_crecer = 0
+    inicio = time.monotonic()
+    for n in range(1, SCROLL_MAX + 1):
+        restante_ms = SCROLL_TECHO_MS - (time.monotonic() - inicio) * 1000
+        if restante_ms <= 0:
+            print(f"⏱️ Techo de espera alcanzado tras {n - 1} scrolls")
+            break
+        nuevo_total = await page.evaluate(SCROLL_Y_ESPERAR_JS, {
+            "sel": SELECTOR_ITEMS,
+            "previos": total,
+            "quietud": SCROLL_QUIETUD_MS,
+            "maximo": min(SCROLL_ESPERA_MS, restante_ms)
+        })
+        print(f"🖱️ Scroll {n}: +{nuevo_total - total} productos ({nuevo_total} en total)")
+        contar("scrolls")
+        if nuevo_total <= total:
+            sin_crecer += 1
+            if sin_crecer >= SCROLL_SIN_CRECER:
+                break
+            continue
+        sin_crecer = 0
+        total = nuevo_total
+    print(f"⏱️ Carga estable en {time.monotonic() - inicio:.1f}s")
+    contar("espera_scroll_s", time.monotonic() - inicio)
+    return total
+
+async def guardar_screenshot(page, sufijo):
+    """Toma un screenshot de página completa para depuración"""
+    screenshot_path = f"data/screenshot_{sufijo}.png"
+    try:
+        await page.screenshot(path=screenshot_path, full_page=True)
+        print(f"📸 Captura guardada: {screenshot_path}")
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar screenshot: {e}")
+
+@medir("extraer_productos_masivo", registros=len, guardar=False, perfilar=False)
+async def extraer_productos_masivo(page, url):
+    """Extrae todas las tarjetas con un único page.evaluate y normaliza en pandas"""
+    registros = await page.evaluate(EXTRAER_TARJETAS_JS, {"items": SELECTOR_ITEMS, "sel": SELECTORES})
+    capturado = datetime.datetime.now()
+    print(f"🔍 {len(registros)} productos encontrados en {url}")
+    contar("tarjetas", len(registros))
+    return filtrar_validos(normalizar_registros(registros, categoria=categoria_de_url(url), capturado=capturado)).to_dict("records")
+
+async def guardar_html(page, sufijo, url=None):
+    """Guarda el HTML renderizado del listado para re-parsearlo sin navegador"""
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    html_path = f"{PAGES_DIR}/{sufijo}.html"
+    with open(html_path, "w", encoding="utf-8") as f:
+        if url:
+            f.write(f"<!-- ml-url: {url} -->\n")
+        f.write(await page.content())
+    print(f"💾 HTML guardado: {html_path}")
+
+async def handle_popups(page):
+    """Cierra popups y banners de cookies con una sola consulta que no espera por los ausentes.
+
+    Solo cuenta los visibles: los banners ya cerrados u ocultos en el DOM
+    harían esperar el timeout del click por cada uno.
+    """
+    banners = page.locator(", ".join(POPUP_SELECTORES)).filter(visible=True)
+    cerrados = 0
+    try:
+        visibles = await banners.count()
+    except Exception:
+        return False
+
+    # De atrás hacia adelante: cerrar uno lo saca del locator y correría los índices siguientes
+    for i in reversed(range(visibles)):
+        try:
+            await banners.nth(i).click(timeout=1000)
+            cerrados += 1
+        except Exception:
             pass
 
-def extract_product_data(item):
+    contar("popups_cerrados", cerrados)
+    if cerrados:
+        print(f"✅ {cerrados} popup(s) cerrado(s)")
+    return cerrados > 0
+
+async def extract_product_data(item):
     """Extrae datos de un producto individual con selectores actualizados"""
+    capturado = datetime.datetime.now()
     data = {
         "titulo": "",
         "precio": 0.0,
@@ -110,78 +508,107 @@ def extract_product_data(item):
         "envio_gratis": False,
         "tienda_oficial": False,
         "link": "#",
-        "fecha": datetime.datetime.now().strftime("%Y-%m-%d")
+        "fecha": capturado.strftime("%Y-%m-%d"),
+        "item_id": "",
+        "categoria": CATEGORIA_GENERAL,
+        "capturado": capturado.strftime(FORMATO_CAPTURADO)
     }
-    
+
     try:
-        # Selectores actualizados (Junio 2024)
-        title_elem = item.query_selector(".ui-search-item__title, .ui-search-item__group__element")
+        title_elem = await item.query_selector(SELECTORES["titulo"])
         if title_elem:
-            data["titulo"] = title_elem.text_content().strip()
-        
-        price_elem = item.query_selector(".andes-money-amount__fraction, .price-tag-fraction")
+            data["titulo"] = (await title_elem.text_content()).strip()
+
+        price_elem = await item.query_selector(SELECTORES["precio"])
         if price_elem:
             try:
-                price_text = price_elem.text_content().strip()
+                price_text = (await price_elem.text_content()).strip()
                 data["precio"] = float(price_text.replace(".", "").replace(",", "."))
             except:
                 pass
-        
+
         # Extraer mensajes (nuevo selector)
-        msg_elem = item.query_selector(".ui-search-item__questions, .ui-search-item__action--question")
+        msg_elem = await item.query_selector(SELECTORES["mensajes"])
         if msg_elem:
-            msg_text = msg_elem.text_content()
+            msg_text = await msg_elem.text_content()
             numeros = re.findall(r"\d+", msg_text)
             if numeros:
                 data["mensajes"] = int(numeros[0])
-        
+
         # Extraer ventas
-        sales_elem = item.query_selector(".ui-search-item__sold-quantity")
+        sales_elem = await item.query_selector(SELECTORES["ventas"])
         if sales_elem:
-            sales_text = sales_elem.text_content()
+            sales_text = await sales_elem.text_content()
             numeros = re.findall(r"\d+", sales_text)
             if numeros:
                 data["ventas"] = int(numeros[0])
-        
+
         # Extraer rating
-        rating_elem = item.query_selector(".ui-search-reviews__rating")
+        rating_elem = await item.query_selector(SELECTORES["rating"])
         if rating_elem:
-            rating_text = rating_elem.get_attribute("aria-label") or ""
+            rating_text = await rating_elem.get_attribute("aria-label") or ""
             rating_match = re.search(r"(\d+[.,]\d+)", rating_text)
             if rating_match:
                 data["rating"] = float(rating_match.group(1).replace(",", "."))
-        
+
         # Verificar envío gratis
-        envio_elem = item.query_selector(".ui-search-shipping")
-        if envio_elem and "gratis" in envio_elem.text_content().lower():
+        envio_elem = await item.query_selector(SELECTORES["envio"])
+        if envio_elem and "gratis" in (await envio_elem.text_content()).lower():
             data["envio_gratis"] = True
-        
+
         # Verificar tienda oficial
-        oficial_elem = item.query_selector(".ui-search-official-store-label")
+        oficial_elem = await item.query_selector(SELECTORES["oficial"])
         if oficial_elem:
             data["tienda_oficial"] = True
-        
+
         # Extraer link
-        link_elem = item.query_selector("a.ui-search-link")
+        link_elem = await item.query_selector(SELECTORES["link"])
         if link_elem:
-            href = link_elem.get_attribute("href")
+            href = await link_elem.get_attribute("href")
             if href:
                 data["link"] = href if href.startswith("http") else f"https://mercadolibre.com.ve{href}"
-                
+                data["item_id"] = extraer_item_id(data["link"])
+
     except Exception as e:
         print(f"⚠️ Error extrayendo datos del producto: {e}")
-    
+
     return data
 
-if __name__ == "__main__":
-    df = scrape_ml_venezuela()
+@medir("replay", registros=len)
+def replay(patrones, workers=None):
+    """Reconstruye los productos a partir de páginas guardadas, sin abrir navegador"""
+    os.makedirs("data", exist_ok=True)
+    rutas = expandir_rutas(patrones)
+    print(f"🔁 Re-parseando {len(rutas)} páginas guardadas")
+    return parsear_archivos(rutas, workers)
+
+def ejecutar_scraping(patrones_replay=None, workers=None, guardar_csv=True, limite=None):
+    """Corre el scraping (o el re-parseo) y devuelve el DataFrame; raw.csv es opcional"""
+    df = replay(patrones_replay, workers) if patrones_replay else scrape_ml_venezuela(limite=limite)
     if not df.empty:
-        df.to_csv("data/raw.csv", index=False, encoding='utf-8')
+        if guardar_csv:
+            df.to_csv("data/raw.csv", index=False, encoding='utf-8')
         print(f"✅ Scraping completado! {len(df)} productos encontrados")
+        if INCREMENTAL:
+            registrar_corrida(df)
         print(f"📊 Primeros 5 productos:")
         print(df.head().to_string())
     else:
         print("❌ Scraping completado pero no se encontraron productos")
-        # Crear CSV vacío con headers correctos
-        empty_df = pd.DataFrame(columns=["titulo", "precio", "ventas", "mensajes", "rating", "envio_gratis", "tienda_oficial", "link", "fecha"])
-        empty_df.to_csv("data/raw.csv", index=False, encoding='utf-8')
+        df = pd.DataFrame(columns=COLUMNAS)
+        if guardar_csv and not os.path.exists("data/raw.csv"):
+            # Crear CSV vacío con headers correctos; uno previo se conserva para procesarlo en su lugar
+            df.to_csv("data/raw.csv", index=False, encoding='utf-8')
+
+    # Los productos ya están a salvo: sin URLs pendientes no hace falta conservar los lotes para retomar
+    if not patrones_replay and not os.path.exists(DEAD_LETTER_PATH):
+        limpiar_stream()
+    return df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper de MercadoLibre Venezuela")
+    parser.add_argument("--replay", nargs="+", metavar="HTML", help="Re-parsear páginas guardadas (ej. data/pages/*.html)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para el re-parseo")
+    args = parser.parse_args()
+
+    ejecutar_scraping(args.replay, args.workers)
@@ -0,0 +1,476 @@
+"""Publica el reporte como sitio estático paginado y dividido por categoría.
+
+docs/index.html es una página chica con la primera página de tarjetas ya
+renderizada; el resto son archivos con el hash del contenido en el nombre,
+cacheables para siempre:
+
+    assets/estilos.<hash>.css, assets/sitio.<hash>.js
+    datos/manifiesto.<hash>.json       páginas y feed de cada categoría
+    datos/<categoria>/pagina-0001.<hash>.html   fragmento con las tarjetas
+    datos/<categoria>/feed-0001.<hash>.json     productos + campos de tendencia
+
+Cada archivo lleva al lado su copia .gz y, si está instalado brotli, su .br.
+"""
+import gzip
+import hashlib
+import html
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from parser_html import CATEGORIA_GENERAL
+from render import (ESTILOS, TARJETA, PAGINA_ERROR, BADGE_TENDENCIA, BADGE_ENVIO, BADGE_OFICIAL,
+                    preparar_tarjetas, tarjetas_arrow, bytes_tarjetas)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+POR_PAGINA = int(os.environ.get("ML_SITIO_POR_PAGINA", "24"))  # Tarjetas por fragmento HTML
+POR_FEED = int(os.environ.get("ML_SITIO_POR_FEED", "2000"))  # Productos por archivo del feed JSON
+CALIDAD_BROTLI = int(os.environ.get("ML_SITIO_CALIDAD_BROTLI", "9"))  # 11 comprime más pero es mucho más lento
+CONSERVAR_HORAS = float(os.environ.get("ML_SITIO_CONSERVAR_HORAS", "24"))  # Vida de los archivos que ya no se usan, para páginas en cache
+TODAS = "todas"  # Vista con todos los productos en el orden del reporte
+ENTRADAS = "entradas.json"  # Huellas de las entradas de la última publicación y sus archivos
+
+CAMPOS_FEED = ["item_id", "titulo", "precio", "ventas", "mensajes", "rating", "envio_gratis", "tienda_oficial", "link", "categoria"]
+CAMPOS_TENDENCIA = ["es_tendencia", "puntaje", "mensajes_delta", "ventas_delta", "precio_delta"]
+
+ESTILOS_SITIO = """
+            .categorias {
+                display: flex;
+                flex-wrap: wrap;
+                gap: 10px;
+                justify-content: center;
+            }
+            .categoria {
+                border: 1px solid #e1e4e8;
+                background: white;
+                color: var(--dark);
+                padding: 7px 15px;
+                border-radius: 20px;
+                font-size: 0.9rem;
+                cursor: pointer;
+            }
+            .categoria.activa {
+                background: var(--primary);
+                border-color: var(--primary);
+                color: white;
+            }
+            .buscar {
+                display: block;
+                width: 100%;
+                margin-top: 20px;
+                padding: 12px 15px;
+                border: 1px solid #e1e4e8;
+                border-radius: 8px;
+                font-size: 1rem;
+            }
+            .resultados {
+                list-style: none;
+                margin-top: 30px;
+            }
+            .resultados li {
+                padding: 12px 0;
+                border-bottom: 1px solid #eee;
+            }
+            .resultados .detalle {
+                color: #7f8c8d;
+                font-size: 0.9rem;
+            }
+            .cargar-mas {
+                border: none;
+                cursor: pointer;
+                font-size: 1rem;
+                margin-top: 30px;
+            }
+"""
+
+INDICE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Top Productos con Más Mensajes - MercadoLibre VE</title>
+    <link rel="stylesheet" href="{estilos}">
+    <script src="{script}" defer></script>
+</head>
+<body data-manifiesto="{manifiesto}">
+    <div class="container">
+        <header>
+            <h1>🔥 Productos con Más Mensajes</h1>
+            <p class="subtitle">MercadoLibre Venezuela - Reporte diario</p>
+            <p class="timestamp">Actualizado: {fecha} a las {hora}</p>
+        </header>
+
+        <nav class="categorias">{categorias}</nav>
+        <input class="buscar" id="buscar" type="search" placeholder="Buscar entre {total} productos">
+        <ol class="resultados" id="resultados" hidden></ol>
+
+        <div class="products-grid" id="productos">{tarjetas}</div>
+        <button class="btn cargar-mas" id="cargar-mas"{oculto}>Cargar más productos</button>
+
+        <footer>
+            <p>Reporte generado automáticamente - Actualizado diariamente</p>
+            <p>⚠️ Este es un proyecto de automatización, no afiliado a MercadoLibre</p>
+        </footer>
+    </div>
+</body>
+</html>
+"""
+
+BOTON_CATEGORIA = '<button class="categoria{activa}" data-categoria="{clave}">{nombre} ({total})</button>'
+
+# Carga diferida: el manifiesto se pide con la primera interacción, los fragmentos al
+# llegar al final de la grilla y el feed JSON recién cuando se usa el buscador
+SCRIPT = """(function () {
+    var grilla = document.getElementById("productos");
+    var boton = document.getElementById("cargar-mas");
+    var buscador = document.getElementById("buscar");
+    var resultados = document.getElementById("resultados");
+    var manifiesto = null, categoria = "todas", cargadas = 1, mas = !boton.hidden, version = 0, cargando = false, feeds = {};
+
+    function json(url) {
+        return fetch(url).then(function (r) { return r.json(); });
+    }
+
+    function cargarManifiesto() {
+        manifiesto = manifiesto || json(document.body.dataset.manifiesto);
+        return manifiesto;
+    }
+
+    function cargarPagina() {
+        if (cargando) return;
+        cargando = true;
+        var actual = version;
+        cargarManifiesto().then(function (m) {
+            var paginas = m.categorias[categoria].paginas;
+            if (cargadas >= paginas.length) return;
+            return fetch(paginas[cargadas]).then(function (r) { return r.text(); }).then(function (fragmento) {
+                if (actual !== version) return;
+                grilla.insertAdjacentHTML("beforeend", fragmento);
+                cargadas += 1;
+                mas = cargadas < paginas.length;
+                boton.hidden = !mas || grilla.hidden;
+            });
+        }).finally(function () { cargando = false; });
+    }
+
+    function elegirCategoria(evento) {
+        var clave = evento.target.dataset.categoria;
+        if (!clave || clave === categoria) return;
+        document.querySelectorAll(".categoria").forEach(function (b) { b.classList.toggle("activa", b === evento.target); });
+        categoria = clave;
+        cargadas = 0;
+        version += 1;
+        cargando = false;
+        grilla.innerHTML = "";
+        cargarPagina();
+        buscar();
+    }
+
+    function cargarFeed() {
+        return cargarManifiesto().then(function (m) {
+            return Promise.all(m.categorias[categoria].feed.map(function (url) {
+                feeds[url] = feeds[url] || json(url);
+                return feeds[url];
+            }));
+        });
+    }
+
+    function resultado(campos, fila) {
+        var item = document.createElement("li");
+        var link = document.createElement("a");
+        var detalle = document.createElement("div");
+        var valor = function (campo) { return fila[campos.indexOf(campo)]; };
+        link.href = /^https?:/.test(valor("link")) ? valor("link") : "#";
+        link.target = "_blank";
+        link.textContent = valor("titulo");
+        detalle.className = "detalle";
+        detalle.textContent = "Bs. " + Number(valor("precio") || 0).toLocaleString("en-US", {minimumFractionDigits: 2, maximumFractionDigits: 2})
+            + " · " + (valor("mensajes") || 0) + " mensajes"
+            + (valor("es_tendencia") ? " · 🔥 +" + (valor("mensajes_delta") || 0) + " mensajes" : "");
+        item.appendChild(link);
+        item.appendChild(detalle);
+        return item;
+    }
+
+    function buscar() {
+        var texto = buscador.value.trim().toLowerCase();
+        grilla.hidden = !!texto;
+        resultados.hidden = !texto;
+        boton.hidden = !!texto || !mas;
+        if (!texto) return;
+        var actual = version;
+        cargarFeed().then(function (archivos) {
+            if (actual !== version || texto !== buscador.value.trim().toLowerCase()) return;
+            resultados.innerHTML = "";
+            archivos.forEach(function (archivo) {
+                var titulo = archivo.campos.indexOf("titulo");
+                archivo.filas.forEach(function (fila) {
+                    if (resultados.children.length < 50 && String(fila[titulo]).toLowerCase().indexOf(texto) !== -1) {
+                        resultados.appendChild(resultado(archivo.campos, fila));
+                    }
+                });
+            });
+        });
+    }
+
+    document.querySelector(".categorias").addEventListener("click", elegirCategoria);
+    boton.addEventListener("click", cargarPagina);
+    buscador.addEventListener("input", buscar);
+    if ("IntersectionObserver" in window) {
+        new IntersectionObserver(function (entradas) {
+            if (entradas[0].isIntersecting && !boton.hidden) cargarPagina();
+        }, {rootMargin: "600px"}).observe(boton);
+    }
+})();
+"""
+
+def _hash(datos):
+    return hashlib.blake2b(datos, digest_size=6).hexdigest()
+
+def _escribir(path, datos):
+    temporal = f"{path}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(datos)
+    os.replace(temporal, path)
+
+def _comprimidos(path, datos):
+    """Copias .gz y .br junto al archivo, para servidores y CDNs que sirven precomprimido"""
+    _escribir(f"{path}.gz", gzip.compress(datos, 9, mtime=0))
+    if brotli is not None:
+        _escribir(f"{path}.br", brotli.compress(datos, quality=CALIDAD_BROTLI))
+
+class Publicador:
+    """Escribe los archivos del sitio y recuerda cuáles forman parte de esta publicación"""
+
+    def __init__(self, directorio, forzar=False):
+        self.directorio = directorio
+        self.forzar = forzar
+        self.publicados = set()
+        self.escritos = 0
+
+    def con_hash(self, relativo, datos):
+        """Publica `datos` con el hash del contenido en el nombre y devuelve la ruta relativa.
+
+        Si el archivo ya existe su contenido es el mismo, así que no se reescribe
+        salvo con `forzar`.
+        """
+        base, extension = os.path.splitext(relativo)
+        relativo = f"{base}.{_hash(datos)}{extension}"
+        path = os.path.join(self.directorio, relativo)
+        if self.forzar or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _escribir(path, datos)
+            _comprimidos(path, datos)
+            self.escritos += 1
+        self.publicados.add(relativo)
+        return relativo
+
+    def fijo(self, relativo, datos):
+        """Publica con nombre fijo (index.html), siempre reescrito"""
+        path = os.path.join(self.directorio, relativo)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        _escribir(path, datos)
+        _comprimidos(path, datos)
+        self.publicados.add(relativo)
+
+    def limpiar(self, subdirectorios=("assets", "datos")):
+        """Borra los archivos con hash que ya no se publican, pasadas CONSERVAR_HORAS"""
+        limite = time.time() - CONSERVAR_HORAS * 3600
+        borrados = 0
+        for subdirectorio in subdirectorios:
+            for raiz, _, archivos in os.walk(os.path.join(self.directorio, subdirectorio), topdown=False):
+                for archivo in archivos:
+                    path = os.path.join(raiz, archivo)
+                    relativo = os.path.relpath(path, self.directorio).replace(os.sep, "/")
+                    for sufijo in (".gz", ".br"):
+                        relativo = relativo.removesuffix(sufijo)
+                    if relativo not in self.publicados and os.path.getmtime(path) < limite:
+                        os.remove(path)
+                        borrados += 1
+                if raiz != self.directorio and not os.listdir(raiz):
+                    os.rmdir(raiz)
+        return borrados
+
+def nombre_categoria(clave):
+    """Nombre legible de un slug de categoría"""
+    if clave == TODAS:
+        return "Todas"
+    if clave == CATEGORIA_GENERAL:
+        return "General"
+    return clave.replace("-", " ").capitalize()
+
+def _categorias(df):
+    """Posiciones de cada categoría en el orden del reporte; TODAS primero"""
+    categorias = df["categoria"].fillna(CATEGORIA_GENERAL).astype(str).to_numpy() if "categoria" in df.columns else np.full(len(df), CATEGORIA_GENERAL)
+    codigos, claves = pd.factorize(categorias)
+    posiciones = {TODAS: np.arange(len(df))}
+    if len(claves) > 1:
+        orden = np.argsort(codigos, kind="stable")
+        inicios = np.searchsorted(codigos[orden], np.arange(len(claves)))
+        for clave, bloque in zip(claves, np.split(orden, inicios[1:])):
+            posiciones[clave] = bloque
+    return posiciones
+
+def feed_productos(df, tendencias=None):
+    """Filas compactas del feed JSON: productos con sus campos de tendencia (None donde no hay dato)"""
+    feed = df.reindex(columns=CAMPOS_FEED)
+    feed["precio"] = pd.to_numeric(feed["precio"], errors="coerce").round(2)
+    feed["rating"] = pd.to_numeric(feed["rating"], errors="coerce").round(1)
+    for campo in ("ventas", "mensajes"):
+        feed[campo] = pd.to_numeric(feed[campo], errors="coerce").round().astype("Int64")
+    feed["categoria"] = feed["categoria"].fillna(CATEGORIA_GENERAL)
+
+    if tendencias is not None and not tendencias.empty and "item_id" in df.columns:
+        tabla = tendencias.drop_duplicates("item_id").set_index("item_id")
+        for campo in CAMPOS_TENDENCIA:
+            feed[campo] = df["item_id"].map(tabla[campo]) if campo in tabla.columns else np.nan
+        feed["es_tendencia"] = feed["es_tendencia"].fillna(False).astype(bool)
+        feed["puntaje"] = pd.to_numeric(feed["puntaje"], errors="coerce").round(2)
+        for campo in CAMPOS_TENDENCIA[2:]:
+            feed[campo] = pd.to_numeric(feed[campo], errors="coerce").round(2)
+    else:
+        for campo in CAMPOS_TENDENCIA:
+            feed[campo] = None
+
+    feed = feed.astype(object)
+    return feed.columns.tolist(), feed.where(feed.notna(), None).to_numpy().tolist()
+
+def _json(datos):
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def huella(*partes):
+    """Hash estable de valores JSON serializables"""
+    return hashlib.blake2b(json.dumps(partes, default=str, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+def huella_datos(df):
+    """Hash del contenido de un DataFrame: columnas y valores fila por fila, sin el índice"""
+    if df.empty:
+        return huella(list(df.columns), len(df))
+    valores = pd.util.hash_pandas_object(df.astype(object), index=False).to_numpy()
+    return huella(list(df.columns), hashlib.blake2b(valores.tobytes(), digest_size=16).hexdigest())
+
+# Todo lo que cambia el HTML o el JSON sin que cambien los datos. Subir VERSION al tocar
+# el código que arma el sitio; las plantillas y la configuración entran solas.
+VERSION = 1
+VERSION_PLANTILLAS = huella(VERSION, ESTILOS, ESTILOS_SITIO, INDICE, BOTON_CATEGORIA, SCRIPT, TARJETA, PAGINA_ERROR,
+                            BADGE_TENDENCIA, BADGE_ENVIO, BADGE_OFICIAL, CAMPOS_FEED, CAMPOS_TENDENCIA, POR_PAGINA, POR_FEED)
+
+def cargar_entradas(directorio):
+    """Manifiesto de la última publicación: huella de entradas y archivos de cada categoría"""
+    try:
+        with open(os.path.join(directorio, ENTRADAS), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def al_dia(directorio, huella_entradas):
+    """True si lo publicado en `directorio` salió exactamente de estas entradas"""
+    return (cargar_entradas(directorio).get("huella") == huella_entradas
+            and os.path.exists(os.path.join(directorio, "index.html")))
+
+def _existen(directorio, archivos):
+    return all(os.path.exists(os.path.join(directorio, archivo)) for archivo in archivos)
+
+def publicar_sitio(directorio, df, fecha, hora, tendencias=None, ventana=None, huella_entradas=None, forzar=False):
+    """Publica el sitio completo en `directorio` y devuelve cuántos archivos nuevos escribió.
+
+    `tendencias` es la tabla de calcular_tendencias (o None); de ella salen el
+    badge de las tarjetas y los campos de tendencia del feed. Las categorías
+    cuyas filas y tendencias no cambiaron desde la última publicación
+    conservan sus archivos sin volver a renderizarse; `forzar` reconstruye todo.
+    """
+    df = df.reset_index(drop=True)
+    en_tendencia = None
+    if tendencias is not None and not tendencias.empty:
+        marcados = tendencias[tendencias["es_tendencia"]]
+        en_tendencia = dict(zip(marcados["item_id"], marcados["mensajes_delta"].fillna(0)))
+
+    publicador = Publicador(directorio, forzar)
+    anteriores = {} if forzar else cargar_entradas(directorio).get("categorias", {})
+    campos, filas = feed_productos(df, tendencias)
+    categorias = _categorias(df)
+    tarjetas = None
+
+    manifiesto = {"generado": f"{fecha} {hora}", "por_pagina": POR_PAGINA, "categorias": {}}
+    entradas = {}
+    feeds = []
+    for clave, posiciones in categorias.items():
+        # Cada producto va una sola vez en el feed: TODAS reúne los archivos de las categorías
+        con_feed = clave != TODAS or len(categorias) == 1
+        huella_categoria = huella(VERSION_PLANTILLAS, ventana, con_feed, campos, [filas[i] for i in posiciones],
+                                  huella_datos(df.iloc[posiciones].reindex(columns=CAMPOS_FEED)))
+        anterior = anteriores.get(clave, {})
+        if anterior.get("huella") == huella_categoria and _existen(directorio, anterior["paginas"] + anterior["feed"]):
+            paginas, feed = anterior["paginas"], anterior["feed"]
+            publicador.publicados.update(paginas + feed)
+        else:
+            if tarjetas is None:
+                tarjetas = tarjetas_arrow(preparar_tarjetas(df, en_tendencia, ventana))
+            tarjetas_categoria = tarjetas if clave == TODAS else tarjetas.take(pa.array(posiciones))
+            paginas = [
+                publicador.con_hash(f"datos/{clave}/pagina-{n + 1:04d}.html", bytes(bytes_tarjetas(tarjetas_categoria.slice(inicio, POR_PAGINA))))
+                for n, inicio in enumerate(range(0, len(posiciones), POR_PAGINA))
+            ]
+            feed = [
+                publicador.con_hash(f"datos/{clave}/feed-{n + 1:04d}.json", _json({"campos": campos, "filas": [filas[i] for i in posiciones[inicio:inicio + POR_FEED]]}))
+                for n, inicio in enumerate(range(0, len(posiciones), POR_FEED))
+            ] if con_feed else []
+        feeds.extend(feed)
+        entradas[clave] = {"huella": huella_categoria, "paginas": paginas, "feed": feed}
+        manifiesto["categorias"][clave] = {"nombre": nombre_categoria(clave), "total": len(posiciones), "paginas": paginas, "feed": feed}
+    if len(categorias) > 1:
+        manifiesto["categorias"][TODAS]["feed"] = feeds
+
+    # La primera página del índice es la primera de TODAS; si no se renderizó se lee del fragmento publicado
+    primera = manifiesto["categorias"][TODAS]["paginas"][:1]
+    if tarjetas is not None:
+        primera_pagina = str(bytes_tarjetas(tarjetas.slice(0, POR_PAGINA)), "utf-8")
+    elif primera:
+        with open(os.path.join(directorio, primera[0]), encoding="utf-8") as f:
+            primera_pagina = f.read()
+    else:
+        primera_pagina = ""
+
+    botones = "".join(
+        BOTON_CATEGORIA.format(activa=" activa" if clave == TODAS else "", clave=clave,
+                               nombre=html.escape(datos["nombre"]), total=datos["total"])
+        for clave, datos in manifiesto["categorias"].items()
+    ) if len(categorias) > 1 else ""
+    indice = INDICE.format(
+        estilos=publicador.con_hash("assets/estilos.css", (ESTILOS + ESTILOS_SITIO).encode("utf-8")),
+        script=publicador.con_hash("assets/sitio.js", SCRIPT.encode("utf-8")),
+        manifiesto=publicador.con_hash("datos/manifiesto.json", _json(manifiesto)),
+        fecha=fecha,
+        hora=hora,
+        categorias=botones,
+        total=len(df),
+        tarjetas=primera_pagina,
+        oculto="" if len(df) > POR_PAGINA else " hidden"
+    )
+    # El índice va último: hasta acá sigue publicado el anterior, que apunta a archivos que siguen existiendo
+    publicador.fijo("index.html", indice.encode("utf-8"))
+    _guardar_entradas(directorio, huella_entradas, entradas)
+    borrados = publicador.limpiar()
+    logger.info(f"Sitio publicado en {directorio}: {len(df)} productos, {len(publicador.publicados)} archivos "
+                f"({publicador.escritos} nuevos, {borrados} borrados)")
+    return publicador.escritos
+
+def _guardar_entradas(directorio, huella_entradas, categorias=None):
+    _escribir(os.path.join(directorio, ENTRADAS), json.dumps(
+        {"huella": huella_entradas, "categorias": categorias or {}}, ensure_ascii=False, indent=2).encode("utf-8"))
+
+def publicar_error(directorio, fecha, hora, huella_entradas=None):
+    """Publica la página sin productos como índice, con sus copias comprimidas al día"""
+    Publicador(directorio).fijo("index.html", PAGINA_ERROR.format(fecha=fecha, hora=hora).encode("utf-8"))
+    _guardar_entradas(directorio, huella_entradas)
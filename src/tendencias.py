@@ -0,0 +1,150 @@
+import pandas as pd
+import numpy as np
+import argparse
+import logging
+import os
+import warnings
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+VENTANAS = (7, 30, 90)
+VENTANA = int(os.environ.get("ML_VENTANA_TENDENCIA", "7"))  # Días de historia que se alinean por item
+UMBRAL_Z = float(os.environ.get("ML_UMBRAL_TENDENCIA", "2.0"))  # Puntaje mínimo para marcar un item como tendencia
+METRICAS_TENDENCIA = ("mensajes", "ventas", "precio")
+METRICAS_PUNTAJE = ("mensajes", "ventas")  # El precio se informa pero no hace tendencia por sí solo
+
+def _fechas(serie):
+    """Fecha normalizada al día, venga como datetime, date, string o categoría"""
+    if not pd.api.types.is_datetime64_any_dtype(serie):
+        serie = pd.to_datetime(serie.astype(str))
+    return serie.dt.normalize()
+
+def alinear(historico, metricas=METRICAS_TENDENCIA, hasta=None):
+    """Matrices item x día (una por métrica) con la última observación de cada día; NaN si no se vio.
+
+    Devuelve (item_ids, dias, {metrica: matriz}).
+    """
+    codigos, item_ids = pd.factorize(historico["item_id"])
+    fechas = _fechas(historico["fecha"])
+    fin = pd.Timestamp(hasta).normalize() if hasta is not None else fechas.max()
+    inicio = fechas.min()
+    dias = pd.date_range(inicio, fin, freq="D")
+    columnas = ((fechas - inicio) // pd.Timedelta(days=1)).to_numpy()
+
+    # Varias corridas el mismo día: vale la última capturada. Se ordena por captura
+    # y se queda la última aparición de cada (item, día) sin pasar por drop_duplicates.
+    captura = next((c for c in ("capturado", "timestamp") if c in historico.columns), None)
+    orden = np.argsort(historico[captura].to_numpy(), kind="stable") if captura else np.arange(len(historico))
+    orden = orden[codigos[orden] >= 0]
+    clave = codigos[orden].astype(np.int64) * len(dias) + columnas[orden]
+    _, desde_el_final = np.unique(clave[::-1], return_index=True)
+    filas = orden[len(orden) - 1 - desde_el_final]
+
+    matrices = {}
+    for metrica in metricas:
+        matriz = np.full((len(item_ids), len(dias)), np.nan)
+        valores = pd.to_numeric(historico[metrica], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        matriz[codigos[filas], columnas[filas]] = valores[filas]
+        matrices[metrica] = matriz
+    return np.asarray(item_ids, dtype=object), dias, matrices
+
+def _rellenar_adelante(matriz):
+    """Arrastra el último valor observado de cada fila sobre los días sin observación"""
+    ultimo = np.where(~np.isnan(matriz), np.arange(matriz.shape[1]), 0)
+    np.maximum.accumulate(ultimo, axis=1, out=ultimo)
+    return matriz[np.arange(len(matriz))[:, None], ultimo]
+
+def estadisticas(matriz):
+    """Deltas, crecimiento y z-score por fila de una matriz item x día"""
+    observados = ~np.isnan(matriz)
+    relleno = _rellenar_adelante(matriz)
+    # Antes de la primera observación el relleno toma la columna 0; se vuelve a NaN
+    relleno[np.cumsum(observados, axis=1) == 0] = np.nan
+
+    filas = np.arange(len(matriz))
+    primera = relleno[filas, observados.argmax(axis=1)]
+    actual = relleno[:, -1]
+    anterior = relleno[:, -2] if matriz.shape[1] > 1 else np.full(len(matriz), np.nan)
+
+    # Movimientos diarios previos al último día: la base contra la que se compara el último
+    base = np.diff(relleno[:, :-1], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        # Items vistos solo al final de la ventana no tienen base: su z queda en NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        delta_dia = actual - anterior
+        delta = actual - primera
+        crecimiento = np.where(primera > 0, delta / primera, np.nan)
+        media = np.nanmean(base, axis=1) if base.shape[1] else np.full(len(matriz), np.nan)
+        desvio = np.nanstd(base, axis=1) if base.shape[1] else np.full(len(matriz), np.nan)
+        z = np.where(desvio > 0, (delta_dia - media) / desvio, 0.0)
+    z[np.isnan(delta_dia) | np.isnan(desvio)] = np.nan
+
+    return {
+        "actual": actual,
+        "delta_dia": delta_dia,
+        "delta": delta,
+        "delta_media": media,
+        "crecimiento": crecimiento,
+        "z": z
+    }
+
+def calcular_tendencias(historico, dias=VENTANA, hasta=None, metricas=METRICAS_TENDENCIA):
+    """Tabla de tendencias por item ordenada por puntaje, sobre los últimos `dias` días.
+
+    El puntaje suma los z-scores de METRICAS_PUNTAJE: cuánto se aparta el
+    movimiento del último día del movimiento diario habitual del item.
+    """
+    if historico is None or historico.empty or "item_id" not in historico.columns:
+        return pd.DataFrame()
+    historico = historico[historico["item_id"].notna() & (historico["item_id"] != "")]
+
+    fechas = _fechas(historico["fecha"])
+    hasta = pd.Timestamp(hasta or fechas.max()).normalize()
+    desde = hasta - timedelta(days=dias - 1)
+    historico = historico[(fechas >= desde) & (fechas <= hasta)]
+    metricas = [m for m in metricas if m in historico.columns]
+    if historico.empty or not metricas:
+        return pd.DataFrame()
+
+    item_ids, dias_alineados, matrices = alinear(historico, metricas, hasta)
+    tabla = pd.DataFrame({"item_id": item_ids})
+    tabla["dias_observados"] = (~np.isnan(matrices[metricas[0]])).sum(axis=1)
+    for metrica in metricas:
+        for nombre, valores in estadisticas(matrices[metrica]).items():
+            tabla[f"{metrica}_{nombre}"] = valores
+
+    puntaje = [f"{m}_z" for m in METRICAS_PUNTAJE if m in metricas]
+    tabla["puntaje"] = tabla[puntaje].fillna(0).sum(axis=1) if puntaje else 0.0
+    subio = np.zeros(len(tabla), dtype=bool)
+    for m in METRICAS_PUNTAJE:
+        if m in metricas:
+            subio |= (tabla[f"{m}_delta_dia"] > 0).to_numpy()
+    tabla["es_tendencia"] = (tabla["puntaje"] >= UMBRAL_Z) & subio
+
+    # Título y link de la última observación de cada item
+    for columna in ("titulo", "link"):
+        if columna in historico.columns:
+            ultimos = historico.dropna(subset=[columna]).drop_duplicates("item_id", keep="last").set_index("item_id")[columna]
+            tabla[columna] = tabla["item_id"].map(ultimos)
+
+    tabla = tabla.sort_values(["es_tendencia", "puntaje"], ascending=False, kind="stable").reset_index(drop=True)
+    tabla.insert(0, "rank", np.arange(1, len(tabla) + 1))
+    logger.info(f"Tendencias: {len(tabla)} items en {len(dias_alineados)} días, {int(tabla['es_tendencia'].sum())} en tendencia")
+    return tabla
+
+if __name__ == "__main__":
+    from historico import leer_historico
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Tabla de tendencias sobre el histórico de snapshots")
+    parser.add_argument("--dias", type=int, choices=VENTANAS, default=VENTANA if VENTANA in VENTANAS else 7)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--salida", help="CSV donde guardar la tabla completa")
+    args = parser.parse_args()
+
+    hoy = datetime.now().date()
+    columnas = ["item_id", "titulo", "link", "capturado", *METRICAS_TENDENCIA]
+    tabla = calcular_tendencias(leer_historico(columnas=columnas, desde=hoy - timedelta(days=args.dias - 1), hasta=hoy), args.dias)
+    if args.salida:
+        tabla.to_csv(args.salida, index=False, encoding="utf-8")
+    print(tabla.head(args.top).to_string(index=False))
@@ -0,0 +1,13 @@
+import hashlib
+import re
+import unicodedata
+
+def normalizar_titulo(titulo):
+    """Minúsculas, sin acentos y con espacios colapsados: la forma canónica de un título"""
+    sin_acentos = unicodedata.normalize("NFKD", str(titulo)).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", sin_acentos.lower()).strip()
+
+def hash_titulo(titulo):
+    """Hash de 64 bits del título normalizado, estable entre corridas"""
+    digest = hashlib.blake2b(normalizar_titulo(titulo).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
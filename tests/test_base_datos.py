@@ -0,0 +1,51 @@
+"""Semántica de upsert de las observaciones: una por item y captura, sin duplicar al re-procesar"""
+import pandas as pd
+import pytest
+
+import base_datos
+
+def scraping(capturado, precio, fecha=None):
+    df = pd.DataFrame({
+        "titulo": ["Celular Samsung A54", "Licuadora Oster"],
+        "precio": [precio, 89.0],
+        "ventas": [150, 3],
+        "mensajes": [12, 0],
+        "rating": [4.5, 0.0],
+        "envio_gratis": [True, False],
+        "tienda_oficial": [True, False],
+        "link": ["https://articulo.mercadolibre.com.ve/MLV-123-_JM", "https://mercadolibre.com.ve/p/MLV456"],
+        "item_id": ["MLV123", "MLV456"],
+        "fecha": [fecha or capturado[:10]] * 2
+    })
+    if capturado:
+        df["capturado"] = capturado
+    return df
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = base_datos.conectar(str(tmp_path / "ml.db"))
+    yield conn
+    conn.close()
+
+def test_dos_scrapings_del_mismo_dia_son_observaciones_distintas(conn):
+    base_datos.guardar_observaciones(conn, scraping("2025-01-01 09:00:00", 100.0))
+    base_datos.guardar_observaciones(conn, scraping("2025-01-01 18:00:00", 95.0))
+    obs = base_datos.observaciones_item(conn, "MLV123")
+    assert obs["timestamp"].tolist() == ["2025-01-01 09:00:00", "2025-01-01 18:00:00"]
+    assert obs["precio"].tolist() == [100.0, 95.0]
+
+def test_reprocesar_no_duplica(conn):
+    for _ in range(2):
+        base_datos.guardar_observaciones(conn, scraping("2025-01-01 09:00:00", 100.0))
+    assert conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0] == 2
+
+def test_primera_y_ultima_vez(conn):
+    # Se procesan fuera de orden: primera_vez/ultima_vez no dependen del orden de llegada
+    for capturado in ("2025-01-02 09:00:00", "2025-01-01 09:00:00", "2025-01-03 09:00:00"):
+        base_datos.guardar_observaciones(conn, scraping(capturado, 100.0))
+    primera, ultima = conn.execute("SELECT primera_vez, ultima_vez FROM products WHERE item_id = 'MLV123'").fetchone()
+    assert (primera, ultima) == ("2025-01-01 09:00:00", "2025-01-03 09:00:00")
+
+def test_csv_sin_capturado_usa_la_fecha(conn):
+    base_datos.guardar_observaciones(conn, scraping(None, 100.0, fecha="2025-01-01"))
+    assert base_datos.observaciones_item(conn, "MLV123")["timestamp"].tolist() == ["2025-01-01 00:00:00"]
@@ -0,0 +1,41 @@
+"""Retomar una corrida interrumpida desde el checkpoint del día"""
+import json
+
+from checkpoint import EscritorCheckpoint
+
+def producto(n):
+    return {"titulo": f"Producto {n}", "precio": float(n)}
+
+def test_retoma_saltando_urls_completas(tmp_path):
+    escritor = EscritorCheckpoint(str(tmp_path), tamano_lote=1)
+    escritor.agregar("url-0", 0, [producto(0)])
+    escritor.agregar("url-1", 1, [producto(1)])
+
+    retomado = EscritorCheckpoint(str(tmp_path), tamano_lote=1)
+    assert retomado.completadas == {"url-0", "url-1"}
+    assert retomado.pendientes(["url-0", "url-1", "url-2"]) == ["url-2"]
+
+    retomado.agregar("url-2", 2, [producto(2)])
+    assert retomado.consolidar()["titulo"].tolist() == ["Producto 0", "Producto 1", "Producto 2"]
+
+def test_descarta_registros_sin_confirmar_y_lineas_truncadas(tmp_path):
+    escritor = EscritorCheckpoint(str(tmp_path), tamano_lote=1)
+    escritor.agregar("url-0", 0, [producto(0)])
+    # Lo que quedó en disco de una URL que no llegó al checkpoint y una línea cortada a mitad de escritura
+    with open(escritor.registros_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({**producto(1), "_url": "url-1", "_posicion": 1}) + "\n")
+        f.write('{"titulo": "Produ')
+
+    retomado = EscritorCheckpoint(str(tmp_path))
+    assert retomado.pendientes(["url-0", "url-1"]) == ["url-1"]
+    assert retomado.consolidar()["titulo"].tolist() == ["Producto 0"]
+
+def test_checkpoint_de_otro_dia_empieza_de_cero(tmp_path):
+    escritor = EscritorCheckpoint(str(tmp_path), tamano_lote=1)
+    escritor.agregar("url-0", 0, [producto(0)])
+    with open(escritor.checkpoint_path, "w", encoding="utf-8") as f:
+        json.dump({"fecha": "2000-01-01", "completadas": ["url-0"]}, f)
+
+    retomado = EscritorCheckpoint(str(tmp_path))
+    assert retomado.pendientes(["url-0"]) == ["url-0"]
+    assert retomado.consolidar().empty
@@ -0,0 +1,17 @@
+"""Agrupación incremental con corridas más chicas que N_CLUSTERS"""
+import os
+
+import clustering
+
+TITULOS = [
+    "Celular Samsung A54 128gb", "Celular Samsung A54 256gb", "Licuadora Oster 600w", "Licuadora Oster 10 velocidades",
+    "Zapatos Nike Air Max", "Zapatos Nike Revolution", "Tv Samsung 50 pulgadas", "Tv LG 55 pulgadas 4k"
+]
+
+def test_corrida_chica_usa_un_grupo_cada_dos_titulos_sin_persistir(tmp_path):
+    path = str(tmp_path / "kmeans.joblib")
+    grupos = clustering.asignar_grupos_incremental(TITULOS, path=path, cache_dir=str(tmp_path / "cache"))
+
+    assert len(grupos) == len(TITULOS)
+    assert len(set(grupos)) <= len(TITULOS) // 2
+    assert not os.path.exists(path)
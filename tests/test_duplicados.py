@@ -0,0 +1,27 @@
+"""asignar_dedup_group agrupa publicaciones casi iguales y conserva los grupos entre corridas"""
+from duplicados import asignar_dedup_group
+
+TITULOS = [
+    "Celular Samsung Galaxy A54 128GB Negro",
+    "CELULAR SAMSUNG GALAXY A54 128GB NEGRO Oferta",
+    "Licuadora Oster 600W 12 Tazas Vidrio",
+    "Nevera Whirlpool Inverter 14 Pies Acero",
+    "Celular Samsung Galaxy A54 128GB Negro",
+    "licuadora oster 600w 12 tazas vidrio",
+]
+
+def test_casi_duplicados_comparten_grupo(tmp_path):
+    grupos = asignar_dedup_group(TITULOS, str(tmp_path / "indice.npz")).tolist()
+    assert grupos[0] == grupos[1] == grupos[4]
+    assert grupos[2] == grupos[5]
+    assert len({grupos[0], grupos[2], grupos[3]}) == 3
+
+def test_grupos_estables_entre_corridas(tmp_path):
+    path = str(tmp_path / "indice.npz")
+    primera = asignar_dedup_group(TITULOS, path).tolist()
+    segunda = asignar_dedup_group(
+        ["Licuadora Oster 600W 12 Tazas Vidrio Nueva", "Taladro Bosch Percutor 750W", TITULOS[3]], path
+    ).tolist()
+    assert segunda[0] == primera[2]
+    assert segunda[2] == primera[3]
+    assert segunda[1] not in primera
@@ -0,0 +1,44 @@
+"""El reporte no se reconstruye si productos, historial y plantillas son los de la última publicación"""
+import os
+
+import pandas as pd
+import pytest
+
+import generar_reporte
+
+def productos(precio=100.0):
+    return pd.DataFrame({
+        "titulo": ["Celular Samsung A54", "Licuadora Oster"],
+        "precio": [precio, 89.0],
+        "ventas": [150, 3],
+        "mensajes": [12, 0],
+        "rating": [4.5, 0.0],
+        "envio_gratis": [True, False],
+        "tienda_oficial": [True, False],
+        "link": ["https://articulo.mercadolibre.com.ve/MLV-123-_JM", "https://mercadolibre.com.ve/p/MLV456"],
+        "fecha": ["2025-01-01", "2025-01-01"],
+        "item_id": ["MLV123", "MLV456"],
+        "categoria": ["celulares", "hogar"]
+    })
+
+@pytest.fixture
+def publicado(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    generar_reporte.crear_reporte_html(productos())
+    assert "sin cambios" not in capsys.readouterr().out
+    return os.stat("docs/index.html").st_mtime_ns
+
+def test_entradas_iguales_no_reconstruyen(publicado, capsys):
+    generar_reporte.crear_reporte_html(productos())
+    assert "sin cambios" in capsys.readouterr().out
+    assert os.stat("docs/index.html").st_mtime_ns == publicado
+
+def test_productos_distintos_reconstruyen(publicado, capsys):
+    generar_reporte.crear_reporte_html(productos(precio=95.0))
+    assert "sin cambios" not in capsys.readouterr().out
+    with open("docs/index.html", encoding="utf-8") as f:
+        assert "Bs. 95.00" in f.read()
+
+def test_forzar_reconstruye(publicado, capsys):
+    generar_reporte.crear_reporte_html(productos(), forzar=True)
+    assert "sin cambios" not in capsys.readouterr().out
@@ -0,0 +1,16 @@
+"""Métricas por etapa: la memoria se reporta como variación de la etapa y pico del proceso"""
+import metricas
+
+def test_rss_delta_es_de_la_etapa():
+    with metricas.medir("prueba_rss", guardar=False, perfilar=False):
+        bloque = bytearray(64 * 1024 ** 2)
+        bloque[::4096] = b"x" * len(bloque[::4096])  # Tocar cada página para que cuente en el RSS
+    with metricas.medir("prueba_rss_vacia", guardar=False, perfilar=False):
+        pass
+    del bloque
+
+    etapas = metricas._corrida["etapas"]
+    assert etapas["prueba_rss"]["rss_delta_mb"] >= 48
+    assert abs(etapas["prueba_rss_vacia"]["rss_delta_mb"]) < 16
+    assert etapas["prueba_rss_vacia"]["rss_pico_proceso_mb"] >= etapas["prueba_rss"]["rss_delta_mb"]
+    assert "rss_pico_mb" not in etapas["prueba_rss"]
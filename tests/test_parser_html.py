@@ -0,0 +1,64 @@
+"""La extracción masiva (textos crudos + normalizar_registros) da lo mismo que extract_product_data tarjeta por tarjeta"""
+import asyncio
+import datetime
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from parser_html import COLUMNAS, SELECTOR_ITEMS, ElementoHTML, extraer_productos_html, extraer_registros_html, normalizar_registros
+from scraper_ml_ve import extract_product_data
+
+FECHA = "2025-01-01"
+CAPTURADO = "2025-01-01 09:30:00"
+
+LISTADO = """<ol class="ui-search-layout">
+<li class="ui-search-layout__item">
+  <a class="ui-search-link" href="https://articulo.mercadolibre.com.ve/MLV-123456789-celular-_JM"><h2 class="ui-search-item__title">  Celular Samsung A54  </h2></a>
+  <span class="andes-money-amount__fraction">1.234,56</span>
+  <span class="ui-search-reviews__rating" aria-label="Calificación 4,5 de 5 estrellas">4,5</span>
+  <span class="ui-search-item__sold-quantity">+150 vendidos</span>
+  <span class="ui-search-item__questions">12 preguntas</span>
+  <p class="ui-search-shipping">Envío GRATIS</p>
+  <p class="ui-search-official-store-label">Tienda oficial</p>
+</li>
+<li class="ui-search-layout__item">
+  <a class="ui-search-link" href="/p/MLV987654321"><h2 class="ui-search-item__title">Licuadora Oster</h2></a>
+  <span class="andes-money-amount__fraction">89</span>
+  <p class="ui-search-shipping">Llega mañana</p>
+</li>
+<li class="ui-search-layout__item">
+  <h2 class="ui-search-item__title">Tarjeta sin precio ni link</h2>
+</li>
+<li class="ui-search-layout__item">
+  <a class="ui-search-link" href="https://articulo.mercadolibre.com.ve/MLV-555-_JM"></a>
+  <span class="price-tag-fraction">15.000</span>
+  <span class="ui-search-item__action--question">Preguntar (3)</span>
+</li>
+</ol>
+"""
+
+def extraer_individual(html):
+    async def extraer():
+        items = BeautifulSoup(html, "lxml").select(SELECTOR_ITEMS)
+        return [await extract_product_data(ElementoHTML(item)) for item in items]
+    return pd.DataFrame(asyncio.run(extraer()), columns=COLUMNAS).assign(fecha=FECHA, capturado=CAPTURADO)
+
+def test_extraccion_masiva_igual_a_individual():
+    masiva = normalizar_registros(extraer_registros_html(LISTADO), capturado=datetime.datetime(2025, 1, 1, 9, 30))
+    individual = extraer_individual(LISTADO)
+    pd.testing.assert_frame_equal(masiva.reset_index(drop=True), individual, check_dtype=False)
+
+def test_normalizacion():
+    df = normalizar_registros(extraer_registros_html(LISTADO), fecha=FECHA)
+    primera = df.iloc[0]
+    assert primera["titulo"] == "Celular Samsung A54"
+    assert primera["precio"] == 1234.56
+    assert (primera["ventas"], primera["mensajes"], primera["rating"]) == (150, 12, 4.5)
+    assert primera["envio_gratis"] and primera["tienda_oficial"]
+    assert primera["item_id"] == "MLV123456789"
+    assert df.iloc[1]["link"] == "https://mercadolibre.com.ve/p/MLV987654321"
+    assert df.iloc[2]["link"] == "#"
+
+def test_filtra_tarjetas_sin_titulo_o_precio():
+    df = extraer_productos_html(LISTADO, fecha=FECHA)
+    assert df["titulo"].tolist() == ["Celular Samsung A54", "Licuadora Oster"]
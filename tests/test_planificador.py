@@ -0,0 +1,67 @@
+"""Retry-After, reintentos y dead-letter del planificador"""
+import asyncio
+import datetime
+import json
+from email.utils import format_datetime
+
+import pytest
+
+from planificador import BloqueoDetectado, Planificador, segundos_retry_after
+
+def test_retry_after_en_segundos():
+    assert segundos_retry_after("5") == 5.0
+    assert segundos_retry_after(" 120 ") == 120.0
+
+def test_retry_after_como_fecha_http():
+    dentro_de_un_minuto = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=60)
+    assert 55 <= segundos_retry_after(format_datetime(dentro_de_un_minuto, usegmt=True)) <= 60
+
+def test_retry_after_en_el_pasado_no_espera():
+    assert segundos_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert segundos_retry_after("-3") == 0.0
+
+@pytest.mark.parametrize("valor", [None, "", "pronto", "Lunes a las 3"])
+def test_retry_after_ilegible(valor):
+    assert segundos_retry_after(valor) is None
+
+def _bloqueos(esperas):
+    """Función que lanza un bloqueo con cada espera de la lista y después responde "ok" """
+    pendientes = list(esperas)
+
+    async def funcion():
+        if pendientes:
+            raise BloqueoDetectado("HTTP 429", pendientes.pop(0))
+        return "ok"
+    return funcion
+
+def test_respeta_retry_after_corto(monkeypatch):
+    esperas = []
+
+    async def dormir(segundos):
+        esperas.append(segundos)
+    monkeypatch.setattr(asyncio, "sleep", dormir)
+    planificador = Planificador(tasa_host=1e9, max_reintentos=2, backoff_max=60)
+    assert asyncio.run(planificador.ejecutar("http://ml.local/a", _bloqueos([7.0]))) == "ok"
+    assert esperas == [7.0]
+
+def test_retry_after_largo_va_al_dead_letter(monkeypatch):
+    esperas = []
+
+    async def dormir(segundos):
+        esperas.append(segundos)
+    monkeypatch.setattr(asyncio, "sleep", dormir)
+    planificador = Planificador(tasa_host=1e9, max_reintentos=3, backoff_max=60)
+    assert asyncio.run(planificador.ejecutar("http://ml.local/a", _bloqueos([3600.0]))) is None
+    assert esperas == []
+    assert planificador.dead_letter == ["http://ml.local/a"]
+
+def test_dead_letter_ida_y_vuelta(tmp_path):
+    path = str(tmp_path / "dead_letter.json")
+    planificador = Planificador(tasa_host=1e9)
+    planificador.dead_letter = ["http://ml.local/a", "http://ml.local/b"]
+    planificador.guardar_dead_letter(path)
+    assert Planificador.cargar_dead_letter(path) == ["http://ml.local/a", "http://ml.local/b"]
+
+    planificador.dead_letter = []
+    planificador.guardar_dead_letter(path)
+    assert Planificador.cargar_dead_letter(path) == []
@@ -0,0 +1,35 @@
+"""seleccionar_productos: tras deduplicar se muestra el vendedor más barato pero se rankea por la popularidad del producto"""
+import numpy as np
+import pandas as pd
+
+import procesamiento
+from ranking import calcular_popularidad
+
+def test_producto_popular_no_desaparece_al_quedar_el_vendedor_mas_barato(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Un grupo por título: la prueba es sobre el ranking, no sobre el clustering
+    monkeypatch.setattr(procesamiento, "asignar_grupos", lambda titulos, **_: np.arange(len(titulos)))
+    otros = ["Licuadora Oster 600W", "Nevera Whirlpool Inverter", "Laptop Lenovo IdeaPad 8GB",
+             "Cafetera Hamilton Beach 12 Tazas", "Reloj Casio Digital", "Taladro Bosch Percutor"]
+    df = pd.DataFrame({
+        "titulo": ["Celular Samsung Galaxy A54 128GB Negro", "CELULAR SAMSUNG GALAXY A54 128GB NEGRO"] + otros,
+        "precio": [100.0, 99.0] + [150.0 + i for i in range(len(otros))],
+        "mensajes": [500, 0] + [10 * (i + 1) for i in range(len(otros))],
+        "ventas": 0,
+        "rating": 0.0,
+        "envio_gratis": False,
+        "tienda_oficial": False,
+        "link": [f"https://articulo.mercadolibre.com.ve/MLV-{i}-_JM" for i in range(2 + len(otros))]
+    })
+    df["popularidad"] = calcular_popularidad(df)
+
+    _, top_5 = procesamiento.seleccionar_productos(df)
+
+    samsung = top_5[top_5["titulo"].str.lower().str.contains("samsung")]
+    assert len(samsung) == 1
+    # Se muestra el precio y el link del vendedor más barato...
+    assert samsung["precio"].item() == 99.0
+    assert samsung["link"].item().endswith("MLV-1-_JM")
+    # ...pero el producto se rankea por su publicación más popular
+    assert samsung["popularidad_grupo"].item() == 400.0
+    assert top_5.index[0] == samsung.index[0]
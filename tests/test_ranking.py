@@ -0,0 +1,47 @@
+"""La selección parcial de ranking.py devuelve lo mismo que los ordenamientos completos que reemplaza"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from ranking import mas_barato_por_grupo, seleccionar_top, top_k, top_k_por_grupo
+
+def productos(n, semilla):
+    rng = np.random.default_rng(semilla)
+    # Pocos valores distintos para forzar empates, y algunos NaN
+    popularidad = rng.integers(0, 8, n).astype(float)
+    popularidad[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "popularidad": popularidad,
+        "precio": rng.integers(1, 20, n).astype(float),
+        "grupo": rng.integers(0, 5, n),
+        "categoria": rng.choice(["celulares", "hogar", "computacion"], n)
+    }, index=rng.permutation(n) + 1000)
+
+@pytest.mark.parametrize("n", [0, 1, 7, 200])
+@pytest.mark.parametrize("k", [0, 1, 5, 30, 500])
+def test_seleccionar_top_igual_a_sort_estable(n, k):
+    df = productos(n, semilla=n + k)
+    esperado = df.sort_values("popularidad", ascending=False, kind="stable", na_position="last").head(k)
+    pd.testing.assert_frame_equal(seleccionar_top(df, k), esperado)
+
+def test_top_k_con_empates_respeta_la_posicion():
+    assert top_k([3, 5, 5, 1, 5], 2).tolist() == [1, 2]
+    assert top_k([np.nan, 2, np.nan], 3).tolist() == [1, 0, 2]
+
+@pytest.mark.parametrize("k", [1, 3, 100])
+def test_top_k_por_grupo_igual_a_sort_y_head(k):
+    df = productos(300, semilla=k)
+    esperado = (
+        df.assign(_posicion=np.arange(len(df)))
+        .sort_values(["categoria", "popularidad", "_posicion"], ascending=[True, False, True], kind="stable", na_position="last")
+        .groupby("categoria", sort=False).head(k)
+        .drop(columns="_posicion")
+    )
+    pd.testing.assert_frame_equal(top_k_por_grupo(df, "categoria", k), esperado)
+
+def test_mas_barato_por_grupo_igual_a_sort_y_primero():
+    df = productos(300, semilla=1)
+    esperado = df.sort_values("precio", kind="stable").drop_duplicates("grupo")
+    resultado = mas_barato_por_grupo(df, "grupo")
+    assert sorted(resultado.index) == sorted(esperado.index)
+    assert resultado["grupo"].tolist() == list(pd.unique(df["grupo"]))
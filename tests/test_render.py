@@ -0,0 +1,35 @@
+"""El reporte escapa los textos scrapeados igual que html.escape"""
+import html
+
+import pandas as pd
+
+import render
+
+TITULOS = ['<script>alert("x")</script>', "Tom & Jerry's <b>DVD</b>", "Celular Samsung A54", "&amp; ya escapado", ""]
+
+def productos():
+    return pd.DataFrame({
+        "titulo": TITULOS,
+        "precio": [10.0, 20.0, 30.0, 40.0, 50.0],
+        "ventas": [1, 2, 3, 4, 5],
+        "mensajes": [0, 0, 0, 0, 0],
+        "rating": [4.5, 4.0, 3.5, 3.0, 0.0],
+        "envio_gratis": [True, False, True, False, True],
+        "tienda_oficial": [False, True, False, True, False],
+        "link": ['https://x.ve/"onmouseover="alert(1)', "https://x.ve/a?b=1&c=2", "#", "#", "#"]
+    })
+
+def test_escapar_igual_a_html_escape():
+    assert render.escapar(pd.Series(TITULOS)).tolist() == [html.escape(t, quote=True) for t in TITULOS]
+
+def test_reporte_no_deja_html_sin_escapar():
+    pagina = render.renderizar_reporte(productos(), "2025-01-01", "09:30")
+    assert "<script>" not in pagina and "<b>DVD" not in pagina
+    assert html.escape(TITULOS[0]) in pagina
+    assert 'href="https://x.ve/&quot;onmouseover=&quot;alert(1)"' in pagina
+    assert 'href="https://x.ve/a?b=1&amp;c=2"' in pagina
+
+def test_escribir_reporte_igual_a_renderizar(tmp_path):
+    path = tmp_path / "index.html"
+    render.escribir_reporte(str(path), productos(), "2025-01-01", "09:30")
+    assert path.read_text(encoding="utf-8") == render.renderizar_reporte(productos(), "2025-01-01", "09:30")
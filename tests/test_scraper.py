@@ -0,0 +1,107 @@
+"""scrape_ml_venezuela con un navegador falso, sin red"""
+import asyncio
+import json
+import os
+
+import playwright.async_api
+import pytest
+
+import scraper_ml_ve
+
+class Falso:
+    """Contexto, página y navegador de Playwright que no hacen nada"""
+
+    async def new_context(self, **_):
+        return Falso()
+
+    async def new_page(self):
+        return Falso()
+
+    async def route(self, *_):
+        pass
+
+    def on(self, *_):
+        pass
+
+    async def close(self):
+        pass
+
+class PlaywrightFalso:
+    def __init__(self):
+        self.chromium = self
+
+    async def launch(self, **_):
+        return Falso()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return False
+
+@pytest.fixture
+def navegador_falso(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(playwright.async_api, "async_playwright", PlaywrightFalso)
+
+    async def scrape_pagina(page, url, sufijo, estado=None):
+        # Las páginas pares responden al instante y las impares se cuelgan
+        if int(url.rsplit("/", 1)[1]) % 2:
+            await asyncio.sleep(60)
+        return [{"titulo": f"Producto {url}", "precio": 10.0, "link": url}]
+    monkeypatch.setattr(scraper_ml_ve, "scrape_pagina", scrape_pagina)
+
+def test_limite_conserva_resultados_parciales(navegador_falso):
+    urls = [f"http://ml.local/listado/{i}" for i in range(6)]
+    df = scraper_ml_ve.scrape_ml_venezuela(urls, concurrencia=6, pausa_host=0, limite=0.5)
+
+    assert sorted(df["link"]) == urls[0::2]
+    with open(scraper_ml_ve.DEAD_LETTER_PATH, encoding="utf-8") as f:
+        assert sorted(json.load(f)) == urls[1::2]
+
+def test_dead_letter_vuelve_a_la_cola(navegador_falso):
+    os.makedirs("data", exist_ok=True)
+    with open(scraper_ml_ve.DEAD_LETTER_PATH, "w", encoding="utf-8") as f:
+        json.dump(["http://ml.local/listado/8"], f)
+
+    df = scraper_ml_ve.scrape_ml_venezuela(["http://ml.local/listado/0"], concurrencia=2, pausa_host=0)
+
+    assert sorted(df["link"]) == ["http://ml.local/listado/0", "http://ml.local/listado/8"]
+
+class BannersFalsos:
+    """Locator de Playwright sobre una lista de banners (nombre, visible) que se re-evalúa en cada llamada"""
+
+    def __init__(self, banners, solo_visibles=False):
+        self.banners = banners
+        self.solo_visibles = solo_visibles
+
+    def _actuales(self):
+        return [b for b in self.banners if b[1] or not self.solo_visibles]
+
+    def filter(self, visible=None):
+        return BannersFalsos(self.banners, solo_visibles=visible)
+
+    async def count(self):
+        return len(self._actuales())
+
+    def nth(self, i):
+        locator = self
+
+        class Banner:
+            async def click(self, timeout=None):
+                banner = locator._actuales()[i]
+                if not banner[1]:
+                    await asyncio.sleep(timeout / 1000)
+                    raise TimeoutError(f"{banner[0]} no es visible")
+                locator.banners.remove(banner)
+        return Banner()
+
+def test_handle_popups_solo_cierra_visibles():
+    banners = [("oculto", False), ("cookies", True), ("aviso", True)]
+
+    class Pagina:
+        def locator(self, _):
+            return BannersFalsos(banners)
+
+    assert asyncio.run(scraper_ml_ve.handle_popups(Pagina()))
+    assert banners == [("oculto", False)]